@@ -1,5 +1,6 @@
 import os
 import sys
+import argparse
 from pathlib import Path
 from dotenv import load_dotenv
 import time
@@ -7,25 +8,115 @@ import time
 from setupper.postgres_setup import PostgreSQLSetup
 from setupper.mongo_setup import MongoDBSetup
 
-def main():
-    print("🚀 Setup Database Film Project")
-    print("=" * 40)
-    
-    # Carica configurazioni
-    load_dotenv()
-    
+def reshuffle():
+    """Rigenera solo la permutazione casuale dei film (senza ricaricare i dati)"""
+    print("🔀 Rigenerazione ordinamento casuale PostgreSQL...")
+    postgres = PostgreSQLSetup()
+    if postgres.connect() and postgres.reshuffle():
+        postgres.bump_catalog_version()
+        postgres.notify_services()
+
+def refresh_documents(movie_ids):
+    """Ricostruisce i documenti denormalizzati solo per alcuni film"""
+    print(f"📄 Aggiornamento documenti per {len(movie_ids)} film...")
+    postgres = PostgreSQLSetup()
+    if postgres.connect():
+        postgres.refresh_movie_documents(movie_ids)
+        postgres.bump_catalog_version()
+        postgres.notify_services()
+
+def blue_green(load_workers=None, max_shrink=0.1):
+    """Ricarica il catalogo in uno schema nuovo e lo mette online solo se valido"""
+    postgres = PostgreSQLSetup()
+    if load_workers is not None:
+        postgres.load_workers = load_workers
+    postgres.run_blue_green(max_shrink=max_shrink)
+
+def rollback():
+    """Rimette online il catalogo precedente all'ultimo reload blue/green"""
+    postgres = PostgreSQLSetup()
+    if postgres.connect() and postgres.rollback_catalog():
+        postgres.notify_services()
+
+def sync(report_path=None):
+    """Applica solo i CSV cambiati dall'ultimo sync"""
+    print("🔄 Sync incrementale PostgreSQL...")
+    PostgreSQLSetup().run_sync(report_path)
+
+def setup_postgres(load_workers=None):
     print("\n📊 Setup PostgreSQL...")
     try:
         postgres = PostgreSQLSetup()
+        if load_workers is not None:
+            postgres.load_workers = load_workers
         postgres.run()
         print("✅ PostgreSQL completato!")
     except Exception as e:
         print(f"❌ Errore PostgreSQL: {e}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Setup dei database del progetto")
+    parser.add_argument('--reshuffle', action='store_true',
+                        help="rigenera solo movies.shuffle_key (sort_by=random)")
+    parser.add_argument('--refresh-documents', type=int, nargs='+', metavar='MOVIE_ID',
+                        help="ricostruisce movie_documents solo per questi film")
+    parser.add_argument('--load-workers', type=int, metavar='N',
+                        help="carica i CSV e crea gli indici in parallelo su N connessioni")
+    parser.add_argument('--blue-green', action='store_true',
+                        help="ricarica in uno schema nuovo e lo scambia con quello online (solo PostgreSQL)")
+    parser.add_argument('--max-shrink', type=float, default=0.1,
+                        help="calo massimo di film accettato dal reload blue/green (default 0.1)")
+    parser.add_argument('--rollback', action='store_true',
+                        help="rimette online il catalogo precedente all'ultimo reload blue/green")
+    parser.add_argument('--sync', action='store_true',
+                        help="applica solo le differenze dei CSV cambiati (solo PostgreSQL)")
+    parser.add_argument('--report', metavar='FILE',
+                        help="con --sync, scrive in FILE gli id dei film cambiati (JSON)")
+    parser.add_argument('--mongo-only', action='store_true',
+                        help="esegue solo il setup MongoDB (es. su un mongod locale)")
+    parser.add_argument('--mongo-batch-size', type=int, metavar='N',
+                        help="recensioni per insert_many (default MONGO_BATCH_SIZE o 5000)")
+    parser.add_argument('--mongo-workers', type=int, metavar='N',
+                        help="insert_many concorrenti (default MONGO_LOAD_WORKERS o 4)")
+    args = parser.parse_args()
+    
+    # Carica configurazioni
+    load_dotenv()
+    
+    if args.reshuffle:
+        reshuffle()
+        return
+    
+    if args.refresh_documents:
+        refresh_documents(args.refresh_documents)
+        return
+    
+    if args.sync:
+        sync(args.report)
+        return
+    
+    if args.blue_green:
+        blue_green(args.load_workers, args.max_shrink)
+        return
+    
+    if args.rollback:
+        rollback()
+        return
+    
+    print("🚀 Setup Database Film Project")
+    print("=" * 40)
+    
+    if not args.mongo_only:
+        setup_postgres(args.load_workers)
     
     # Setup MongoDB
     print("\n🍃 Setup MongoDB...")
     try:
         mongo = MongoDBSetup()
+        if args.mongo_batch_size:
+            mongo.batch_size = args.mongo_batch_size
+        if args.mongo_workers:
+            mongo.load_workers = args.mongo_workers
         mongo.run()
         print("✅ MongoDB completato!")
     except Exception as e:
@@ -1,14 +1,67 @@
+import csv
 import os
+import time
 import pandas as pd
-from pymongo import MongoClient
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pymongo import IndexModel, MongoClient
 from pathlib import Path
 
 class MongoDBSetup:
+    # Tipi delle colonne di rotten_tomatoes_reviews.csv, fissati per ogni
+    # blocco (l'inferenza di pandas su un blocco solo non è affidabile).
+    # Le colonne non elencate restano all'inferenza di pandas.
+    REVIEW_DTYPES = {
+        'movie_title': 'string',
+        'review_type': 'string',
+        'publisher_name': 'string',
+        'id_movie': 'Int64',
+        'rotten_tomatoes_link': 'string',
+        'critic_name': 'string',
+        'review_score': 'float64',
+        'review_date': 'string',
+        'top_critic': 'boolean',
+        'review_content': 'string',
+    }
+    
+    # Indici per collezione: (chiavi, opzioni). Comprende quelli dichiarati
+    # negli schemi mongoose di server-mongodb, così vengono costruiti qui in
+    # un'unica passata invece che all'avvio del server. Gli indici senza
+    # opzioni che sono prefisso di un indice composto vengono saltati.
+    INDEX_PLAN = {
+        'reviews': [
+            ([("movie_title", 1)], {}),
+            ([("critic_name", 1)], {}),
+            ([("review_date", 1)], {}),
+            ([("review_type", 1)], {}),
+            ([("review_score", 1)], {}),
+            ([("publisher_name", 1)], {}),
+            ([("movie_title", 1), ("review_date", -1)], {}),
+            ([("movie_title", 1), ("review_type", 1)], {}),
+            ([("id_movie", 1), ("review_date", -1)], {}),
+        ],
+        'messages': [
+            # ID messaggio univoco
+            ([("messageId", 1)], {'unique': True}),
+            ([("roomName", 1)], {}),
+            ([("timestamp", 1)], {}),
+            ([("uniqueTimestamp", 1)], {}),
+            ([("roomName", 1), ("timestamp", -1)], {}),
+            ([("roomName", 1), ("uniqueTimestamp", -1)], {}),
+            ([("userName", 1)], {}),
+        ],
+    }
+    # Opzioni che rendono un indice non sostituibile da un composto
+    INDEX_CONSTRAINTS = ('unique', 'sparse', 'partialFilterExpression', 'expireAfterSeconds', 'collation')
+    
     def __init__(self):
-        self.host = os.getenv('MONGO_HOST')
-        self.port = int(os.getenv('MONGO_PORT'))
+        self.host = os.getenv('MONGO_HOST', 'localhost')
+        self.port = int(os.getenv('MONGO_PORT', 27017))
         self.database = os.getenv('MONGO_DB')
         
+        # Import delle recensioni: documenti per insert_many e insert_many in parallelo
+        self.batch_size = int(os.getenv('MONGO_BATCH_SIZE', 5000))
+        self.load_workers = int(os.getenv('MONGO_LOAD_WORKERS', 4))
+        
         self.client = None
         self.db = None
         
@@ -53,24 +106,68 @@ class MongoDBSetup:
             print(f"❌ Errore creazione collezioni: {e}")
             return False
     
-    def load_csv_data(self):
-        """Carica dati dai CSV nelle collezioni"""
+    def _read_review_chunks(self, csv_file, batch_size):
+        """
+        Legge il CSV a blocchi di batch_size righe e converte ogni blocco in
+        documenti: tipi fissati da REVIEW_DTYPES, valori mancanti come null.
+        """
+        with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+            header = next(csv.reader(f))
+        dtypes = {column: dtype for column, dtype in self.REVIEW_DTYPES.items() if column in header}
+        
+        for chunk in pd.read_csv(csv_file, dtype=dtypes, chunksize=batch_size):
+            chunk = chunk.astype(object)
+            yield chunk.where(chunk.notna(), None).to_dict('records')
+    
+    def load_csv_data(self, batch_size=None, workers=None, csv_file=None):
+        """
+        Carica le recensioni dal CSV in streaming: il file non viene mai
+        tenuto tutto in memoria. Ogni blocco diventa un insert_many non
+        ordinato, eseguito da `workers` thread in parallelo; al massimo
+        2 * workers blocchi sono in memoria in ogni momento.
+        
+        Args:
+            batch_size (int): documenti per insert_many (default self.batch_size)
+            workers (int): insert_many concorrenti (default self.load_workers)
+            csv_file (str): CSV da caricare (default rotten_tomatoes_reviews.csv)
+        """
+        batch_size = batch_size or self.batch_size
+        workers = max(1, workers or self.load_workers)
+        csv_file = csv_file or f"{self.csv_path}/rotten_tomatoes_reviews.csv"
+        
         try:
             print("🚀 Caricamento dati CSV in MongoDB...")
-            print("🍅 Caricando rotten_tomatoes_reviews.csv...")
+            print(f"🍅 Caricando {Path(csv_file).name} "
+                  f"(blocchi da {batch_size:,}, {workers} scrittori)...")
             try:
-                reviews_df = pd.read_csv(f"{self.csv_path}/rotten_tomatoes_reviews.csv")
+                # Ricrea la collezione vuota e senza indici secondari: durante
+                # il caricamento si aggiorna solo _id, gli indici si costruiscono dopo
+                self.db.drop_collection('reviews')
+                self.db.create_collection('reviews')
                 
-                # Converti DataFrame in lista di dizionari
-                reviews_data = reviews_df.to_dict('records')
+                inserted = 0
+                start = last_report = time.perf_counter()
+                pending = set()
                 
-                # Cancella collezione esistente per ricaricare dati puliti
-                self.db.reviews.delete_many({})
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for documents in self._read_review_chunks(csv_file, batch_size):
+                        if len(pending) >= 2 * workers:
+                            # Contropressione: si legge il blocco successivo solo quando uno è scritto
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            inserted += sum(len(future.result().inserted_ids) for future in done)
+                        pending.add(executor.submit(self.db.reviews.insert_many, documents, ordered=False))
+                        
+                        now = time.perf_counter()
+                        if now - last_report >= 2:
+                            print(f"   ... {inserted:,} recensioni ({inserted / (now - start):,.0f}/s)")
+                            last_report = now
+                    
+                    inserted += sum(len(future.result().inserted_ids) for future in pending)
                 
-                # Inserimento batch (molto veloce)
-                if reviews_data:
-                    self.db.reviews.insert_many(reviews_data)
-                    print(f"✅ {len(reviews_data):,} recensioni caricate in 'reviews'")
+                elapsed = time.perf_counter() - start
+                if inserted:
+                    print(f"✅ {inserted:,} recensioni caricate in 'reviews' in {elapsed:.1f}s "
+                          f"({inserted / elapsed:,.0f}/s)")
                 else:
                     print("⚠️ Nessuna recensione da caricare")
                     
@@ -85,34 +182,76 @@ class MongoDBSetup:
             print(f"❌ Errore durante caricamento CSV: {e}")
             return False
     
+    @staticmethod
+    def _is_prefix(keys, other):
+        """True se l'indice `keys` è prefisso (stretto) dell'indice composto `other`."""
+        if len(keys) >= len(other):
+            return False
+        if len(keys) == 1:
+            # Su un campo solo la direzione non conta
+            return keys[0][0] == other[0][0]
+        head = other[:len(keys)]
+        if head == keys:
+            return True
+        # Un composto percorso al contrario serve anche il prefisso invertito
+        return all(isinstance(d, int) for _, d in keys) and head == [(f, -d) for f, d in keys]
+    
+    def plan_indexes(self, specs):
+        """
+        Separa gli indici da costruire da quelli ridondanti.
+        
+        Returns:
+            tuple: (indici da costruire, chiavi degli indici ridondanti)
+        """
+        planned, redundant = [], []
+        for keys, options in specs:
+            if not options and any(self._is_prefix(keys, other) for other, _ in specs):
+                redundant.append(keys)
+            else:
+                planned.append((keys, options))
+        return planned, redundant
+    
+    def _drop_redundant_indexes(self, collection, planned):
+        """Elimina gli indici esistenti coperti da un indice del piano (es. creati da mongoose)."""
+        for name, info in collection.index_information().items():
+            if name == '_id_' or any(option in info for option in self.INDEX_CONSTRAINTS):
+                continue
+            keys = [(field, int(d) if isinstance(d, float) else d) for field, d in info['key']]
+            if any(self._is_prefix(keys, other) for other, _ in planned):
+                collection.drop_index(name)
+                print(f"🗑️ {collection.name}.{name} eliminato (prefisso di un indice composto)")
+    
+    def _index_sizes(self, collection):
+        stats = next(collection.aggregate([{'$collStats': {'storageStats': {}}}]))
+        return stats['storageStats'].get('indexSizes', {})
+    
     def create_indexes(self):
-        """Crea indici per ottimizzare le performance"""
+        """
+        Crea gli indici dopo il caricamento dei dati, secondo INDEX_PLAN:
+        gli indici di ogni collezione vengono costruiti con un solo
+        createIndexes, cioè con una sola scansione della collezione.
+        """
         try:
             print("📊 Creazione indici MongoDB...")
             
-            # INDICI PER COLLEZIONE REVIEWS
-            print("📝 Indici per recensioni...")
-            
-            self.db.reviews.create_index("movie_title")
-            self.db.reviews.create_index("critic_name")
-            self.db.reviews.create_index("review_date")
-            self.db.reviews.create_index("review_type")
-            self.db.reviews.create_index("review_score")
-            self.db.reviews.create_index("publisher_name")
-            self.db.reviews.create_index([("movie_title", 1), ("review_date", -1)])
-            
-            print("✅ Indici recensioni creati")
-
-            print("💬 Indici per messaggi chat...")
-            
-            # ID messaggio univoco
-            self.db.messages.create_index("messageId", unique=True)
-            self.db.messages.create_index("roomName")
-            self.db.messages.create_index("timestamp")
-            self.db.messages.create_index([("roomName", 1), ("timestamp", -1)])
-            self.db.messages.create_index("userName")
+            for collection_name, specs in self.INDEX_PLAN.items():
+                collection = self.db[collection_name]
+                planned, redundant = self.plan_indexes(specs)
+                for keys in redundant:
+                    print(f"⏭️ {collection_name} {keys}: coperto da un indice composto")
+                self._drop_redundant_indexes(collection, planned)
+                
+                start = time.perf_counter()
+                names = collection.create_indexes([IndexModel(keys, **options) for keys, options in planned])
+                elapsed = time.perf_counter() - start
+                
+                # Gli indici di un createIndexes si costruiscono insieme:
+                # il tempo è quello della costruzione condivisa
+                sizes = self._index_sizes(collection)
+                print(f"✅ {len(names)} indici su '{collection_name}' in {elapsed:.2f}s")
+                for name in names:
+                    print(f"   {name}: {sizes.get(name, 0) / 1024 / 1024:.1f} MB")
             
-            print("✅ Indici messaggi creati")
             print("🚀 Tutti gli indici MongoDB creati - performance ottimizzate!")
             
             return True
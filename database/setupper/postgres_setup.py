@@ -1,9 +1,243 @@
+import csv
+import hashlib
 import os
+import time
+import uuid
 import psycopg2
+import psycopg2.pool
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 
 class PostgreSQLSetup:
+    # Documenti denormalizzati dei film, letti direttamente dal server Flask
+    MOVIE_DOCUMENTS_TABLE = """CREATE TABLE IF NOT EXISTS movie_documents (
+            id INTEGER PRIMARY KEY REFERENCES movies(id),
+            doc JSONB NOT NULL,
+            search_card JSONB NOT NULL
+        );"""
+
+    # Costruisce doc (formato di MovieController._format_movie_data, come
+    # Movie.MOVIE_DOCUMENT_SQL) e search_card (formato di _format_search_results)
+    # con un'aggregazione per tabella satellite. {movie_filter}/{satellite_filter}
+    # restringono il calcolo a un insieme di id per l'aggiornamento incrementale.
+    MOVIE_DOCUMENTS_SQL = """
+        WITH
+        target AS (
+            SELECT * FROM movies m
+            WHERE m.name IS NOT NULL AND m.name <> '' {movie_filter}
+        ),
+        poster AS (
+            SELECT DISTINCT ON (id_movie) id_movie, link
+            FROM posters WHERE TRUE {satellite_filter}
+            ORDER BY id_movie, id
+        ),
+        actors_doc AS (
+            SELECT id_movie, jsonb_object_agg(role, names) AS actors
+            FROM (SELECT id_movie, COALESCE(role, '') AS role,
+                         jsonb_agg(actor ORDER BY id) AS names
+                    FROM actors WHERE TRUE {satellite_filter}
+                   GROUP BY id_movie, COALESCE(role, '')) a
+            GROUP BY id_movie
+        ),
+        crews_doc AS (
+            SELECT id_movie, jsonb_object_agg(role, names) AS crews
+            FROM (SELECT id_movie, COALESCE(role, '') AS role,
+                         jsonb_agg(name ORDER BY id) AS names
+                    FROM crews WHERE TRUE {satellite_filter}
+                   GROUP BY id_movie, COALESCE(role, '')) c
+            GROUP BY id_movie
+        ),
+        languages_doc AS (
+            SELECT id_movie, jsonb_object_agg(type, languages) AS languages
+            FROM (SELECT id_movie, COALESCE(type, 'null') AS type,
+                         jsonb_agg(language ORDER BY id) AS languages
+                    FROM languages WHERE TRUE {satellite_filter}
+                   GROUP BY id_movie, COALESCE(type, 'null')) l
+            GROUP BY id_movie
+        ),
+        releases_doc AS (
+            SELECT id_movie, jsonb_object_agg(country, dates) AS releases
+            FROM (SELECT id_movie, COALESCE(country, 'null') AS country,
+                         jsonb_object_agg(
+                             to_char(date, 'YYYY-MM-DD'),
+                             jsonb_build_object('rating', COALESCE(rating, ''),
+                                                'type', COALESCE(type, ''))
+                             ORDER BY id
+                         ) AS dates
+                    FROM releases WHERE TRUE {satellite_filter}
+                   GROUP BY id_movie, COALESCE(country, 'null')) r
+            GROUP BY id_movie
+        ),
+        genres_doc AS (
+            SELECT id_movie, jsonb_agg(genre ORDER BY id) AS genres
+            FROM genres WHERE TRUE {satellite_filter} GROUP BY id_movie
+        ),
+        studios_doc AS (
+            SELECT id_movie, jsonb_agg(studio ORDER BY id) AS studios
+            FROM studios WHERE TRUE {satellite_filter} GROUP BY id_movie
+        ),
+        themes_doc AS (
+            SELECT id_movie, jsonb_agg(theme ORDER BY id) AS themes
+            FROM themes WHERE TRUE {satellite_filter} GROUP BY id_movie
+        ),
+        countries_doc AS (
+            SELECT id_movie, jsonb_agg(country ORDER BY id) AS countries
+            FROM countries WHERE TRUE {satellite_filter} GROUP BY id_movie
+        )
+        INSERT INTO movie_documents (id, doc, search_card)
+        SELECT
+            m.id,
+            jsonb_build_object(
+                'id', m.id,
+                'name', m.name,
+                'date', NULLIF(m.date, 0),
+                'rating', NULLIF(m.rating, 0),
+                'minute', trunc(NULLIF(m.minute, 0))::int,
+                'tagline', m.tagline,
+                'description', m.description,
+                'poster', jsonb_build_object('url', p.link, 'alt', 'Poster di ' || m.name),
+                'actors', COALESCE(a.actors, '{{}}'::jsonb),
+                'crews', COALESCE(c.crews, '{{}}'::jsonb),
+                'languages', COALESCE(l.languages, '{{}}'::jsonb),
+                'releases', COALESCE(r.releases, '{{}}'::jsonb),
+                'genres', COALESCE(g.genres, '[]'::jsonb),
+                'studios', COALESCE(s.studios, '[]'::jsonb),
+                'themes', COALESCE(t.themes, '[]'::jsonb),
+                'countries', COALESCE(co.countries, '[]'::jsonb)
+            ),
+            jsonb_build_object(
+                'id', m.id,
+                'name', m.name,
+                'date', NULLIF(m.date, 0),
+                'rating', NULLIF(m.rating, 0),
+                'minute', trunc(NULLIF(m.minute, 0))::int,
+                'poster_url', p.link,
+                'genres', COALESCE(g.genres, '[]'::jsonb)
+            )
+        FROM target m
+        LEFT JOIN poster p ON p.id_movie = m.id
+        LEFT JOIN actors_doc a ON a.id_movie = m.id
+        LEFT JOIN crews_doc c ON c.id_movie = m.id
+        LEFT JOIN languages_doc l ON l.id_movie = m.id
+        LEFT JOIN releases_doc r ON r.id_movie = m.id
+        LEFT JOIN genres_doc g ON g.id_movie = m.id
+        LEFT JOIN studios_doc s ON s.id_movie = m.id
+        LEFT JOIN themes_doc t ON t.id_movie = m.id
+        LEFT JOIN countries_doc co ON co.id_movie = m.id
+        ON CONFLICT (id) DO UPDATE
+            SET doc = EXCLUDED.doc, search_card = EXCLUDED.search_card
+    """
+
+    # tsvector per la ricerca full-text (/api/movies/search?q=), calcolato da
+    # Postgres a ogni INSERT/UPDATE. I pesi danno la rilevanza:
+    # A = name, B = tagline, C = description
+    SEARCH_VECTOR_COLUMN = """search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(tagline, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(description, '')), 'C')
+            ) STORED"""
+
+    # Versione del dataset: cambia a ogni caricamento. Il server Flask la usa
+    # per gli ETag, quindi un reload invalida tutte le risposte in cache
+    CATALOG_VERSION_TABLE = """CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+            version TEXT NOT NULL,
+            loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );"""
+
+    # Sync incrementale: checksum dei CSV già applicati e hash per chiave
+    # (id per movies, id_movie per le tabelle satellite) del contenuto online
+    SYNC_FILES_TABLE = """CREATE TABLE IF NOT EXISTS catalog_sync_files (
+            csv_file TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            synced_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );"""
+    SYNC_ROWS_TABLE = """CREATE TABLE IF NOT EXISTS catalog_sync_rows (
+            table_name TEXT NOT NULL,
+            key INTEGER NOT NULL,
+            hash TEXT NOT NULL,
+            PRIMARY KEY (table_name, key)
+        );"""
+    # Chiave delle righe satellite senza film (es. Oscar non collegati)
+    SYNC_NULL_KEY = -1
+
+    # Reload blue/green: il server Flask legge con search_path = catalog, public.
+    # Il nuovo catalogo si costruisce in catalog_next e prende il posto di
+    # catalog con un rename atomico; la versione precedente resta in catalog_old
+    LIVE_SCHEMA = 'catalog'
+    STAGING_SCHEMA = 'catalog_next'
+    PREVIOUS_SCHEMA = 'catalog_old'
+
+    # Indici per le query frequenti. Le CREATE EXTENSION devono precedere
+    # gli indici che le usano (in parallelo vengono eseguite per prime)
+    INDEXES = [
+        # Movies - ricerche frequenti
+        "CREATE INDEX IF NOT EXISTS idx_movies_id ON movies(id)",
+        "CREATE INDEX IF NOT EXISTS idx_movies_name ON movies(name)",
+        "CREATE INDEX IF NOT EXISTS idx_movies_date ON movies(date)", 
+        "CREATE INDEX IF NOT EXISTS idx_movies_rating ON movies(rating)",
+        # permutazione casuale per sort_by=random
+        "CREATE INDEX IF NOT EXISTS idx_movies_shuffle_key ON movies(shuffle_key)",
+        # ricerca full-text pesata su name, tagline, description
+        "CREATE INDEX IF NOT EXISTS idx_movies_search_vector ON movies USING gin(search_vector)",
+        "CREATE INDEX IF NOT EXISTS idx_posters_id_movie ON posters(id_movie)",
+
+        # Actors - relazioni e ricerche
+        "CREATE INDEX IF NOT EXISTS idx_actors_id_movie ON actors(id_movie)",
+        "CREATE INDEX IF NOT EXISTS idx_actors_actor ON actors(actor)",
+        "CREATE INDEX IF NOT EXISTS idx_actors_actor_lower ON actors(LOWER(actor))",
+        
+        # Countries - relazioni
+        "CREATE INDEX IF NOT EXISTS idx_countries_id_movie ON countries(id_movie)",
+        "CREATE INDEX IF NOT EXISTS idx_countries_country ON countries(country)",
+        
+        # Crews - ricerche registi/produttori
+        "CREATE INDEX IF NOT EXISTS idx_crews_id_movie ON crews(id_movie)",
+        "CREATE INDEX IF NOT EXISTS idx_crews_name ON crews(name)",
+        "CREATE INDEX IF NOT EXISTS idx_crews_role ON crews(role)",
+        "CREATE INDEX IF NOT EXISTS idx_crews_name_role ON crews(name, role)",
+        
+        # Releases - filtri geografici/temporali
+        "CREATE INDEX IF NOT EXISTS idx_releases_id_movie ON releases(id_movie)",
+        "CREATE INDEX IF NOT EXISTS idx_releases_country ON releases(country)",
+        "CREATE INDEX IF NOT EXISTS idx_releases_date ON releases(date)",
+        
+        # Oscar - ricerche premi
+        "CREATE INDEX IF NOT EXISTS idx_oscars_id_movie ON oscars(id_movie)",
+        "CREATE INDEX IF NOT EXISTS idx_oscars_film ON oscars(film)",
+        "CREATE INDEX IF NOT EXISTS idx_oscars_name ON oscars(name)",
+        "CREATE INDEX IF NOT EXISTS idx_oscars_category ON oscars(category)",
+        
+        # Genres, Studios, Themes - filtri comuni
+        "CREATE INDEX IF NOT EXISTS idx_genres_id_movie ON genres(id_movie)",
+        "CREATE INDEX IF NOT EXISTS idx_genres_genre ON genres(genre)",
+        "CREATE INDEX IF NOT EXISTS idx_studios_id_movie ON studios(id_movie)",
+        "CREATE INDEX IF NOT EXISTS idx_themes_id_movie ON themes(id_movie)",
+        
+        #tringrammi per la ricerca suggestion 
+        # (estensione sempre in public: è nel search_path di ogni schema del catalogo)
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public",
+        "CREATE INDEX idx_movies_name_trigram ON movies USING gin(name gin_trgm_ops)"
+    ]
+
+    # CSV da caricare: (file, tabella, colonne). movies per primo, le altre
+    # tabelle hanno una foreign key verso movies
+    CSV_FILES = [
+        ('movies.csv', 'movies', '(id, name, date, tagline, description, minute, rating)'),
+        ('actors.csv', 'actors', '(id_movie, actor, role)'),
+        ('countries.csv', 'countries', '(id_movie, country)'),
+        ('crew.csv', 'crews', '(id_movie, role, name)'),
+        ('genres.csv', 'genres', '(id_movie, genre)'),
+        ('languages.csv', 'languages', '(id_movie, type, language)'),
+        ('posters.csv', 'posters', '(id_movie, link)'),
+        ('releases.csv', 'releases', '(id_movie, country, date, type, rating)'),
+        ('studios.csv', 'studios', '(id_movie, studio)'),
+        ('themes.csv', 'themes', '(id_movie, theme)'),
+        ('the_oscar_awards.csv', 'oscars', '(year_film,year_ceremony,ceremony,category,name,film,winner,id_movie)')
+    ]
+
     def __init__(self):
         # Leggi configurazioni da environment
         self.host = os.getenv('POSTGRES_HOST')
@@ -14,17 +248,42 @@ class PostgreSQLSetup:
         self.conn = None
         self.root_path = Path(__file__).resolve().parent.parent
         self.csv_path = self.root_path.parent / 'data_clean'
+        
+        # Caricamento e indici in parallelo: numero di connessioni (0 o 1 = seriale)
+        self.load_workers = int(os.getenv('POSTGRES_LOAD_WORKERS', 0))
+        # Memoria per ogni CREATE INDEX / VALIDATE: va moltiplicata per load_workers
+        self.maintenance_work_mem = os.getenv('POSTGRES_MAINTENANCE_WORK_MEM', '256MB')
+        self.parallel_maintenance_workers = int(os.getenv('POSTGRES_PARALLEL_MAINTENANCE_WORKERS', 2))
+        
+        # Stesso search_path del server Flask: dopo il primo reload blue/green
+        # anche reshuffle, documenti e setup completo agiscono sul catalogo online
+        self.search_path = os.getenv('POSTGRES_SEARCH_PATH', f"{self.LIVE_SCHEMA},public")
+        
+    def _connection_params(self):
+        params = dict(
+            host=self.host,
+            port=self.port,
+            database=self.database,
+            user=self.user,
+            password=self.password
+        )
+        if self.search_path:
+            params['options'] = f"-c search_path={self.search_path}"
+        return params
+    
+    def use_schema(self, schema):
+        """Tutte le istruzioni successive (anche sul pool parallelo) scrivono in `schema`."""
+        self.search_path = f"{schema},public"
+        if self.conn is not None:
+            with self.conn.cursor() as curr:
+                curr.execute(f"SET search_path TO {self.search_path}")
+            self.conn.commit()
+        
     def connect(self):
         """Crea connessione a PostgreSQL"""
         print('connessione al database postgress')
         try:
-            self.conn = psycopg2.connect(
-                host=self.host,
-                port=self.port,
-                database=self.database,
-                user=self.user,
-                password=self.password
-            )
+            self.conn = psycopg2.connect(**self._connection_params())
             return True
         except psycopg2.Error as e:
             print('+++ ERRORE DI CONNESSIONE CON DB POSTGRES', e)
@@ -36,15 +295,22 @@ class PostgreSQLSetup:
         try:
             with self.conn.cursor() as curr:
                 print('creazione tabelle..')
-                movies_table ="""CREATE TABLE IF NOT EXISTS movies (
+                movies_table =f"""CREATE TABLE IF NOT EXISTS movies (
                         id INTEGER PRIMARY KEY UNIQUE NOT NULL,
                         name TEXT,
                         date INTEGER,
                         tagline TEXT,
                         description TEXT,
                         minute REAL,
-                        rating REAL
+                        rating REAL,
+                        shuffle_key DOUBLE PRECISION DEFAULT random(),
+                        {self.SEARCH_VECTOR_COLUMN}
                     );"""
+                # Per i database creati prima delle colonne shuffle_key e search_vector
+                shuffle_column = """ALTER TABLE movies
+                        ADD COLUMN IF NOT EXISTS shuffle_key DOUBLE PRECISION DEFAULT random();"""
+                search_vector_column = f"""ALTER TABLE movies
+                        ADD COLUMN IF NOT EXISTS {self.SEARCH_VECTOR_COLUMN};"""
                 actors_table= """CREATE TABLE IF NOT EXISTS actors (
                         id SERIAL PRIMARY KEY,
                         id_movie INTEGER,
@@ -123,6 +389,8 @@ class PostgreSQLSetup:
                     );"""
                 
                 curr.execute(movies_table)
+                curr.execute(shuffle_column)
+                curr.execute(search_vector_column)
                 curr.execute(actors_table)
                 curr.execute(countries_table)
                 curr.execute(crews_table)
@@ -133,6 +401,8 @@ class PostgreSQLSetup:
                 curr.execute(studios_table)
                 curr.execute(themes_table)
                 curr.execute(oscar_table)
+                curr.execute(self.MOVIE_DOCUMENTS_TABLE)
+                curr.execute(self.CATALOG_VERSION_TABLE)
                 print('++++ TABELLE CREATE ++++')
         
         except psycopg2.Error as e:
@@ -140,44 +410,44 @@ class PostgreSQLSetup:
             return False
        
        
-    def load_csv_data(self):
-        """Carica dati dai CSV nelle tabelle"""
-        
-        csv_files = [
-            ('movies.csv', 'movies', '(id, name, date, tagline, description, minute, rating)'),
-            ('actors.csv', 'actors', '(id_movie, actor, role)'),
-            ('countries.csv', 'countries', '(id_movie, country)'),
-            ('crew.csv', 'crews', '(id_movie, role, name)'),
-            ('genres.csv', 'genres', '(id_movie, genre)'),
-            ('languages.csv', 'languages', '(id_movie, type, language)'),
-            ('posters.csv', 'posters', '(id_movie, link)'),
-            ('releases.csv', 'releases', '(id_movie, country, date, type, rating)'),
-            ('studios.csv', 'studios', '(id_movie, studio)'),
-            ('themes.csv', 'themes', '(id_movie, theme)'),
-            ('the_oscar_awards.csv', 'oscars', '(year_film,year_ceremony,ceremony,category,name,film,winner,id_movie)')
-        ]
+    def _copy_csv(self, curr, csv_file, table_name, columns):
+        """COPY di un CSV nella tabella. False se il file non esiste."""
+        try:
+            with open(f"{self.csv_path}/{csv_file}", 'r', encoding='utf-8') as f:
+                next(f)  # Salta header
+                
+                curr.copy_expert(f"""
+                    COPY {table_name} {columns}
+                    FROM STDIN WITH CSV DELIMITER ','
+                """, f)
+            return True
+        except FileNotFoundError:
+            print(f"⚠️ File {csv_file} non trovato - salto")
+            return False
+        
+    def load_csv_data(self, workers=None):
+        """
+        Carica dati dai CSV nelle tabelle.
+        
+        Args:
+            workers (int): connessioni per il caricamento parallelo
+                (default self.load_workers). Con 0 o 1 tutto passa da una
+                sola connessione in una sola transazione.
+        """
+        workers = self.load_workers if workers is None else workers
+        if workers > 1:
+            return self._load_csv_data_parallel(workers)
         
         try:
             with self.conn.cursor() as curr:
                 print("🚀 Inizio caricamento dati CSV...")
                 
-                for csv_file, table_name, columns in csv_files:
+                for csv_file, table_name, columns in self.CSV_FILES:
                     print(f"📥 Caricando {csv_file}...")
                     
                     try:
-                        with open(f"{self.csv_path}/{csv_file}", 'r', encoding='utf-8') as f:
-                            next(f)  # Salta header
-                            
-                            curr.copy_expert(f"""
-                                COPY {table_name} {columns}
-                                FROM STDIN WITH CSV DELIMITER ','
-                            """, f)
-                            
-                        print(f"✅ {csv_file} caricato con successo")
-                        
-                    except FileNotFoundError:
-                        print(f"⚠️ File {csv_file} non trovato - salto")
-                        continue
+                        if self._copy_csv(curr, csv_file, table_name, columns):
+                            print(f"✅ {csv_file} caricato con successo")
                     except Exception as e:
                         print(f"❌ Errore caricando {csv_file}: {e}")
                         raise
@@ -190,59 +460,223 @@ class PostgreSQLSetup:
             self.conn.rollback()
             print(f"❌ Errore durante caricamento, rollback effettuato: {e}")
             raise
-    def create_indexes(self):
-        """Crea indici per ottimizzare le query"""
+    
+    # === CARICAMENTO PARALLELO ===
+    
+    def _connection_pool(self, workers):
+        return psycopg2.pool.ThreadedConnectionPool(1, workers, **self._connection_params())
+    
+    def _run_in_pool(self, pool, sql_statements, settings=()):
+        """
+        Esegue ogni istruzione su una connessione del pool, in parallelo.
+        
+        Args:
+            settings: istruzioni SET eseguite prima, sulla stessa connessione
+        
+        Returns:
+            list: (istruzione, secondi, errore o None), nell'ordine di completamento
+        """
+        def run(sql):
+            conn = pool.getconn()
+            start = time.perf_counter()
+            try:
+                with conn.cursor() as curr:
+                    for setting in settings:
+                        curr.execute(setting)
+                    curr.execute(sql)
+                conn.commit()
+                return sql, time.perf_counter() - start, None
+            except psycopg2.Error as e:
+                conn.rollback()
+                return sql, time.perf_counter() - start, e
+            finally:
+                pool.putconn(conn)
+        
+        with ThreadPoolExecutor(max_workers=pool.maxconn) as executor:
+            return [future.result() for future in as_completed(
+                [executor.submit(run, sql) for sql in sql_statements]
+            )]
+    
+    def _copy_in_pool(self, pool, csv_file, table_name, columns):
+        """COPY di un CSV su una connessione del pool, nella sua transazione."""
+        conn = pool.getconn()
+        start = time.perf_counter()
+        try:
+            with conn.cursor() as curr:
+                # Nessuna attesa del flush del WAL a ogni commit: il load si rifà da capo
+                curr.execute("SET synchronous_commit = off")
+                loaded = self._copy_csv(curr, csv_file, table_name, columns)
+            conn.commit()
+            return csv_file, loaded, time.perf_counter() - start
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn)
+    
+    def _drop_foreign_keys(self):
+        """
+        Rimuove le foreign key verso movies, restituendone le definizioni
+        per ricrearle dopo il caricamento.
+        """
+        with self.conn.cursor() as curr:
+            curr.execute("""
+                SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+                FROM pg_constraint
+                WHERE contype = 'f' AND confrelid = 'movies'::regclass
+            """)
+            foreign_keys = curr.fetchall()
+            for table_name, constraint, _ in foreign_keys:
+                curr.execute(f'ALTER TABLE {table_name} DROP CONSTRAINT "{constraint}"')
+        self.conn.commit()
+        return foreign_keys
+    
+    def _restore_foreign_keys(self, pool, foreign_keys):
+        """
+        Ricrea le foreign key come NOT VALID (nessun controllo, istantaneo)
+        e poi le valida in parallelo: una scansione per tabella invece di un
+        controllo per riga durante il COPY.
+        """
+        with self.conn.cursor() as curr:
+            for table_name, constraint, definition in foreign_keys:
+                curr.execute(f'ALTER TABLE {table_name} ADD CONSTRAINT "{constraint}" {definition} NOT VALID')
+        self.conn.commit()
+        
+        validations = [
+            f'ALTER TABLE {table_name} VALIDATE CONSTRAINT "{constraint}"'
+            for table_name, constraint, _ in foreign_keys
+        ]
+        for sql, seconds, error in self._run_in_pool(pool, validations, self._maintenance_settings()):
+            if error is not None:
+                # Resta NOT VALID: vale per le nuove righe, non per quelle caricate
+                print(f"⚠️ {sql} fallita: {error}")
+            else:
+                print(f"🔗 {sql.split(' VALIDATE')[0]} validata in {seconds:.1f}s")
+    
+    def _load_csv_data_parallel(self, workers):
+        """
+        Caricamento parallelo: movies per primo sulla connessione principale,
+        poi le tabelle satellite con un COPY concorrente per tabella su un
+        pool di `workers` connessioni. Le foreign key vengono tolte prima e
+        validate alla fine.
+        
+        A differenza del caricamento seriale ogni tabella è una transazione
+        separata: in caso di errore le tabelle già caricate restano piene.
+        """
+        start = time.perf_counter()
+        movies_entry, satellites = self.CSV_FILES[0], self.CSV_FILES[1:]
+        
+        print(f"🚀 Caricamento CSV parallelo su {workers} connessioni...")
+        foreign_keys = self._drop_foreign_keys()
+        pool = self._connection_pool(workers)
+        
         try:
             with self.conn.cursor() as curr:
-                print("📊 Creazione indici PostgreSQL...")
-                
-                # INDICI PER QUERY FREQUENTI
-                indexes = [
-                    # Movies - ricerche frequenti
-                    "CREATE INDEX IF NOT EXISTS idx_movies_id ON movies(id)",
-                    "CREATE INDEX IF NOT EXISTS idx_movies_name ON movies(name)",
-                    "CREATE INDEX IF NOT EXISTS idx_movies_date ON movies(date)", 
-                    "CREATE INDEX IF NOT EXISTS idx_movies_rating ON movies(rating)",
-                    "CREATE INDEX IF NOT EXISTS idx_posters_id_movie ON posters(id_movie)",
+                curr.execute("SET synchronous_commit = off")
+                print(f"📥 Caricando {movies_entry[0]}...")
+                self._copy_csv(curr, *movies_entry)
+            self.conn.commit()
+            print(f"✅ {movies_entry[0]} caricato in {time.perf_counter() - start:.1f}s")
+            
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self._copy_in_pool, pool, *entry) for entry in satellites]
+                for future in as_completed(futures):
+                    csv_file, loaded, seconds = future.result()
+                    if loaded:
+                        print(f"✅ {csv_file} caricato in {seconds:.1f}s")
+            
+            self._restore_foreign_keys(pool, foreign_keys)
+            print(f"🎉 Tutti i dati caricati in {time.perf_counter() - start:.1f}s")
+            
+        except Exception as e:
+            self.conn.rollback()
+            print(f"❌ Errore durante il caricamento parallelo: {e}")
+            # Le foreign key tornano comunque, almeno per le righe future
+            self._restore_foreign_keys(pool, foreign_keys)
+            raise
+        finally:
+            pool.closeall()
+    
+    def build_movie_documents(self):
+        """
+        Materializza un documento JSON per film in movie_documents, così il
+        server Flask non deve ricostruirlo da undici tabelle a ogni richiesta.
+        Da eseguire dopo load_csv_data.
+        """
+        try:
+            with self.conn.cursor() as curr:
+                print("📄 Costruzione documenti dei film...")
+                curr.execute("TRUNCATE movie_documents")
+                curr.execute(self.MOVIE_DOCUMENTS_SQL.format(movie_filter='', satellite_filter=''))
+                built = curr.rowcount
+            self.conn.commit()
+            print(f"✅ {built:,} documenti costruiti in movie_documents")
+            return True
+        except psycopg2.Error as e:
+            self.conn.rollback()
+            print(f"❌ Errore costruzione documenti: {e}")
+            raise
 
-                    # Actors - relazioni e ricerche
-                    "CREATE INDEX IF NOT EXISTS idx_actors_id_movie ON actors(id_movie)",
-                    "CREATE INDEX IF NOT EXISTS idx_actors_actor ON actors(actor)",
-                    "CREATE INDEX IF NOT EXISTS idx_actors_actor_lower ON actors(LOWER(actor))",
-                    
-                    # Countries - relazioni
-                    "CREATE INDEX IF NOT EXISTS idx_countries_id_movie ON countries(id_movie)",
-                    "CREATE INDEX IF NOT EXISTS idx_countries_country ON countries(country)",
-                    
-                    # Crews - ricerche registi/produttori
-                    "CREATE INDEX IF NOT EXISTS idx_crews_id_movie ON crews(id_movie)",
-                    "CREATE INDEX IF NOT EXISTS idx_crews_name ON crews(name)",
-                    "CREATE INDEX IF NOT EXISTS idx_crews_role ON crews(role)",
-                    "CREATE INDEX IF NOT EXISTS idx_crews_name_role ON crews(name, role)",
-                    
-                    # Releases - filtri geografici/temporali
-                    "CREATE INDEX IF NOT EXISTS idx_releases_id_movie ON releases(id_movie)",
-                    "CREATE INDEX IF NOT EXISTS idx_releases_country ON releases(country)",
-                    "CREATE INDEX IF NOT EXISTS idx_releases_date ON releases(date)",
-                    
-                    # Oscar - ricerche premi
-                    "CREATE INDEX IF NOT EXISTS idx_oscars_id_movie ON oscars(id_movie)",
-                    "CREATE INDEX IF NOT EXISTS idx_oscars_film ON oscars(film)",
-                    "CREATE INDEX IF NOT EXISTS idx_oscars_name ON oscars(name)",
-                    "CREATE INDEX IF NOT EXISTS idx_oscars_category ON oscars(category)",
-                    
-                    # Genres, Studios, Themes - filtri comuni
-                    "CREATE INDEX IF NOT EXISTS idx_genres_id_movie ON genres(id_movie)",
-                    "CREATE INDEX IF NOT EXISTS idx_genres_genre ON genres(genre)",
-                    "CREATE INDEX IF NOT EXISTS idx_studios_id_movie ON studios(id_movie)",
-                    "CREATE INDEX IF NOT EXISTS idx_themes_id_movie ON themes(id_movie)",
-                    
-                    #tringrammi per la ricerca suggestion 
-                    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
-                    "CREATE INDEX idx_movies_name_trigram ON movies USING gin(name gin_trgm_ops)"
-                ]
+    def refresh_movie_documents(self, movie_ids):
+        """
+        Ricostruisce i documenti solo per i film indicati (aggiornamento
+        incrementale). I film non più presenti o senza nome vengono rimossi.
+
+        Args:
+            movie_ids (list): id dei film da aggiornare
+        """
+        movie_ids = [int(movie_id) for movie_id in movie_ids]
+        if not movie_ids:
+            return 0
+
+        try:
+            with self.conn.cursor() as curr:
+                curr.execute(
+                    self.MOVIE_DOCUMENTS_SQL.format(
+                        movie_filter='AND m.id = ANY(%(ids)s)',
+                        satellite_filter='AND id_movie = ANY(%(ids)s)'
+                    ),
+                    {'ids': movie_ids}
+                )
+                refreshed = curr.rowcount
+                curr.execute("""
+                    DELETE FROM movie_documents d
+                    WHERE d.id = ANY(%(ids)s)
+                      AND NOT EXISTS (SELECT 1 FROM movies m
+                                      WHERE m.id = d.id AND m.name IS NOT NULL AND m.name <> '')
+                """, {'ids': movie_ids})
+                removed = curr.rowcount
+            self.conn.commit()
+            print(f"✅ Documenti aggiornati: {refreshed}, rimossi: {removed}")
+            return refreshed
+        except psycopg2.Error as e:
+            self.conn.rollback()
+            print(f"❌ Errore aggiornamento documenti {movie_ids}: {e}")
+            raise
+
+    def _maintenance_settings(self):
+        return (
+            f"SET maintenance_work_mem = '{self.maintenance_work_mem}'",
+            f"SET max_parallel_maintenance_workers = {self.parallel_maintenance_workers}",
+        )
+    
+    def create_indexes(self, workers=None):
+        """
+        Crea indici per ottimizzare le query.
+        
+        Args:
+            workers (int): indici costruiti in contemporanea, ognuno sulla
+                propria connessione (default self.load_workers, 0 o 1 = seriale)
+        """
+        workers = self.load_workers if workers is None else workers
+        if workers > 1:
+            return self._create_indexes_parallel(workers)
+        
+        try:
+            with self.conn.cursor() as curr:
+                print("📊 Creazione indici PostgreSQL...")
                 
-                for index_sql in indexes:
+                for index_sql in self.INDEXES:
                     curr.execute(index_sql)
                     print(f"✅ {index_sql.split('ON ')[1].split('(')[0]}")
                 
@@ -253,9 +687,535 @@ class PostgreSQLSetup:
             print(f"❌ Errore creazione indici: {e}")
 
 
+    def _create_indexes_parallel(self, workers):
+        """
+        Indici in parallelo: CREATE INDEX prende un lock SHARE, quindi più
+        indici anche sulla stessa tabella si costruiscono insieme. Ogni
+        connessione usa maintenance_work_mem dedicata (ordinamenti in memoria)
+        e i worker paralleli di Postgres per il singolo indice.
+        """
+        start = time.perf_counter()
+        extensions = [sql for sql in self.INDEXES if sql.startswith('CREATE EXTENSION')]
+        indexes = [sql for sql in self.INDEXES if not sql.startswith('CREATE EXTENSION')]
+        
+        print(f"📊 Creazione indici in parallelo su {workers} connessioni "
+              f"(maintenance_work_mem={self.maintenance_work_mem})...")
+        
+        with self.conn.cursor() as curr:
+            for sql in extensions:
+                curr.execute(sql)
+        self.conn.commit()
+        
+        pool = self._connection_pool(workers)
+        try:
+            results = self._run_in_pool(pool, indexes, self._maintenance_settings())
+        finally:
+            pool.closeall()
+        
+        failed = 0
+        for sql, seconds, error in results:
+            name = sql.split(' ON ')[0].split()[-1]
+            if error is not None:
+                failed += 1
+                print(f"❌ {name}: {error}")
+            else:
+                print(f"✅ {name} in {seconds:.1f}s")
+        
+        print(f"🚀 {len(indexes) - failed}/{len(indexes)} indici creati in {time.perf_counter() - start:.1f}s")
+        return failed == 0
+    
+    def reshuffle(self):
+        """
+        Rigenera la permutazione casuale movies.shuffle_key usata da
+        sort_by=random. Da lanciare periodicamente (es. ogni notte) per
+        non mostrare sempre la stessa sequenza di film.
+        """
+        try:
+            with self.conn.cursor() as curr:
+                print("🔀 Rigenerazione shuffle_key dei film...")
+                curr.execute("UPDATE movies SET shuffle_key = random()")
+                updated = curr.rowcount
+                curr.execute("ANALYZE movies")
+            self.conn.commit()
+            print(f"✅ shuffle_key rigenerata per {updated:,} film")
+            return True
+        except psycopg2.Error as e:
+            self.conn.rollback()
+            print(f"❌ Errore rigenerazione shuffle_key: {e}")
+            return False
+
+    def bump_catalog_version(self):
+        """
+        Registra una nuova versione del dataset (da chiamare dopo ogni
+        modifica dei dati: caricamento, rigenerazione shuffle_key, documenti).
+        """
+        version = uuid.uuid4().hex[:16]
+        try:
+            with self.conn.cursor() as curr:
+                curr.execute(self.CATALOG_VERSION_TABLE)
+                curr.execute("""
+                    INSERT INTO catalog_version (id, version, loaded_at)
+                    VALUES (1, %s, now())
+                    ON CONFLICT (id) DO UPDATE
+                        SET version = EXCLUDED.version, loaded_at = EXCLUDED.loaded_at
+                """, (version,))
+            self.conn.commit()
+            print(f"✅ Versione del dataset: {version}")
+            return version
+        except psycopg2.Error as e:
+            self.conn.rollback()
+            print(f"❌ Errore aggiornamento versione del dataset: {e}")
+            raise
+
+    def notify_services(self):
+        """
+        Avvisa il server Flask che il catalogo è stato ricaricato, così
+        riallinea indici e cache in memoria (POST /api/admin/reload).
+        Serve FLASK_RELOAD_URL, altrimenti il passo viene saltato.
+        """
+        reload_url = os.getenv('FLASK_RELOAD_URL')
+        if not reload_url:
+            print("⚠️ FLASK_RELOAD_URL non impostato - notifica al server Flask saltata")
+            return False
+        
+        request = urllib.request.Request(
+            reload_url,
+            method='POST',
+            headers={'X-Admin-Token': os.getenv('FLASK_ADMIN_TOKEN', '')}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                print(f"✅ Server Flask notificato del reload ({response.status})")
+                return True
+        except Exception as e:
+            print(f"⚠️ Notifica al server Flask fallita: {e}")
+            return False
+
+    # === SYNC INCREMENTALE ===
+    
+    def _file_checksum(self, csv_file):
+        """sha256 del CSV, None se il file non esiste."""
+        digest = hashlib.sha256()
+        try:
+            with open(f"{self.csv_path}/{csv_file}", 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        except FileNotFoundError:
+            return None
+        return digest.hexdigest()
+    
+    def _sync_key(self, table_name):
+        return 'id' if table_name == 'movies' else f"coalesce(id_movie, {self.SYNC_NULL_KEY})"
+    
+    def _group_hash(self, columns, order):
+        """
+        Hash di tutte le righe di una chiave, nell'ordine dato: per le tabelle
+        satellite cambia se cambia, si aggiunge, si toglie o si sposta una riga.
+        """
+        return f"md5(string_agg(md5(ROW{columns}::text), '' ORDER BY {order}))"
+    
+    def _stage_csv(self, curr, csv_file, table_name, columns):
+        """Copia il CSV in una tabella UNLOGGED con gli stessi tipi, più l'ordine del file."""
+        stage = f"sync_stage_{table_name}"
+        curr.execute(f"DROP TABLE IF EXISTS {stage}")
+        curr.execute(f"CREATE UNLOGGED TABLE {stage} AS SELECT {columns[1:-1]} FROM {table_name} WITH NO DATA")
+        curr.execute(f"ALTER TABLE {stage} ADD COLUMN ord BIGSERIAL")
+        self._copy_csv(curr, csv_file, stage, columns)
+        return stage
+    
+    def _ensure_row_hashes(self, curr, table_name, columns):
+        """Al primo sync di una tabella gli hash si calcolano dal contenuto online."""
+        curr.execute("SELECT 1 FROM catalog_sync_rows WHERE table_name = %s LIMIT 1", (table_name,))
+        if curr.fetchone() is not None:
+            return
+        key = self._sync_key(table_name)
+        curr.execute(f"""
+            INSERT INTO catalog_sync_rows (table_name, key, hash)
+            SELECT %s, {key}, {self._group_hash(columns, 'id')}
+            FROM {table_name} GROUP BY {key}
+        """, (table_name,))
+    
+    def _diff_keys(self, curr, table_name, stage, columns):
+        """
+        Confronta gli hash del CSV in stage con quelli salvati.
+        
+        Returns:
+            tuple: (chiavi nuove, chiavi cambiate, chiavi sparite)
+        """
+        key = self._sync_key(table_name)
+        curr.execute(f"""
+            CREATE TEMP TABLE sync_hashes ON COMMIT DROP AS
+            SELECT {key} AS key, {self._group_hash(columns, 'ord')} AS hash
+            FROM {stage} GROUP BY {key}
+        """)
+        curr.execute("""
+            SELECT coalesce(s.key, o.key),
+                   CASE WHEN o.key IS NULL THEN 'insert'
+                        WHEN s.key IS NULL THEN 'delete'
+                        ELSE 'update' END
+            FROM sync_hashes s
+            FULL JOIN (SELECT key, hash FROM catalog_sync_rows WHERE table_name = %s) o
+              ON s.key = o.key
+            WHERE s.hash IS DISTINCT FROM o.hash
+        """, (table_name,))
+        diff = {'insert': [], 'update': [], 'delete': []}
+        for key_value, action in curr.fetchall():
+            diff[action].append(key_value)
+        return diff['insert'], diff['update'], diff['delete']
+    
+    def _save_row_hashes(self, curr, table_name, keys):
+        """Aggiorna gli hash salvati per le chiavi toccate (da sync_hashes)."""
+        curr.execute("DELETE FROM catalog_sync_rows WHERE table_name = %s AND key = ANY(%s)",
+                     (table_name, keys))
+        curr.execute("""
+            INSERT INTO catalog_sync_rows (table_name, key, hash)
+            SELECT %s, key, hash FROM sync_hashes WHERE key = ANY(%s)
+        """, (table_name, keys))
+        curr.execute("DROP TABLE sync_hashes")
+    
+    def sync_csv_data(self):
+        """
+        Sync incrementale dei CSV sul catalogo online, al posto di un reload
+        completo:
+        1. i CSV con lo stesso sha256 dell'ultimo sync vengono saltati;
+        2. gli altri vengono copiati in tabelle UNLOGGED di appoggio;
+        3. gli hash per chiave (id per movies, id_movie per le altre tabelle)
+           dicono quali film sono nuovi, cambiati o spariti;
+        4. movies: INSERT/UPDATE per id; tabelle satellite: le righe dei soli
+           film cambiati vengono sostituite (DELETE + INSERT nell'ordine del CSV);
+           i film spariti vengono tolti da tutte le tabelle.
+        Tutto in una transazione.
+        
+        Returns:
+            list: id dei film cambiati (per refresh_movie_documents e le cache)
+        """
+        start = time.perf_counter()
+        changed_movies = set()
+        deleted_movies = []
+        stages = []
+        
+        try:
+            with self.conn.cursor() as curr:
+                curr.execute(self.SYNC_FILES_TABLE)
+                curr.execute(self.SYNC_ROWS_TABLE)
+                curr.execute("SELECT csv_file, sha256 FROM catalog_sync_files")
+                manifest = dict(curr.fetchall())
+                
+                for csv_file, table_name, columns in self.CSV_FILES:
+                    checksum = self._file_checksum(csv_file)
+                    if checksum is None:
+                        print(f"⚠️ File {csv_file} non trovato - salto")
+                        continue
+                    if manifest.get(csv_file) == checksum:
+                        print(f"⏭️ {csv_file} invariato")
+                        continue
+                    
+                    self._ensure_row_hashes(curr, table_name, columns)
+                    stage = self._stage_csv(curr, csv_file, table_name, columns)
+                    stages.append(stage)
+                    inserted, updated, deleted = self._diff_keys(curr, table_name, stage, columns)
+                    column_list = columns[1:-1]
+                    
+                    if table_name == 'movies':
+                        curr.execute(f"""
+                            INSERT INTO movies {columns}
+                            SELECT {column_list} FROM {stage} WHERE id = ANY(%s)
+                        """, (inserted,))
+                        curr.execute(f"""
+                            UPDATE movies m
+                            SET {columns} = ROW({', '.join(f's.{c.strip()}' for c in column_list.split(','))})
+                            FROM {stage} s WHERE m.id = s.id AND m.id = ANY(%s)
+                        """, (updated,))
+                        # Le righe dei film spariti si tolgono dopo le tabelle satellite
+                        deleted_movies = deleted
+                        touched = inserted + updated
+                    else:
+                        touched = inserted + updated + deleted
+                        key = self._sync_key(table_name)
+                        curr.execute(f"DELETE FROM {table_name} WHERE {key} = ANY(%s)", (touched,))
+                        curr.execute(f"""
+                            INSERT INTO {table_name} {columns}
+                            SELECT {column_list} FROM {stage}
+                            WHERE {key} = ANY(%s) ORDER BY ord
+                        """, (touched,))
+                    
+                    self._save_row_hashes(curr, table_name, inserted + updated + deleted)
+                    changed_movies.update(k for k in inserted + updated + deleted if k != self.SYNC_NULL_KEY)
+                    curr.execute("""
+                        INSERT INTO catalog_sync_files (csv_file, sha256, synced_at)
+                        VALUES (%s, %s, now())
+                        ON CONFLICT (csv_file) DO UPDATE
+                            SET sha256 = EXCLUDED.sha256, synced_at = EXCLUDED.synced_at
+                    """, (csv_file, checksum))
+                    print(f"🔄 {csv_file}: {len(inserted)} nuovi, {len(updated)} cambiati, "
+                          f"{len(deleted)} rimossi")
+                
+                if deleted_movies:
+                    for _, table_name, _ in self.CSV_FILES[1:]:
+                        curr.execute(f"DELETE FROM {table_name} WHERE id_movie = ANY(%s)", (deleted_movies,))
+                        curr.execute("DELETE FROM catalog_sync_rows WHERE table_name = %s AND key = ANY(%s)",
+                                     (table_name, deleted_movies))
+                    # movie_documents.id referenzia movies(id): il documento va tolto prima del film
+                    curr.execute("DELETE FROM movie_documents WHERE id = ANY(%s)", (deleted_movies,))
+                    curr.execute("DELETE FROM movies WHERE id = ANY(%s)", (deleted_movies,))
+                
+                for stage in stages:
+                    curr.execute(f"DROP TABLE {stage}")
+            
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"❌ Errore durante il sync, nessuna modifica applicata: {e}")
+            raise
+        
+        changed = sorted(changed_movies)
+        print(f"✅ Sync completato in {time.perf_counter() - start:.1f}s: {len(changed)} film cambiati")
+        return changed
+    
+    def record_sync_state(self):
+        """
+        Riallinea lo stato del sync al catalogo appena caricato da zero:
+        checksum dei CSV attuali e hash per chiave ricalcolati dalle tabelle.
+        Senza, il primo --sync dopo un caricamento completo confronterebbe
+        i CSV con un manifest e degli hash di un altro caricamento.
+        """
+        try:
+            with self.conn.cursor() as curr:
+                curr.execute(self.SYNC_FILES_TABLE)
+                curr.execute(self.SYNC_ROWS_TABLE)
+                curr.execute("TRUNCATE catalog_sync_files, catalog_sync_rows")
+                for csv_file, table_name, columns in self.CSV_FILES:
+                    checksum = self._file_checksum(csv_file)
+                    if checksum is None:
+                        continue
+                    curr.execute("INSERT INTO catalog_sync_files (csv_file, sha256) VALUES (%s, %s)",
+                                 (csv_file, checksum))
+                    self._ensure_row_hashes(curr, table_name, columns)
+            self.conn.commit()
+            print("✅ Stato del sync incrementale riallineato al caricamento")
+        except psycopg2.Error as e:
+            self.conn.rollback()
+            print(f"❌ Errore riallineamento stato del sync: {e}")
+            raise
+    
+    def run_sync(self, report_path=None):
+        """
+        Sync incrementale completo: applica i CSV cambiati, aggiorna i
+        documenti dei soli film toccati e avvisa il server Flask.
+        
+        Args:
+            report_path: file in cui scrivere gli id dei film cambiati (JSON)
+        """
+        if not self.connect():
+            raise RuntimeError('Connessione a Postgres fallita')
+        self.create_tables()
+        
+        changed = self.sync_csv_data()
+        if report_path:
+            import json
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump({'changed_movie_ids': changed}, f)
+            print(f"📝 Id dei film cambiati in {report_path}")
+        
+        if changed:
+            self.refresh_movie_documents(changed)
+            self.bump_catalog_version()
+            self.notify_services()
+        return changed
+    
+    # === RELOAD BLUE/GREEN ===
+    
+    def _schema_exists(self, curr, schema):
+        curr.execute("SELECT 1 FROM pg_namespace WHERE nspname = %s", (schema,))
+        return curr.fetchone() is not None
+    
+    def _ensure_trigram_extension(self):
+        """
+        pg_trgm deve stare in public: creata nello schema di staging
+        sparirebbe con il DROP SCHEMA del catalogo precedente, e gli altri
+        schemi non vedrebbero gin_trgm_ops.
+        """
+        with self.conn.cursor() as curr:
+            curr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public")
+            curr.execute("""
+                SELECT n.nspname FROM pg_extension e
+                JOIN pg_namespace n ON n.oid = e.extnamespace
+                WHERE e.extname = 'pg_trgm'
+            """)
+            if curr.fetchone()[0] != 'public':
+                # Installazioni fatte da un reload blue/green precedente
+                curr.execute("ALTER EXTENSION pg_trgm SET SCHEMA public")
+        self.conn.commit()
+    
+    def _csv_rows(self, csv_file):
+        """Record del CSV (senza intestazione), None se il file non esiste."""
+        try:
+            with open(f"{self.csv_path}/{csv_file}", 'r', encoding='utf-8', newline='') as f:
+                # csv.reader: le descrizioni possono contenere a capo tra virgolette
+                return sum(1 for _ in csv.reader(f)) - 1
+        except FileNotFoundError:
+            return None
+    
+    def validate_schema(self, schema, max_shrink=0.1):
+        """
+        Controlla il catalogo appena costruito in `schema` prima di metterlo online:
+        - ogni tabella ha tante righe quanti record nel suo CSV;
+        - ci sono tutti gli indici di INDEXES;
+        - i film non calano più di max_shrink rispetto al catalogo online
+          (None = nessun controllo), per non pubblicare un export troncato.
+        
+        Returns:
+            list: problemi trovati (vuota = catalogo valido)
+        """
+        problems = []
+        with self.conn.cursor() as curr:
+            for csv_file, table_name, _ in self.CSV_FILES:
+                expected = self._csv_rows(csv_file)
+                curr.execute(f"SELECT count(*) FROM {schema}.{table_name}")
+                loaded = curr.fetchone()[0]
+                print(f"   {table_name:12} {loaded:>12,} righe (CSV: {expected if expected is not None else '-'})")
+                if expected is not None and loaded != expected:
+                    problems.append(f"{table_name}: {loaded} righe caricate, {expected} nel CSV")
+            
+            index_names = [sql.split(' ON ')[0].split()[-1] for sql in self.INDEXES if sql.startswith('CREATE INDEX')]
+            curr.execute("SELECT indexname FROM pg_indexes WHERE schemaname = %s", (schema,))
+            missing = set(index_names) - {row[0] for row in curr.fetchall()}
+            if missing:
+                problems.append(f"indici mancanti: {', '.join(sorted(missing))}")
+            
+            if max_shrink is not None:
+                curr.execute("SELECT coalesce(to_regclass(%s), to_regclass('public.movies'))",
+                             (f"{self.LIVE_SCHEMA}.movies",))
+                live_table = curr.fetchone()[0]
+                if live_table is not None:
+                    curr.execute(f"SELECT count(*) FROM {live_table}")
+                    live_movies = curr.fetchone()[0]
+                    curr.execute(f"SELECT count(*) FROM {schema}.movies")
+                    new_movies = curr.fetchone()[0]
+                    if new_movies < live_movies * (1 - max_shrink):
+                        problems.append(f"film da {live_movies} a {new_movies}: calo oltre il {max_shrink:.0%}")
+        self.conn.rollback()
+        return problems
+    
+    def _catalog_tables(self):
+        """Tabelle che compongono il catalogo (quelle spostate tra schemi)."""
+        return [table_name for _, table_name, _ in self.CSV_FILES] + [
+            'movie_documents', 'catalog_version', 'catalog_sync_files', 'catalog_sync_rows'
+        ]
+    
+    def swap_schemas(self):
+        """
+        Mette online catalog_next in una sola transazione:
+        catalog -> catalog_old, catalog_next -> catalog. Le query in corso
+        finiscono sulle tabelle vecchie, le successive vedono quelle nuove.
+        
+        Al primo reload blue/green il catalogo online è ancora in public:
+        le sue tabelle vengono spostate in catalog_old, così --rollback può
+        ripristinarlo. Il catalog_old precedente viene eliminato solo dopo
+        che lo scambio è confermato.
+        """
+        expired = f"{self.PREVIOUS_SCHEMA}_expired"
+        try:
+            with self.conn.cursor() as curr:
+                # Non restare in coda dietro a un lock: meglio fallire e riprovare
+                curr.execute("SET LOCAL lock_timeout = '5s'")
+                curr.execute(f"DROP SCHEMA IF EXISTS {expired} CASCADE")
+                if self._schema_exists(curr, self.PREVIOUS_SCHEMA):
+                    curr.execute(f"ALTER SCHEMA {self.PREVIOUS_SCHEMA} RENAME TO {expired}")
+                
+                if self._schema_exists(curr, self.LIVE_SCHEMA):
+                    curr.execute(f"ALTER SCHEMA {self.LIVE_SCHEMA} RENAME TO {self.PREVIOUS_SCHEMA}")
+                else:
+                    curr.execute(f"CREATE SCHEMA {self.PREVIOUS_SCHEMA}")
+                    for table_name in self._catalog_tables():
+                        # Le sequenze dei SERIAL e gli indici seguono la tabella
+                        curr.execute(f"ALTER TABLE IF EXISTS public.{table_name} SET SCHEMA {self.PREVIOUS_SCHEMA}")
+                
+                curr.execute(f"ALTER SCHEMA {self.STAGING_SCHEMA} RENAME TO {self.LIVE_SCHEMA}")
+            self.conn.commit()
+            print(f"🔁 {self.STAGING_SCHEMA} è ora {self.LIVE_SCHEMA} (precedente in {self.PREVIOUS_SCHEMA})")
+        except psycopg2.Error as e:
+            self.conn.rollback()
+            print(f"❌ Scambio degli schemi fallito, catalogo online invariato: {e}")
+            raise
+        
+        try:
+            with self.conn.cursor() as curr:
+                curr.execute(f"DROP SCHEMA IF EXISTS {expired} CASCADE")
+            self.conn.commit()
+        except psycopg2.Error as e:
+            self.conn.rollback()
+            print(f"⚠️ Schema {expired} non eliminato, verrà riprovato al prossimo scambio: {e}")
+    
+    def rollback_catalog(self):
+        """Rimette online catalog_old, scambiandolo con il catalogo attuale."""
+        try:
+            with self.conn.cursor() as curr:
+                if not self._schema_exists(curr, self.PREVIOUS_SCHEMA):
+                    print(f"⚠️ Nessuno schema {self.PREVIOUS_SCHEMA} da ripristinare")
+                    self.conn.rollback()
+                    return False
+                curr.execute("SET LOCAL lock_timeout = '5s'")
+                curr.execute(f"ALTER SCHEMA {self.LIVE_SCHEMA} RENAME TO {self.STAGING_SCHEMA}")
+                curr.execute(f"ALTER SCHEMA {self.PREVIOUS_SCHEMA} RENAME TO {self.LIVE_SCHEMA}")
+                curr.execute(f"ALTER SCHEMA {self.STAGING_SCHEMA} RENAME TO {self.PREVIOUS_SCHEMA}")
+            self.conn.commit()
+            print(f"↩️ Ripristinato il catalogo precedente (quello scartato è in {self.PREVIOUS_SCHEMA})")
+            return True
+        except psycopg2.Error as e:
+            self.conn.rollback()
+            print(f"❌ Ripristino fallito: {e}")
+            raise
+    
+    def run_blue_green(self, max_shrink=0.1):
+        """
+        Reload senza interruzioni: tutto il setup (tabelle, dati, documenti,
+        indici, statistiche, versione) avviene in catalog_next mentre il
+        server continua a leggere catalog con indici caldi. Solo se il nuovo
+        catalogo supera validate_schema viene scambiato con quello online.
+        """
+        start = time.perf_counter()
+        if not self.connect():
+            raise RuntimeError('Connessione a Postgres fallita')
+        
+        self._ensure_trigram_extension()
+        with self.conn.cursor() as curr:
+            curr.execute(f"DROP SCHEMA IF EXISTS {self.STAGING_SCHEMA} CASCADE")
+            curr.execute(f"CREATE SCHEMA {self.STAGING_SCHEMA}")
+        self.conn.commit()
+        self.use_schema(self.STAGING_SCHEMA)
+        print(f"🟦 Costruzione del nuovo catalogo in {self.STAGING_SCHEMA}...")
+        
+        if self.create_tables() is False:
+            raise RuntimeError('Creazione tabelle fallita')
+        self.load_csv_data()
+        self.build_movie_documents()
+        self.create_indexes()
+        with self.conn.cursor() as curr:
+            curr.execute("ANALYZE")
+        self.conn.commit()
+        self.bump_catalog_version()
+        # Il manifest del sync viaggia con lo schema: va online (e in rollback) con lui
+        self.record_sync_state()
+        
+        print("🔎 Validazione del nuovo catalogo...")
+        problems = self.validate_schema(self.STAGING_SCHEMA, max_shrink)
+        if problems:
+            for problem in problems:
+                print(f"❌ {problem}")
+            raise RuntimeError(f"Catalogo non valido, resta in {self.STAGING_SCHEMA} e non va online")
+        
+        self.swap_schemas()
+        print(f"🟩 Reload blue/green completato in {time.perf_counter() - start:.1f}s")
+        self.notify_services()
+
     def run(self):
         """Esegue tutto il setup"""
         self.connect()
         self.create_tables()
         self.load_csv_data()
-        self.create_indexes()
\ No newline at end of file
+        self.build_movie_documents()
+        self.create_indexes()
+        self.bump_catalog_version()
+        self.record_sync_state()
+        self.notify_services()
\ No newline at end of file
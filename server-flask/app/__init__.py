@@ -1,9 +1,12 @@
+import time
 from flask import Flask
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from config.app_config import DatabaseConfig
+from app.services.ReplicaRouter import RoutingSession
 
-db = SQLAlchemy()
+# La RoutingSession manda le letture del catalogo alle repliche, se configurate
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 def create_app(config_class=DatabaseConfig):
     """
@@ -21,12 +24,46 @@ def create_app(config_class=DatabaseConfig):
     """
     
     # ===CREAZIONE ISTANZA FLASK ===
+    start = time.perf_counter()
     app = Flask(__name__)
     app.config.from_object(config_class)
     
     # ===INIZIALIZZAZIONE DATABASE ===
+    
+    # Pool con contatori (checkout, overflow, timeout) e attesa misurata,
+    # visibili in /api/health e /api/metrics
+    from app.services.DatabasePool import InstrumentedQueuePool
+    engine_options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    engine_options.setdefault('poolclass', InstrumentedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+    
+    # Un bind 'replica_N' per ogni replica in lettura
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    for i, uri in enumerate(app.config.get('POSTGRES_REPLICA_URIS') or []):
+        binds[f'replica_{i}'] = uri
+    app.config['SQLALCHEMY_BINDS'] = binds
+    
     db.init_app(app)
-    print("✅ SQLAlchemy inizializzato e collegato al database PostgreSQL")
+    
+    from app.services.ReplicaRouter import replica_router
+    replica_router.init_app(app, db)
+    
+    from app.services.DatabasePool import label_app_pools
+    with app.app_context():
+        label_app_pools()
+    
+    # === STRUMENTAZIONE DELLE RICHIESTE ===
+    # Query, tempo DB, righe, formattazione e JSON per richiesta (header Server-Timing)
+    
+    from app.utils.instrumentation import init_instrumentation
+    init_instrumentation(app)
+    
+    from app.routes.metricsRoute import init_metrics
+    init_metrics(app)
+    
+    # Profiler a campionamento, spento finché non viene avviato
+    from app.services.SamplingProfiler import profiler
+    profiler.init_app(app)
     
     # ===CONFIGURAZIONE CORS ===
 
@@ -36,29 +73,65 @@ def create_app(config_class=DatabaseConfig):
         "http://localhost:5000",    # Server Express centrale
         "http://127.0.0.1:5500",    # Frontend statico (se ne useremo uno)
     ])
-    print("✅ CORS configurato per permettere comunicazione cross-origin")
     
     # === ROUTES ===
+    # I models vengono importati solo alla prima richiesta sui film
+    # (con gunicorn li importa il master prima del fork, vedi gunicorn.conf.py)
 
     from app.routes.healthRoute import health_bp
     from app.routes.moviesRoutes import movies_bp
+    from app.routes.adminRoute import admin_bp
+    from app.routes.metricsRoute import metrics_bp
+    from app.routes.readyRoute import ready_bp
     
     app.register_blueprint(health_bp)
+    app.register_blueprint(ready_bp)
+    app.register_blueprint(metrics_bp)
     app.register_blueprint(movies_bp)
-
-    print("✅ Routes di health check registrate")
-        
-    # === LOGGING E DEBUG INFO ===
+    app.register_blueprint(admin_bp)
     
-    if app.config.get('DEBUG'):        
-        print("📍 ROUTES REGISTRATE:")
-        for rule in app.url_map.iter_rules():
-            print(f"   {rule.methods} {rule.rule}")
-        print("")
+    # === VERSIONE DEL DATASET E CACHE DELLE RISPOSTE ===
     
+    from app.services.CatalogVersion import catalog_version
+    from app.services.ResponseCache import response_cache
+    from app.services.ReloadHooks import register_reload_hook, run_reload_hooks
+    
+    def reload_catalog_version():
+        with app.app_context():
+            catalog_version.load()
+    
+    reload_catalog_version()
+    register_reload_hook('catalog_version', reload_catalog_version, offload=True)
+    # Ogni worker si accorge da solo di un reload fatto tramite un altro worker
+    catalog_version.init_app(app, run_reload_hooks)
+    
+    response_cache.init_app(app)
+    register_reload_hook('response_cache', response_cache.clear)
+    
+    from app.services.SingleFlight import single_flight
+    single_flight.init_app(app)
+    
+    # === INDICE SUGGERIMENTI IN MEMORIA ===
+    
+    if app.config.get('SUGGESTION_INDEX_ENABLED'):
+        from app.services.SuggestionIndex import suggestion_index
+        
+        def refresh_suggestion_index():
+            with app.app_context():
+                suggestion_index.refresh()
+        
+        register_reload_hook('suggestion_index', refresh_suggestion_index, offload=True)
+        
+        try:
+            with app.app_context():
+                suggestion_index.load()
+        except Exception as e:
+            # Senza indice si ricade sulla query SQL
+            print(f"⚠️ Indice suggerimenti non caricato, uso la query SQL: {e}")
+        
     # ===RITORNO DELL'APP CONFIGURATA ===
     
-    print("🚀 Flask app completamente configurata e pronta all'uso!")
+    print(f"🚀 Flask app configurata in {(time.perf_counter() - start) * 1000:.0f}ms")
     return app
 
 def get_db():
@@ -0,0 +1,221 @@
+import asyncio
+import io
+import sys
+from contextvars import ContextVar
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+from app import create_app, db
+from app.services.DatabasePool import InstrumentedAsyncQueuePool, register_engine
+from app.services.ReplicaRouter import ReplicaRoutingMixin, replica_router
+from config.app_config import DatabaseConfig
+
+# Session sincrona (lato greenlet) della richiesta in corso
+_request_session = ContextVar('async_request_session', default=None)
+
+
+class AsyncConfig(DatabaseConfig):
+    """
+    Nella modalità asincrona tutte le richieste girano nello stesso thread:
+    un "follower" del single-flight bloccherebbe il loop aspettando un
+    leader che non può più proseguire. La cache delle risposte resta attiva.
+    """
+    SINGLE_FLIGHT_ENABLED = False
+    # Il profiler campiona per thread: qui tutte le richieste sono nel thread del loop
+    PROFILER_ENABLED = False
+
+
+class AsyncRoutingSession(ReplicaRoutingMixin, Session):
+    """Session sincrona dell'AsyncSession, con l'instradamento sulle repliche."""
+
+
+def create_async_db_engine(config, uri):
+    """Engine asyncpg con gli stessi limiti per connessione del server sincrono."""
+    return create_async_engine(
+        uri.replace('postgresql://', 'postgresql+asyncpg://', 1),
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=config['ASYNC_DB_POOL_SIZE'],
+        max_overflow=config['ASYNC_DB_MAX_OVERFLOW'],
+        pool_timeout=config['ASYNC_DB_POOL_TIMEOUT'],
+        pool_recycle=config['DB_POOL_RECYCLE'],
+        pool_pre_ping=config['DB_POOL_PRE_PING'],
+        connect_args={
+            'timeout': config['DB_CONNECT_TIMEOUT'],
+            'server_settings': {
+                'statement_timeout': str(config['DB_STATEMENT_TIMEOUT_MS']),
+                'idle_in_transaction_session_timeout': str(config['DB_IDLE_IN_TRANSACTION_TIMEOUT_MS']),
+                'search_path': config['DB_SEARCH_PATH'],
+            },
+        },
+    )
+
+
+class AsyncMoviesApp:
+    """
+    Applicazione ASGI che serve la stessa app Flask (movies_bp, controller,
+    cache, ETag, metriche) senza un thread per richiesta.
+
+    Ogni richiesta viene eseguita con AsyncSession.run_sync: il codice
+    sincrono di route, controller e model gira in un greenlet, e ogni query
+    passa dal driver asyncpg restituendo il controllo al loop finché
+    Postgres non risponde. Così un solo processo tiene aperte centinaia di
+    richieste /suggestions e /search mentre aspettano il database.
+
+    db.session, per la durata della richiesta, è la session sincrona
+    dell'AsyncSession: models e controller non sanno in che modalità girano.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        config = flask_app.config
+
+        self.engine = create_async_db_engine(config, config['SQLALCHEMY_DATABASE_URI'])
+        self.replica_engines = {
+            f'replica_{i}': create_async_db_engine(config, uri)
+            for i, uri in enumerate(config.get('POSTGRES_REPLICA_URIS') or [])
+        }
+        register_engine('async_primary', self.engine.sync_engine)
+        for name, engine in self.replica_engines.items():
+            register_engine(f'async_{name}', engine.sync_engine)
+        if self.replica_engines:
+            replica_router.route_to({name: engine.sync_engine for name, engine in self.replica_engines.items()})
+
+        # Dopo un reload blue/green gli statement preparati da asyncpg possono
+        # riferirsi alle tabelle dello schema precedente: si riparte da connessioni nuove
+        from app.services.ReloadHooks import register_reload_hook, set_reload_offload
+        register_reload_hook('async_pool', self._dispose_pools)
+        # Versione del catalogo e indice dei suggerimenti si ricaricano con
+        # connessioni psycopg2 in un thread, mentre il loop serve le altre richieste
+        set_reload_offload(self._run_in_executor)
+
+        self.sessions = async_sessionmaker(
+            self.engine,
+            sync_session_class=AsyncRoutingSession,
+            expire_on_commit=False,
+        )
+
+        def bind_async_session():
+            session = _request_session.get()
+            if session is not None:
+                # Scope = app context della richiesta; remove() al teardown la chiude
+                db.session.registry.set(session)
+
+        # Prima degli altri before_request (es. il controllo della versione
+        # del catalogo), che altrimenti userebbero una session psycopg2
+        flask_app.before_request_funcs.setdefault(None, []).insert(0, bind_async_session)
+
+    @staticmethod
+    def _run_in_executor(hook):
+        # Chiamato nel greenlet di run_sync: attende il thread senza bloccare il loop
+        await_only(asyncio.get_running_loop().run_in_executor(None, hook))
+
+    def _dispose_pools(self):
+        # Eseguito dentro la richiesta di reload, quindi nel greenlet di run_sync
+        self.engine.sync_engine.dispose()
+        for engine in self.replica_engines.values():
+            engine.sync_engine.dispose()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        body = await self._read_body(receive)
+        environ = self._build_environ(scope, body)
+
+        async with self.sessions() as session:
+            status, headers, chunks = await session.run_sync(self._dispatch, environ)
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+
+    def _dispatch(self, sync_session, environ):
+        """Esegue la richiesta WSGI nell'app Flask (dentro il greenlet di run_sync)."""
+        token = _request_session.set(sync_session)
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers
+            ]
+
+        try:
+            result = self.flask_app.wsgi_app(environ, start_response)
+            try:
+                chunks = list(result)
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        finally:
+            _request_session.reset(token)
+
+        return response['status'], response['headers'], chunks
+
+    # === ADATTAMENTO ASGI -> WSGI ===
+
+    @staticmethod
+    async def _read_body(receive):
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                return body
+
+    @staticmethod
+    def _build_environ(scope, body):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': False,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1')
+            value = value.decode('latin-1')
+            if name == 'content-type':
+                environ['CONTENT_TYPE'] = value
+            elif name == 'content-length':
+                environ['CONTENT_LENGTH'] = value
+            else:
+                key = 'HTTP_' + name.upper().replace('-', '_')
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+        return environ
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                for engine in self.replica_engines.values():
+                    await engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(config_class=AsyncConfig):
+    """Crea l'app Flask e la avvolge nell'adattatore asincrono."""
+    return AsyncMoviesApp(create_app(config_class))
@@ -1,5 +1,14 @@
 import json
-from app.models.MoviesModels import Movie
+import base64
+import binascii
+from flask import current_app
+from app.models.MoviesModels import Movie, MovieDocument
+from app.services.SuggestionIndex import suggestion_index
+from app.services.ResponseCache import response_cache
+from app.services.SingleFlight import single_flight
+from app.services.ReplicaRouter import replica_reads
+from app.utils.instrumentation import instrumented
+from app.utils.httpCache import parse_seed
 
 class MovieController:
     """
@@ -13,6 +22,8 @@ class MovieController:
     - Logica di business (paginazione, filtri, etc.)
     """
     
+    COUNT_MODES = ('exact', 'estimated', 'none')
+    
     @staticmethod
     def get_movie_details(movie_id):
         """
@@ -43,12 +54,26 @@ class MovieController:
                     'movie_id': movie_id
                 }, 400
             
+            # === CACHE ===
+            
+            cached = response_cache.get('details', movie_id)
+            if cached is not None:
+                return cached
+            
             # === CHIAMATA AL MODEL ===
-            movie_data = Movie.get_movie_details(movie_id)
+            # Richieste concorrenti per lo stesso film condividono una sola esecuzione
+            
+            details_source = current_app.config.get('MOVIE_DETAILS_SOURCE')
+            
+            movie_data_formatted = single_flight.do(
+                'details',
+                (details_source, movie_id),
+                lambda: MovieController._load_movie_details(movie_id, details_source)
+            )
             
             # === CONTROLLO RISULTATO ===
             
-            if movie_data is None:
+            if movie_data_formatted is None:
                 return {
                     'success': False,
                     'error': 'Film non trovato',
@@ -56,12 +81,14 @@ class MovieController:
                 }, 404
             
             # === COSTRUZIONE RISPOSTA ===
-            movie_data_formatted = MovieController._format_movie_data(movie_data)
             
-            return {
+            response = ({
                 'success': True,
                 'movie': movie_data_formatted
-            }, 200
+            }, 200)
+            response_cache.set('details', movie_id, response)
+            
+            return response
             
         except Exception as e:
             # === GESTIONE ERRORI ===
@@ -73,6 +100,26 @@ class MovieController:
                 'movie_id': movie_id
             }, 500
     
+    @staticmethod
+    @replica_reads
+    def _load_movie_details(movie_id, details_source):
+        """
+        Legge i dettagli di un film dalla sorgente configurata:
+        'documents' = documento precalcolato in movie_documents,
+        'json' = documento costruito da Postgres in una query,
+        'orm' = oggetti SQLAlchemy formattati da _format_movie_data.
+        
+        Returns:
+            dict: dati del film formattati, None se non trovato
+        """
+        if details_source == 'documents':
+            return MovieDocument.get_doc(movie_id)
+        if details_source == 'json':
+            return Movie.get_movie_document(movie_id)
+        
+        movie_data = Movie.get_movie_details(movie_id)
+        return MovieController._format_movie_data(movie_data) if movie_data is not None else None
+    
     @staticmethod
     def get_suggestions(query, limit=5):
         """
@@ -99,18 +146,40 @@ class MovieController:
             if len(query) > 50:
                 query = query[:50]
                         
-            # === CHIAMATA AL MODEL ===
+            # === INDICE IN MEMORIA ===
+            # Se abilitato e caricato risponde senza toccare il database,
+            # altrimenti si usa la query SQL
+            
+            if current_app.config.get('SUGGESTION_INDEX_ENABLED') and suggestion_index.ready:
+                return {
+                    'success': True,
+                    'suggestions': suggestion_index.search(query, limit)
+                }, 200
             
-            suggestions = Movie.get_suggestions(query, limit)
+            # === CACHE ===
+            # ILIKE non distingue maiuscole e minuscole: la chiave è in minuscolo
             
-            # === FORMATTAZIONE RISPOSTA ===
+            cache_key = (query.lower(), limit)
+            cached = response_cache.get('suggestions', cache_key)
+            if cached is not None:
+                return cached
             
-            suggestions_formatted = MovieController._format_suggestions(suggestions)
+            # === CHIAMATA AL MODEL E FORMATTAZIONE ===
+            # Le stesse query concorrenti (es. titolo di tendenza) condividono una sola esecuzione
             
-            return {
+            suggestions_formatted = single_flight.do(
+                'suggestions',
+                cache_key,
+                lambda: MovieController._load_suggestions(query, limit)
+            )
+            
+            response = ({
                 'success': True,
                 'suggestions': suggestions_formatted
-            }, 200
+            }, 200)
+            response_cache.set('suggestions', cache_key, response)
+            
+            return response
             
         except Exception as e:            
             print(f"❌ Errore in get_suggestions per query '{query}': {str(e)}")
@@ -122,7 +191,7 @@ class MovieController:
             }, 500
     
     @staticmethod
-    def search_movies(filters_raw, page=1, per_page=20):
+    def search_movies(filters_raw, page=1, per_page=20, cursor=None, count_mode='exact'):
         """
         Cerca film applicando filtri multipli con paginazione.
         
@@ -134,6 +203,12 @@ class MovieController:
             filters_raw (dict): Filtri grezzi dalla request HTTP
             page (int): Numero di pagina per la paginazione
             per_page (int): Risultati per pagina
+            cursor (str): Se diverso da None attiva la paginazione a cursore.
+                Stringa vuota = prima pagina, altrimenti il next_cursor
+                restituito dalla pagina precedente. page viene ignorato.
+            count_mode (str): Come calcolare il totale dei risultati:
+                'exact' (COUNT completo), 'estimated' (stima del planner)
+                oppure 'none' (nessun totale, solo has_next)
             
         Returns:
             tuple: (response_data, status_code)
@@ -142,7 +217,7 @@ class MovieController:
             # === VALIDAZIONE E PULIZIA FILTRI ===
             # Il controller si occupa di validare e pulire tutti i parametri
             clean_filters = MovieController._validate_and_clean_filters(filters_raw)
-            print('clean_filters', clean_filters)
+            
             # === VALIDAZIONE PAGINAZIONE ===
             
             # Controllo e normalizzazione parametri paginazione
@@ -160,45 +235,53 @@ class MovieController:
             except (ValueError, TypeError):
                 per_page = 20
             
-            # === CHIAMATA AL MODEL ===
+            if count_mode not in MovieController.COUNT_MODES:
+                count_mode = 'exact'
             
-            # Il model ora riceve solo filtri puliti e restituisce dati grezzi
-            movies_data, total_count = Movie.search(
-                filters=clean_filters, 
-                page=page, 
-                per_page=per_page
-            )
-            
-            
-            if movies_data is None:
-                return {
-                'success': False,
-                'movies': [],
-                'pagination': {
-                    'current_page': 1,
-                    'per_page': per_page,
-                    'total_results': 0,
-                    'total_pages': 0,
-                    'has_next': False,
-                    'has_previous': False
-                },
-                    'query dict': json.dumps(clean_filters)
-                }, 404
+            # === VALIDAZIONE CURSORE ===
             
+            after = None
+            if cursor is not None:
+                if clean_filters['sort_by'] in ('random', 'relevance'):
+                    return {
+                        'success': False,
+                        'error': f"La paginazione a cursore non è disponibile con sort_by={clean_filters['sort_by']}"
+                    }, 400
+                
+                try:
+                    after = MovieController._decode_cursor(cursor, clean_filters)
+                except ValueError as e:
+                    return {
+                        'success': False,
+                        'error': f'Cursore non valido: {str(e)}'
+                    }, 400
+            
+            # === CACHE ===
+            # sort_by=random senza seed cambia a ogni richiesta: mai in cache
+            
+            cache_key = None
+            if clean_filters['sort_by'] != 'random' or 'seed' in clean_filters:
+                cache_key = MovieController._search_cache_key(
+                    clean_filters, page, per_page, cursor, count_mode
+                )
+                cached = response_cache.get('search', cache_key)
+                if cached is not None:
+                    return cached
+            
+            # === ESECUZIONE (COALESCENZA DELLE RICHIESTE IDENTICHE) ===
+            
+            def run_search():
+                return MovieController._run_search(clean_filters, page, per_page, after, count_mode)
+            
+            if cache_key is not None:
+                response = single_flight.do('search', cache_key, run_search)
+            else:
+                response = run_search()
             
-            formatted_movies = MovieController._format_search_results(movies_data)
+            if cache_key is not None and response[1] == 200:
+                response_cache.set('search', cache_key, response)
             
-            # === CALCOLO METADATI PAGINAZIONE ===
-            pagination_info = MovieController._calculate_pagination_metadata(
-                page, per_page, total_count
-            )
-            
-            return {
-                'success': True,
-                'movies': formatted_movies,
-                'pagination': pagination_info,
-                'query dict': json.dumps(clean_filters)
-            }, 200
+            return response
             
         except Exception as e:
             # === GESTIONE ERRORI ===
@@ -239,6 +322,12 @@ class MovieController:
             if len(title) >= 2:  # Minimo 2 caratteri per performance
                 clean_filters['title'] = title[:100]  # Tronco per sicurezza
         
+        # Ricerca full-text su nome, tagline e descrizione
+        if 'q' in filters_raw and filters_raw['q']:
+            q = str(filters_raw['q']).strip()
+            if len(q) >= 2:
+                clean_filters['q'] = q[:200]
+        
         # === FILTRI NUMERICI (RATING) ===
         
         if 'min_rating' in filters_raw and filters_raw['min_rating'] is not None:
@@ -321,11 +410,15 @@ class MovieController:
             
             valid_genres = []
             for genre in filters_raw['genre']:
-                if genre.lower() in genre_mapping:
+                if genre.lower() in genre_mapping and genre_mapping[genre.lower()] not in valid_genres:
                     valid_genres.append(genre_mapping[genre.lower()])
             
             if valid_genres:
                 clean_filters['genre'] = valid_genres
+                
+                # 'all' = il film deve avere tutti i generi, 'any' = almeno uno
+                genre_mode = filters_raw.get('genre_mode', 'all')
+                clean_filters['genre_mode'] = genre_mode if genre_mode in ['all', 'any'] else 'all'
         
         # === FILTRI BOOLEANI ===
         
@@ -346,38 +439,235 @@ class MovieController:
         
         # === ORDINAMENTO ===
         
-        valid_sort_options = ['base', 'rating', 'date', 'name', 'duration', 'random']
+        valid_sort_options = ['base', 'rating', 'date', 'name', 'duration', 'random', 'relevance']
         clean_filters['sort_by'] = filters_raw['sort_by'] if filters_raw['sort_by'] in valid_sort_options else 'base'
         
+        # Con q l'ordinamento di base è per rilevanza; senza q la rilevanza non esiste
+        if 'q' in clean_filters and clean_filters['sort_by'] == 'base':
+            clean_filters['sort_by'] = 'relevance'
+        elif 'q' not in clean_filters and clean_filters['sort_by'] == 'relevance':
+            clean_filters['sort_by'] = 'base'
+        
         clean_filters['order_by'] = filters_raw['order_by'] if filters_raw['order_by'] in ['asc', 'desc'] else 'desc'
         
+        # Seed dell'ordinamento casuale: stesso seed = stesse pagine
+        if clean_filters['sort_by'] == 'random':
+            seed = parse_seed(filters_raw.get('seed'))
+            if seed is not None:
+                clean_filters['seed'] = seed
+        
         return clean_filters
     
     @staticmethod
-    def _calculate_pagination_metadata(page, per_page, total_count):
+    @replica_reads
+    def _load_suggestions(query, limit):
+        """Suggerimenti dal database, già formattati."""
+        return MovieController._format_suggestions(Movie.get_suggestions(query, limit))
+    
+    @staticmethod
+    @replica_reads
+    def _run_search(clean_filters, page, per_page, after, count_mode):
+        """
+        Esegue la ricerca e costruisce la risposta completa (dizionari
+        semplici, nessun oggetto ORM): è l'unità condivisa tra richieste
+        identiche concorrenti.
+        
+        Returns:
+            tuple: (response_data, status_code)
+        """
+        # === CHIAMATA AL MODEL ===
+        
+        # Con le card precalcolate non servono generi e poster dal join
+        cards_from_documents = current_app.config.get('SEARCH_RESULTS_SOURCE') == 'documents'
+        
+        # Il model ora riceve solo filtri puliti e restituisce dati grezzi
+        search_result = Movie.search(
+            filters=clean_filters, 
+            page=page, 
+            per_page=per_page,
+            after=after,
+            count_mode=count_mode,
+            load_relations=not cards_from_documents
+        )
+        
+        movies_data, total_count = search_result if search_result else (None, 0)
+        
+        if movies_data is None:
+            return {
+            'success': False,
+            'movies': [],
+            'pagination': {
+                'current_page': 1,
+                'per_page': per_page,
+                'total_results': 0,
+                'total_pages': 0,
+                'has_next': False,
+                'has_previous': False
+            },
+                'query dict': json.dumps(clean_filters)
+            }, 404
+        
+        
+        # === CALCOLO METADATI PAGINAZIONE ===
+        
+        # Senza COUNT esatto il model restituisce una riga in più
+        # solo se esiste una pagina successiva
+        has_next = None
+        if after is not None or count_mode != 'exact':
+            has_next = len(movies_data) > per_page
+            movies_data = movies_data[:per_page]
+        
+        if after is not None:
+            next_cursor = None
+            if has_next:
+                next_cursor = MovieController._encode_cursor(
+                    Movie.keyset_values(movies_data[-1], clean_filters),
+                    clean_filters
+                )
+            
+            pagination_info = MovieController._calculate_cursor_metadata(
+                per_page, total_count, next_cursor, count_mode
+            )
+        else:
+            pagination_info = MovieController._calculate_pagination_metadata(
+                page, per_page, total_count, count_mode, has_next
+            )
+        
+        if cards_from_documents:
+            formatted_movies = MovieController._search_cards_from_documents(movies_data)
+        else:
+            formatted_movies = MovieController._format_search_results(movies_data)
+        
+        return ({
+            'success': True,
+            'movies': formatted_movies,
+            'pagination': pagination_info,
+            'query dict': json.dumps(clean_filters)
+        }, 200)
+    
+    @staticmethod
+    def _search_cache_key(clean_filters, page, per_page, cursor, count_mode):
+        """
+        Chiave di cache normalizzata di una ricerca: i filtri già puliti
+        (generi in ordine alfabetico) più i parametri di paginazione.
+        In modalità cursore la pagina non conta, conta il cursore.
+        """
+        normalized = dict(clean_filters)
+        if 'genre' in normalized:
+            normalized['genre'] = sorted(normalized['genre'])
+        
+        pagination = ('cursor', cursor.strip()) if cursor is not None else ('page', page)
+        
+        return (json.dumps(normalized, sort_keys=True), pagination, per_page, count_mode)
+    
+    @staticmethod
+    def _calculate_pagination_metadata(page, per_page, total_count, count_mode='exact', has_next=None):
         """
         Calcola i metadati per la paginazione.
         
         Args:
             page (int): Pagina corrente
             per_page (int): Risultati per pagina
-            total_count (int): Totale risultati disponibili
+            total_count (int): Totale risultati disponibili (stimato con
+                count_mode='estimated', None con count_mode='none')
+            count_mode (str): Modalità che ha prodotto total_count
+            has_next (bool): Calcolato dalla riga in più letta dal model,
+                usato quando il totale non è esatto
             
         Returns:
             dict: Metadati di paginazione
         """
-        total_pages = (total_count + per_page - 1) // per_page
+        if count_mode == 'none':
+            total_pages = None
+        else:
+            total_pages = (total_count + per_page - 1) // per_page
+            if count_mode == 'estimated':
+                # La stima può essere più bassa del reale: non deve mai
+                # contraddire la pagina che abbiamo appena restituito
+                total_pages = max(total_pages, page + 1 if has_next else page)
         
         return {
             'current_page': page,
             'per_page': per_page,
             'total_results': total_count,
             'total_pages': total_pages,
-            'has_next': page < total_pages,
+            'count_mode': count_mode,
+            'has_next': has_next if has_next is not None else page < total_pages,
             'has_previous': page > 1
         }
     
     @staticmethod
+    def _calculate_cursor_metadata(per_page, total_count, next_cursor, count_mode='exact'):
+        """
+        Metadati per la paginazione a cursore.
+        
+        Args:
+            per_page (int): Risultati per pagina
+            total_count (int): Totale risultati disponibili (vedi count_mode)
+            next_cursor (str): Cursore della pagina successiva (None se finita)
+            count_mode (str): Modalità che ha prodotto total_count
+            
+        Returns:
+            dict: Metadati di paginazione
+        """
+        return {
+            'mode': 'cursor',
+            'per_page': per_page,
+            'total_results': total_count,
+            'count_mode': count_mode,
+            'next_cursor': next_cursor,
+            'has_next': next_cursor is not None
+        }
+    
+    @staticmethod
+    def _encode_cursor(values, clean_filters):
+        """
+        Costruisce il cursore opaco: JSON in base64 url-safe con
+        l'ordinamento attivo e i valori delle chiavi dell'ultimo film.
+        """
+        payload = {
+            's': clean_filters['sort_by'],
+            'o': clean_filters['order_by'],
+            'v': values
+        }
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def _decode_cursor(cursor, clean_filters):
+        """
+        Decodifica il cursore e verifica che sia stato generato con lo
+        stesso ordinamento della richiesta corrente.
+        
+        Returns:
+            list: valori da cui ripartire (lista vuota per la prima pagina)
+            
+        Raises:
+            ValueError: se il cursore è malformato o di un altro ordinamento
+        """
+        cursor = cursor.strip()
+        if not cursor:
+            return []
+        
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        except (binascii.Error, UnicodeError, ValueError):
+            raise ValueError('formato non riconosciuto')
+        
+        if not isinstance(payload, dict) or not isinstance(payload.get('v'), list) or not payload['v']:
+            raise ValueError('formato non riconosciuto')
+        
+        if not all(value is None or isinstance(value, (int, float, str)) for value in payload['v']):
+            raise ValueError('formato non riconosciuto')
+        
+        if payload.get('s') != clean_filters['sort_by'] or payload.get('o') != clean_filters['order_by']:
+            raise ValueError('generato con un ordinamento diverso')
+        
+        return payload['v']
+    
+    @staticmethod
+    @instrumented('format')
     def _format_search_results(movie_objects):
         """
         Formatta i risultati di ricerca per la risposta API.
@@ -405,6 +695,31 @@ class MovieController:
         return movies_list
     
     @staticmethod
+    def _search_cards_from_documents(movie_objects):
+        """
+        Card dei risultati lette da movie_documents, nell'ordine della ricerca.
+        Se un documento manca (tabella non ancora aggiornata) la card viene
+        costruita dall'oggetto Movie come in _format_search_results.
+        
+        Args:
+            movie_objects: Lista di oggetti Movie (senza relazioni caricate)
+            
+        Returns:
+            list: Lista di dizionari con dati formattati
+        """
+        cards = MovieDocument.get_search_cards([movie.id for movie in movie_objects])
+        
+        movies_list = []
+        for movie in movie_objects:
+            card = cards.get(movie.id)
+            if card is None:
+                card = MovieController._format_search_results([movie])[0]
+            movies_list.append(card)
+        
+        return movies_list
+    
+    @staticmethod
+    @instrumented('format')
     def _format_movie_data(movie_obj):
         """
         Formatta i dati di un film per la risposta HTTP.
@@ -505,6 +820,7 @@ class MovieController:
         return result
     
     @staticmethod
+    @instrumented('format')
     def _format_suggestions(movie_objects):
         """
         Formatta una lista di oggetti Movie per i suggerimenti.
@@ -532,19 +848,4 @@ class MovieController:
             }
             suggestions.append(suggestion)
         
-        return suggestions    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-    
-            
-        
\ No newline at end of file
+        return suggestions
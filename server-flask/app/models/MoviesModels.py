@@ -1,5 +1,8 @@
+import random
+from flask import current_app
 from app import db
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 
 class Movie(db.Model):
     """
@@ -18,6 +21,18 @@ class Movie(db.Model):
     minute = db.Column(db.Integer)  
     rating = db.Column(db.Float)  
     
+    # Permutazione casuale precalcolata (random() al caricamento, rigenerata
+    # periodicamente dal setup): serve a sort_by=random senza ORDER BY random().
+    # deferred = non viene letta nelle query normali
+    shuffle_key = deferred(db.Column(db.Float, index=True))
+    
+    # Ricerca full-text: colonna generata da Postgres (vedi PostgreSQLSetup)
+    # con pesi A = name, B = tagline, C = description, indice GIN
+    search_vector = deferred(db.Column(TSVECTOR))
+    
+    # Configurazione di text search: i testi del catalogo sono in inglese
+    TEXT_SEARCH_CONFIG = 'english'
+    
     # === RELAZIONI CON TABELLE SATELLITE ===
     
     # lazy='select' = carica i generi solo quando accediamo a movie.xxx
@@ -125,6 +140,93 @@ class Movie(db.Model):
             print(f"Errore in get_movie_details per ID {movie_id}: {str(e)}")
             raise 
 
+    # Documento di dettaglio costruito interamente in Postgres: stessa forma
+    # di MovieController._format_movie_data, ordine delle liste = ordine di id
+    MOVIE_DOCUMENT_SQL = """
+        SELECT jsonb_build_object(
+            'id', m.id,
+            'name', m.name,
+            'date', NULLIF(m.date, 0),
+            'rating', NULLIF(m.rating, 0),
+            'minute', trunc(NULLIF(m.minute, 0))::int,
+            'tagline', m.tagline,
+            'description', m.description,
+            'poster', jsonb_build_object(
+                'url', (SELECT p.link FROM posters p
+                         WHERE p.id_movie = m.id ORDER BY p.id LIMIT 1),
+                'alt', 'Poster di ' || m.name
+            ),
+            'actors', COALESCE((
+                SELECT jsonb_object_agg(a.role, a.names)
+                FROM (SELECT COALESCE(role, '') AS role,
+                             jsonb_agg(actor ORDER BY id) AS names
+                        FROM actors WHERE id_movie = m.id
+                       GROUP BY COALESCE(role, '')) a
+            ), '{}'::jsonb),
+            'crews', COALESCE((
+                SELECT jsonb_object_agg(c.role, c.names)
+                FROM (SELECT COALESCE(role, '') AS role,
+                             jsonb_agg(name ORDER BY id) AS names
+                        FROM crews WHERE id_movie = m.id
+                       GROUP BY COALESCE(role, '')) c
+            ), '{}'::jsonb),
+            -- type NULL diventa la chiave "null", come fa json.dumps con None
+            'languages', COALESCE((
+                SELECT jsonb_object_agg(l.type, l.languages)
+                FROM (SELECT COALESCE(type, 'null') AS type,
+                             jsonb_agg(language ORDER BY id) AS languages
+                        FROM languages WHERE id_movie = m.id
+                       GROUP BY COALESCE(type, 'null')) l
+            ), '{}'::jsonb),
+            -- jsonb tiene l'ultimo valore per chiavi duplicate: come il dict Python
+            'releases', COALESCE((
+                SELECT jsonb_object_agg(r.country, r.dates)
+                FROM (SELECT COALESCE(country, 'null') AS country,
+                             jsonb_object_agg(
+                                 to_char(date, 'YYYY-MM-DD'),
+                                 jsonb_build_object('rating', COALESCE(rating, ''),
+                                                    'type', COALESCE(type, ''))
+                                 ORDER BY id
+                             ) AS dates
+                        FROM releases WHERE id_movie = m.id
+                       GROUP BY COALESCE(country, 'null')) r
+            ), '{}'::jsonb),
+            'genres', COALESCE((SELECT jsonb_agg(genre ORDER BY id)
+                                  FROM genres WHERE id_movie = m.id), '[]'::jsonb),
+            'studios', COALESCE((SELECT jsonb_agg(studio ORDER BY id)
+                                   FROM studios WHERE id_movie = m.id), '[]'::jsonb),
+            'themes', COALESCE((SELECT jsonb_agg(theme ORDER BY id)
+                                  FROM themes WHERE id_movie = m.id), '[]'::jsonb),
+            'countries', COALESCE((SELECT jsonb_agg(country ORDER BY id)
+                                     FROM countries WHERE id_movie = m.id), '[]'::jsonb)
+        )
+        FROM movies m
+        WHERE m.id = :movie_id AND m.name IS NOT NULL AND m.name <> ''
+    """
+
+    @classmethod
+    def get_movie_document(cls, movie_id):
+        """
+        Alternativa a get_movie_details: una sola query che restituisce
+        direttamente il documento JSON del film, già nel formato della
+        risposta, senza creare oggetti ORM.
+        
+        Returns:
+            dict: dati del film formattati, None se non trovato
+        """
+        try:
+            movie_document = db.session.execute(
+                db.text(cls.MOVIE_DOCUMENT_SQL), {'movie_id': movie_id}
+            ).scalar()
+            
+            if movie_document is None:
+                print(f"Film con ID {movie_id} non trovato o ha dati invalidi")
+            
+            return movie_document
+        except Exception as e:
+            print(f"Errore in get_movie_document per ID {movie_id}: {str(e)}")
+            raise
+
     @classmethod
     def get_suggestions(cls, query, limit=5):
         """
@@ -168,7 +270,25 @@ class Movie(db.Model):
             raise
         
     @classmethod
-    def search(cls, filters=None, page=1, per_page=20):
+    def search(cls, filters=None, page=1, per_page=20, after=None, count_mode='exact', load_relations=True):
+        """
+        Ricerca con filtri, ordinamento e paginazione.
+        
+        Args:
+            filters (dict): filtri già validati dal controller
+            page, per_page: paginazione classica con OFFSET
+            after (list): modalità cursore. Lista vuota = prima pagina,
+                altrimenti i valori di sort_keys dell'ultimo film visto
+                (vedi keyset_values). In questa modalità vengono restituite
+                fino a per_page + 1 righe, l'ultima serve solo a sapere
+                se esiste una pagina successiva.
+            count_mode (str): 'exact' fa il COUNT sull'intero insieme filtrato,
+                'estimated' usa la stima di righe del planner (EXPLAIN),
+                'none' non calcola il totale (None). Con 'estimated' e 'none'
+                viene letta anche qui una riga in più per has_next.
+            load_relations (bool): carica generi e poster insieme ai film.
+                False quando le card arrivano già pronte da movie_documents.
+        """
 
         # Calcola offset per paginazione
         offset = (page - 1) * per_page
@@ -178,95 +298,47 @@ class Movie(db.Model):
 
             from sqlalchemy.orm import joinedload
             
-            base_query = cls.query.filter(
-                cls.name.isnot(None),
-                cls.name != ''
-            )
-
-            if 'title' in filters:
-                base_query = base_query.filter(
-                    cls.name.ilike(f"%{filters['title']}%")
-                )
-            
-            if 'min_rating' in filters:
-                base_query = base_query.filter(cls.rating >= filters['min_rating'])
-                
-            if 'max_rating' in filters:
-                base_query = base_query.filter(cls.rating <= filters['max_rating'])
-            
-            if 'year_from' in filters:
-                base_query = base_query.filter(cls.date >= filters['year_from'])
-
-            if 'year_to' in filters:
-                base_query = base_query.filter(cls.date <= filters['year_to'])
-
-            if 'min_duration' in filters:
-                base_query = base_query.filter(cls.minute >= filters['min_duration'])
-                
-            if 'max_duration' in filters:
-                base_query = base_query.filter(cls.minute <= filters['max_duration'])
-
-            if 'genre' in filters:
-                for gen in filters['genre']:
-                    base_query = base_query.filter(cls.genres == gen)
-            
-            if filters['upcoming'] == 'true':
-                base_query = base_query.filter(cls.date >= 2023)
-            else:
-                base_query = base_query.filter(cls.date <= 2023)
-            
-            if filters['tvmovie'] == 'true':
-                base_query = base_query.filter(cls.minute  >= 200)
-            else:
-                base_query = base_query.filter(cls.minute <= 200)            
-        
-            #==== SORT AND ORDER ====
-            
-            if filters['sort_by'] == 'random':
-                base_query = base_query.order_by(db.func.random())
-
-            elif filters['sort_by'] == 'rating':
-                base_query = base_query.order_by(
-                    cls.rating.asc().nulls_last() if filters['order_by'] == 'asc' else cls.rating.desc().nulls_last()
-                )
-
-            elif filters['sort_by'] == 'date':
-                base_query = base_query.order_by(
-                    cls.date.asc().nulls_last() if filters['order_by'] == 'asc' else cls.date.desc().nulls_last()
-                )
-
-            elif filters['sort_by'] == 'name':
-                base_query = base_query.order_by(
-                    cls.name.asc().nulls_last() if filters['order_by'] == 'asc' else cls.name.desc().nulls_last()
-                )
-
-            elif filters['sort_by'] == 'duration':
-                base_query = base_query.order_by(
-                    cls.minute.asc().nulls_last() if filters['order_by'] == 'asc' else cls.minute.desc().nulls_last()
-                )
-            #è base
-            else:
-                base_query = base_query.order_by(cls.date.desc().nulls_last())
-                base_query = base_query.order_by(cls.rating.desc().nulls_last())
+            base_query = cls.build_search_query(filters)
             
             #== faccio calcoli della paginazione prima dei join ==
             
-            count_query = base_query.statement.alias()
-            total_count = db.session.query(count_query).count()
+            if count_mode == 'estimated':
+                total_count = cls._estimate_count(base_query)
+            elif count_mode == 'none':
+                total_count = None
+            else:
+                count_query = base_query.statement.alias()
+                total_count = db.session.query(count_query).count()
             
             #== eseguo i join === 
             
             load_options = []
             #questi li mettiamo dopo il calcolo della paginazione 
             
-            load_options.append(joinedload(cls.genres))
-            load_options.append(joinedload(cls.posters))
+            if load_relations:
+                load_options.append(joinedload(cls.genres))
+                load_options.append(joinedload(cls.posters))
             
+            paged_query = base_query
             base_query = base_query.options(*load_options)
             
             # ===ESECUZIONE QUERY CON PAGINAZIONE ===
             
-            movie_results = base_query.offset(offset).limit(per_page).all()
+            if filters['sort_by'] == 'random' and cls._use_shuffle_key():
+                limit = per_page if count_mode == 'exact' else per_page + 1
+                movie_results = cls._shuffled_page(
+                    paged_query, filters.get('seed'), offset, limit, load_options
+                )
+            elif after is not None:
+                # Modalità cursore: si riparte dall'ultima riga vista invece
+                # di scartare le prime (page-1)*per_page righe con OFFSET
+                if after:
+                    base_query = base_query.filter(cls._keyset_filter(filters, after))
+                movie_results = base_query.limit(per_page + 1).all()
+            elif count_mode != 'exact':
+                movie_results = base_query.offset(offset).limit(per_page + 1).all()
+            else:
+                movie_results = base_query.offset(offset).limit(per_page).all()
             
             if movie_results == [] : 
                 print(f"Nessun film trovato con i parametri di query")
@@ -278,6 +350,291 @@ class Movie(db.Model):
             print(f"Errore in search_movies: {str(e)}")
             raise   
 
+    @classmethod
+    def build_search_query(cls, filters):
+        """
+        Costruisce la query di ricerca (filtri + ordinamento) senza eseguirla
+        e senza eager loading: la usano search, il conteggio e i benchmark
+        per leggere i piani di esecuzione.
+        """
+        base_query = cls.query.filter(
+            cls.name.isnot(None),
+            cls.name != ''
+        )
+
+        if 'title' in filters:
+            base_query = base_query.filter(
+                cls.name.ilike(f"%{filters['title']}%")
+            )
+        
+        if 'q' in filters:
+            base_query = base_query.filter(cls.search_vector.op('@@')(cls._text_query(filters['q'])))
+        
+        if 'min_rating' in filters:
+            base_query = base_query.filter(cls.rating >= filters['min_rating'])
+            
+        if 'max_rating' in filters:
+            base_query = base_query.filter(cls.rating <= filters['max_rating'])
+        
+        if 'year_from' in filters:
+            base_query = base_query.filter(cls.date >= filters['year_from'])
+
+        if 'year_to' in filters:
+            base_query = base_query.filter(cls.date <= filters['year_to'])
+
+        if 'min_duration' in filters:
+            base_query = base_query.filter(cls.minute >= filters['min_duration'])
+            
+        if 'max_duration' in filters:
+            base_query = base_query.filter(cls.minute <= filters['max_duration'])
+
+        if 'genre' in filters:
+            base_query = base_query.filter(
+                cls.id.in_(cls._genre_subquery(filters['genre'], filters.get('genre_mode', 'all')))
+            )
+        
+        if filters['upcoming'] == 'true':
+            base_query = base_query.filter(cls.date >= 2023)
+        else:
+            base_query = base_query.filter(cls.date <= 2023)
+        
+        if filters['tvmovie'] == 'true':
+            base_query = base_query.filter(cls.minute  >= 200)
+        else:
+            base_query = base_query.filter(cls.minute <= 200)            
+    
+        #==== SORT AND ORDER ====
+        
+        if filters['sort_by'] == 'random':
+            if cls._use_shuffle_key():
+                base_query = base_query.order_by(cls.shuffle_key, cls.id)
+            else:
+                base_query = base_query.order_by(db.func.random())
+        elif filters['sort_by'] == 'relevance':
+            base_query = base_query.order_by(cls._text_rank(filters['q']).desc(), cls.id)
+        else:
+            # id come ultimo criterio rende l'ordinamento totale:
+            # serve alla paginazione a cursore e stabilizza i pari merito
+            sort_keys, descending = cls._sort_keys(filters)
+            for column, _, _ in sort_keys:
+                base_query = base_query.order_by(
+                    column.desc().nulls_last() if descending else column.asc().nulls_last()
+                )
+        
+        return base_query
+    
+    # === RICERCA FULL-TEXT ===
+    
+    @classmethod
+    def _text_query(cls, q):
+        """
+        tsquery dal testo dell'utente con la sintassi dei motori di ricerca:
+        parole in AND, "frase esatta", -esclusione, OR.
+        """
+        return db.func.websearch_to_tsquery(
+            db.literal_column(f"'{cls.TEXT_SEARCH_CONFIG}'::regconfig"), q
+        )
+    
+    @classmethod
+    def _text_rank(cls, q):
+        """
+        Rilevanza del film per la query. I pesi di default di ts_rank
+        (A=1.0, B=0.4, C=0.2) danno name > tagline > description.
+        """
+        return db.func.ts_rank(cls.search_vector, cls._text_query(q))
+    
+    # === ORDINAMENTO CASUALE ===
+    
+    @staticmethod
+    def _use_shuffle_key():
+        """RANDOM_SORT_MODE='shuffle' (default) usa shuffle_key, 'sql' ORDER BY random()."""
+        return current_app.config.get('RANDOM_SORT_MODE', 'shuffle') == 'shuffle'
+    
+    @classmethod
+    def _shuffled_page(cls, query, seed, offset, limit, load_options):
+        """
+        Pagina casuale letta dall'indice su shuffle_key, senza ordinare
+        l'intero insieme filtrato.
+        
+        L'ordine casuale è la permutazione shuffle_key "ruotata" a partire
+        da un punto d'inizio: prima le chiavi >= start, poi si ricomincia
+        da 0. Con lo stesso seed il punto d'inizio è sempre lo stesso, quindi
+        le pagine sono stabili e cacheabili; senza seed è casuale.
+        
+        Args:
+            query: query filtrata e ordinata per shuffle_key, senza eager loading
+            seed (int): seed dell'ordinamento (None = casuale)
+            offset, limit: finestra da restituire nell'ordine ruotato
+            load_options: opzioni di eager loading da applicare alle righe
+        """
+        start = random.Random(seed).random() if seed is not None else random.random()
+        
+        head = query.filter(cls.shuffle_key >= start)
+        movie_results = head.options(*load_options).offset(offset).limit(limit).all()
+        
+        if len(movie_results) < limit:
+            # La prima parte è finita: si prosegue dall'inizio della permutazione
+            if movie_results:
+                wrap_offset = 0
+            else:
+                head_count = db.session.query(head.statement.alias()).count()
+                wrap_offset = offset - head_count
+            
+            tail = query.filter(cls.shuffle_key < start)
+            movie_results += (
+                tail.options(*load_options)
+                .offset(wrap_offset)
+                .limit(limit - len(movie_results))
+                .all()
+            )
+        
+        return movie_results
+    
+    @classmethod
+    def _genre_subquery(cls, genres, mode='all'):
+        """
+        Subquery degli id dei film con i generi richiesti, da usare come
+        semi-join (movies.id IN (...)). Il filtro genre IN (...) passa
+        dall'indice idx_genres_genre.
+        
+        Args:
+            genres (list): generi (nomi come nel database)
+            mode (str): 'any' = almeno uno dei generi,
+                'all' = tutti i generi (GROUP BY id_movie HAVING count = n)
+        """
+        genres = list(dict.fromkeys(genres))
+        
+        subquery = db.select(Genre.id_movie).where(Genre.genre.in_(genres))
+        
+        if mode == 'all' and len(genres) > 1:
+            subquery = (
+                subquery
+                .group_by(Genre.id_movie)
+                .having(db.func.count(db.distinct(Genre.genre)) == len(genres))
+            )
+        
+        return subquery
+    
+    @classmethod
+    def _estimate_count(cls, base_query):
+        """
+        Stima il numero di righe della query filtrata con EXPLAIN, senza
+        eseguirla: costa quanto la pianificazione, non quanto una scansione.
+        La precisione dipende dalle statistiche di ANALYZE.
+        """
+        import json
+        
+        statement = base_query.order_by(None).statement
+        dialect = db.session.get_bind().dialect
+        compiled = statement.compile(dialect=dialect)
+        
+        # psycopg2 usa parametri per nome, asyncpg posizionali ($1, $2, ...)
+        params = compiled.params
+        if dialect.positional:
+            params = tuple(params[name] for name in compiled.positiontup)
+        
+        plan = db.session.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", params
+        ).scalar()
+        
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        
+        return int(plan[0]['Plan']['Plan Rows'])
+    
+    # === PAGINAZIONE A CURSORE (KEYSET) ===
+    
+    @classmethod
+    def _sort_keys(cls, filters):
+        """
+        Colonne di ordinamento per sort_by, con id come ultimo criterio.
+        
+        Returns:
+            tuple: (lista di (colonna, tipo per il confronto, nullable), descending)
+        """
+        descending = filters['order_by'] != 'asc'
+        
+        # rating e minute sono REAL nel database: il valore del cursore
+        # va confrontato come REAL, altrimenti i pari merito si perdono
+        real = db.REAL
+        
+        sort_by = filters['sort_by']
+        if sort_by == 'rating':
+            keys = [(cls.rating, real, True)]
+        elif sort_by == 'date':
+            keys = [(cls.date, None, True)]
+        elif sort_by == 'name':
+            keys = [(cls.name, None, False)]
+        elif sort_by == 'duration':
+            keys = [(cls.minute, real, True)]
+        else:
+            # base: sempre data e rating decrescenti
+            keys = [(cls.date, None, True), (cls.rating, real, True)]
+            descending = True
+        
+        keys.append((cls.id, None, False))
+        return keys, descending
+    
+    @classmethod
+    def keyset_values(cls, movie, filters):
+        """Valori delle chiavi di ordinamento di un film, da mettere nel cursore."""
+        sort_keys, _ = cls._sort_keys(filters)
+        return [getattr(movie, column.key) for column, _, _ in sort_keys]
+    
+    @classmethod
+    def _keyset_filter(cls, filters, values):
+        """
+        Condizione "viene dopo questi valori" per l'ordinamento corrente.
+        
+        Caso comune (nessun valore NULL): confronto riga-a-riga
+        (date, rating, id) < (:d, :r, :id), più le righe con NULL che con
+        NULLS LAST stanno in fondo al gruppo. Se l'ultimo film visto ha un
+        valore NULL si espande il confronto colonna per colonna.
+        """
+        sort_keys, descending = cls._sort_keys(filters)
+        
+        if len(values) != len(sort_keys):
+            raise ValueError('Cursore non compatibile con l\'ordinamento')
+        
+        def bound(value, cast_type):
+            return db.cast(value, cast_type) if cast_type is not None else value
+        
+        columns = [column for column, _, _ in sort_keys]
+        bounds = [bound(value, cast_type) for value, (_, cast_type, _) in zip(values, sort_keys)]
+        
+        if None not in values:
+            row = db.tuple_(*columns)
+            condition = row < db.tuple_(*bounds) if descending else row > db.tuple_(*bounds)
+            
+            null_tails = []
+            for i, (column, _, nullable) in enumerate(sort_keys):
+                if nullable:
+                    equal_prefix = [c == b for c, b in zip(columns[:i], bounds[:i])]
+                    null_tails.append(db.and_(*equal_prefix, column.is_(None)))
+            
+            return db.or_(condition, *null_tails)
+        
+        def after_from(i):
+            column, _, nullable = sort_keys[i]
+            value = values[i]
+            is_last = i == len(sort_keys) - 1
+            
+            if value is None:
+                # Siamo nel blocco dei NULL (in fondo): dopo vengono solo
+                # gli altri NULL con chiavi successive maggiori
+                if is_last:
+                    return db.false()
+                return db.and_(column.is_(None), after_from(i + 1))
+            
+            strictly_after = column < bounds[i] if descending else column > bounds[i]
+            if nullable:
+                strictly_after = db.or_(strictly_after, column.is_(None))
+            if is_last:
+                return strictly_after
+            return db.or_(strictly_after, db.and_(column == bounds[i], after_from(i + 1)))
+        
+        return after_from(0)
+
 class Genre(db.Model):
     """
     Modello per i generi cinematografici.
@@ -518,4 +875,52 @@ class Oscar(db.Model):
     
     def __repr__(self):
         status = "Winner" if self.winner else "Nominee"
-        return f'<Oscar {status} {self.name} ({self.category}) for {self.film}>'
\ No newline at end of file
+        return f'<Oscar {status} {self.name} ({self.category}) for {self.film}>'
+
+class MovieDocument(db.Model):
+    """
+    Documento denormalizzato di un film, materializzato dal setup del
+    database (PostgreSQLSetup.build_movie_documents) dopo ogni caricamento.
+    
+    - doc: dettagli completi nel formato di MovieController._format_movie_data
+    - search_card: card dei risultati nel formato di _format_search_results
+    
+    I dati sono statici tra un caricamento e l'altro, quindi leggere il
+    JSON già pronto evita di ricostruirlo da undici tabelle a ogni richiesta.
+    """
+    
+    __tablename__ = 'movie_documents'
+    
+    id = db.Column(db.Integer, db.ForeignKey('movies.id'), primary_key=True)
+    doc = db.Column(JSONB, nullable=False)
+    search_card = db.Column(JSONB, nullable=False)
+    
+    def __repr__(self):
+        return f'<MovieDocument {self.id}>'
+    
+    @classmethod
+    def get_doc(cls, movie_id):
+        """
+        Returns:
+            dict: documento del film, None se non presente
+        """
+        try:
+            return db.session.query(cls.doc).filter(cls.id == movie_id).scalar()
+        except Exception as e:
+            print(f"Errore in get_doc per ID {movie_id}: {str(e)}")
+            raise
+    
+    @classmethod
+    def get_search_cards(cls, movie_ids):
+        """
+        Returns:
+            dict: id film -> search_card (i film senza documento non compaiono)
+        """
+        if not movie_ids:
+            return {}
+        try:
+            rows = db.session.query(cls.id, cls.search_card).filter(cls.id.in_(movie_ids))
+            return {movie_id: card for movie_id, card in rows}
+        except Exception as e:
+            print(f"Errore in get_search_cards: {str(e)}")
+            raise
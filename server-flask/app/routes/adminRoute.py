@@ -0,0 +1,111 @@
+import hmac
+from functools import wraps
+from flask import Blueprint, current_app, jsonify, request
+from app.services.ReloadHooks import run_reload_hooks
+from app.services.ResponseCache import response_cache
+from app.services.SingleFlight import single_flight
+from app.services.SamplingProfiler import profiler
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+
+def admin_required(view):
+    """
+    Protegge le route di amministrazione con il token ADMIN_TOKEN,
+    da passare nell'header X-Admin-Token. Se il token non è configurato
+    le route sono disabilitate.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        expected = current_app.config.get('ADMIN_TOKEN')
+        provided = request.headers.get('X-Admin-Token', '')
+
+        if not expected:
+            return jsonify({'success': False, 'error': 'Route di amministrazione disabilitate'}), 403
+        if not hmac.compare_digest(provided, expected):
+            return jsonify({'success': False, 'error': 'Token non valido'}), 401
+
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@admin_bp.route('/reload', methods=['POST'])
+@admin_required
+def reload_catalog():
+    """
+    Da chiamare dopo un reload del database: riallinea tutto ciò che
+    il servizio tiene in memoria.
+    """
+    results = run_reload_hooks()
+    success = all(result == 'ok' for result in results.values())
+
+    return jsonify({
+        'success': success,
+        'hooks': results
+    }), 200 if success else 500
+
+
+@admin_bp.route('/cache', methods=['GET'])
+@admin_required
+def cache_stats():
+    """Statistiche della cache delle risposte (hit, miss, eviction per endpoint)."""
+    return jsonify({
+        'success': True,
+        'cache': response_cache.stats()
+    }), 200
+
+
+@admin_bp.route('/cache', methods=['DELETE'])
+@admin_required
+def clear_cache():
+    """Invalida la cache: tutta, oppure un solo endpoint con ?endpoint=search."""
+    endpoint = request.args.get('endpoint')
+    if endpoint and endpoint not in response_cache.ENDPOINTS:
+        return jsonify({'success': False, 'error': f'Endpoint sconosciuto: {endpoint}'}), 400
+
+    response_cache.clear(endpoint)
+    return jsonify({'success': True, 'cleared': endpoint or 'all'}), 200
+
+
+@admin_bp.route('/singleflight', methods=['GET'])
+@admin_required
+def single_flight_stats():
+    """Esecuzioni reali e chiamate coalescenti per gruppo (details, suggestions, search)."""
+    return jsonify({
+        'success': True,
+        'single_flight': single_flight.stats()
+    }), 200
+
+
+@admin_bp.route('/profiler', methods=['GET'])
+@admin_required
+def profiler_status():
+    return jsonify({'success': True, 'profiler': profiler.status()}), 200
+
+
+@admin_bp.route('/profiler', methods=['POST'])
+@admin_required
+def profiler_start():
+    """
+    Avvia il profiler a campionamento per le prossime N richieste
+    (?requests=N) oppure per N secondi (?seconds=N).
+    """
+    requests_count = request.args.get('requests', type=int)
+    seconds = request.args.get('seconds', type=float)
+
+    try:
+        profiler.start(requests=requests_count, seconds=seconds)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+
+    return jsonify({'success': True, 'profiler': profiler.status()}), 202
+
+
+@admin_bp.route('/profiler', methods=['DELETE'])
+@admin_required
+def profiler_stop():
+    """Ferma il profiler e restituisce i file collapsed stack scritti."""
+    files = profiler.stop()
+    return jsonify({'success': True, 'files': files}), 200
@@ -1,6 +1,8 @@
 from flask import Blueprint,jsonify
 from datetime import datetime
 from app import db 
+from app.services.ReplicaRouter import replica_router
+from app.services.DatabasePool import all_pool_stats
 
 health_bp = Blueprint('health', __name__, url_prefix='/api/health')
 
@@ -18,6 +20,8 @@ def health_check():
             'message': 'Flask server is running',
             'database': database_status,
             'service': 'postgres-microservice',
+            'pools': all_pool_stats(),
+            'replicas': replica_router.stats() if replica_router.enabled else None,
             }), 200
     
     except Exception as e:
@@ -25,6 +29,7 @@ def health_check():
             'status': 'error',
             'service': 'flask-film-server', 
             'database': 'disconnected',
+            'pools': all_pool_stats(),
             'error': str(e),
             'timestamp': datetime.now().isoformat()
         }), 503
\ No newline at end of file
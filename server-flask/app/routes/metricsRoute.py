@@ -0,0 +1,125 @@
+import time
+from flask import Blueprint, Response, current_app, g, request
+from app.services.Metrics import metrics, LATENCY_BUCKETS
+from app.services.ResponseCache import response_cache
+from app.services.SingleFlight import single_flight
+from app.services.DatabasePool import all_pool_stats
+from app.services.Warmup import WARMUP_ENVIRON_KEY
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+HISTOGRAMS = {
+    'http_request': ('flask_http_request_duration_seconds', 'endpoint',
+                     'Durata delle richieste per route'),
+    'db_pool_checkout_wait': ('flask_db_pool_checkout_wait_seconds', 'pool',
+                              'Attesa per ottenere una connessione dal pool'),
+}
+
+
+def init_metrics(app):
+    """Registra durata, route e status di ogni richiesta."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    @app.before_request
+    def start_timer():
+        # Le richieste di warmup non sono traffico reale
+        if not request.environ.get(WARMUP_ENVIRON_KEY):
+            g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.get('_metrics_start')
+        if start is not None:
+            endpoint = request.endpoint or 'unknown'
+            metrics.count_request(endpoint, request.method, response.status_code)
+            metrics.observe('http_request', endpoint, time.perf_counter() - start)
+        return response
+
+
+def _format_labels(**labels):
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+
+
+def _render():
+    """Metriche nel formato di esposizione testuale di Prometheus."""
+    requests, histograms = metrics.snapshot()
+    lines = []
+
+    lines.append('# HELP flask_http_requests_total Richieste per route, metodo e status')
+    lines.append('# TYPE flask_http_requests_total counter')
+    for (endpoint, method, status), count in sorted(requests.items()):
+        labels = _format_labels(endpoint=endpoint, method=method, status=status)
+        lines.append(f'flask_http_requests_total{labels} {count}')
+
+    for name, (metric, label_name, description) in HISTOGRAMS.items():
+        series = sorted((label, values) for (hist, label), values in histograms.items() if hist == name)
+
+        lines.append(f'# HELP {metric} {description}')
+        lines.append(f'# TYPE {metric} histogram')
+        for label, (buckets, total, count) in series:
+            cumulative = 0
+            for bound, bucket in zip(LATENCY_BUCKETS + ('+Inf',), buckets):
+                cumulative += bucket
+                labels = _format_labels(**{label_name: label, 'le': bound})
+                lines.append(f'{metric}_bucket{labels} {cumulative}')
+            lines.append(f'{metric}_sum{_format_labels(**{label_name: label})} {total:.6f}')
+            lines.append(f'{metric}_count{_format_labels(**{label_name: label})} {count}')
+
+        lines.append(f'# HELP {metric}_quantile Quantili stimati dai bucket (p50/p95/p99)')
+        lines.append(f'# TYPE {metric}_quantile gauge')
+        for label, (buckets, _, _) in series:
+            for q in QUANTILES:
+                value = metrics.quantile(buckets, q)
+                if value is not None:
+                    labels = _format_labels(**{label_name: label, 'quantile': q})
+                    lines.append(f'{metric}_quantile{labels} {value:.6f}')
+
+    cache_stats = response_cache.stats()['endpoints']
+    lines.append('# HELP flask_response_cache_lookups_total Accessi alla cache delle risposte')
+    lines.append('# TYPE flask_response_cache_lookups_total counter')
+    for endpoint, stats in sorted(cache_stats.items()):
+        for result in ('hits', 'misses'):
+            labels = _format_labels(endpoint=endpoint, result=result)
+            lines.append(f'flask_response_cache_lookups_total{labels} {stats[result]}')
+    lines.append('# HELP flask_response_cache_evictions_total Voci scartate per dimensione massima')
+    lines.append('# TYPE flask_response_cache_evictions_total counter')
+    for endpoint, stats in sorted(cache_stats.items()):
+        lines.append(f'flask_response_cache_evictions_total{_format_labels(endpoint=endpoint)} {stats["evictions"]}')
+    lines.append('# HELP flask_response_cache_hit_ratio Rapporto hit/accessi della cache')
+    lines.append('# TYPE flask_response_cache_hit_ratio gauge')
+    for endpoint, stats in sorted(cache_stats.items()):
+        if stats['hit_ratio'] is not None:
+            lines.append(f'flask_response_cache_hit_ratio{_format_labels(endpoint=endpoint)} {stats["hit_ratio"]}')
+
+    flight_stats = single_flight.stats()['groups']
+    lines.append('# HELP flask_single_flight_calls_total Chiamate eseguite o coalescenti')
+    lines.append('# TYPE flask_single_flight_calls_total counter')
+    for group, stats in sorted(flight_stats.items()):
+        for result in ('executions', 'coalesced'):
+            labels = _format_labels(group=group, result=result)
+            lines.append(f'flask_single_flight_calls_total{labels} {stats[result]}')
+
+    # Un pool per engine: primario, repliche e (modalità asincrona) asyncpg
+    pools = {name: stats for name, stats in all_pool_stats().items() if 'checkouts' in stats}
+    lines.append('# HELP flask_db_pool_connections Connessioni del pool per stato')
+    lines.append('# TYPE flask_db_pool_connections gauge')
+    for pool, pool_stats in pools.items():
+        for state in ('checked_out', 'checked_in', 'overflow'):
+            lines.append(f'flask_db_pool_connections{_format_labels(pool=pool, state=state)} {pool_stats[state]}')
+    lines.append('# HELP flask_db_pool_events_total Checkout, checkin, connessioni aperte e timeout del pool')
+    lines.append('# TYPE flask_db_pool_events_total counter')
+    for pool, pool_stats in pools.items():
+        for event in ('checkouts', 'checkins', 'connects', 'timeouts'):
+            lines.append(f'flask_db_pool_events_total{_format_labels(pool=pool, event=event)} {pool_stats[event]}')
+
+    return '\n'.join(lines) + '\n'
+
+
+@metrics_bp.route('/', methods=['GET'])
+def get_metrics():
+    if not current_app.config.get('METRICS_ENABLED', True):
+        return Response('metrics disabled\n', status=404, mimetype='text/plain')
+    return Response(_render(), mimetype='text/plain; version=0.0.4')
@@ -1,10 +1,13 @@
 from flask import Blueprint, request, jsonify
-from app.controllers.MoviesController import MovieController
+from app.utils.httpCache import conditional_get
 
-# Creiamo il blueprint per organizzare le route dei film
+# Creiamo il blueprint per organizzare le route dei film.
+# Il controller (e quindi i models) si importa alla prima richiesta:
+# registrare il blueprint non costa l'import di SQLAlchemy ORM e dei mapper
 movies_bp = Blueprint('movies', __name__, url_prefix='/api/movies')
 
 @movies_bp.route('/<int:movie_id>', methods=['GET'])
+@conditional_get('CACHE_CONTROL_DETAILS')
 def get_movie_details(movie_id):
     """
     Endpoint per recuperare i dettagli di un film specifico.
@@ -14,18 +17,22 @@ def get_movie_details(movie_id):
     """
     
     # === DELEGAZIONE AL CONTROLLER ===
+    from app.controllers.MoviesController import MovieController
     response_data, status_code = MovieController.get_movie_details(movie_id)
     
     # Restituiamo la risposta HTTP
     return jsonify(response_data), status_code
 
 @movies_bp.route('/suggestions', methods=['GET'])
+@conditional_get('CACHE_CONTROL_SUGGESTIONS')
 def get_movie_suggestions():
     query = request.args.get('q', '').strip()
+    from app.controllers.MoviesController import MovieController
     response_data, status_code = MovieController.get_suggestions(query)
     return jsonify(response_data), status_code
 
 @movies_bp.route('/search', methods=['GET'])
+@conditional_get('CACHE_CONTROL_SEARCH')
 def search_movies():
 
     """
@@ -42,6 +49,9 @@ def search_movies():
     
     filters_raw['title'] = request.args.get('title', '')
     
+    # Ricerca full-text (nome, tagline, descrizione), ordinata per rilevanza
+    filters_raw['q'] = request.args.get('q', '')
+    
     # Parametri numerici (rating)
     filters_raw['min_rating'] = request.args.get('min_rating', type=float)
     filters_raw['max_rating'] = request.args.get('max_rating', type=float)
@@ -57,6 +67,9 @@ def search_movies():
     # Lista generi (può avere valori multipli)
     filters_raw['genre'] = request.args.getlist('genre')
     
+    # Semantica dei generi multipli: all (tutti) oppure any (almeno uno)
+    filters_raw['genre_mode'] = request.args.get('genre_mode', 'all')
+    
     # Filtri booleani
     filters_raw['upcoming'] = request.args.get('upcoming', 'false')
     filters_raw['tvmovie'] = request.args.get('tvmovie', 'false')
@@ -65,16 +78,28 @@ def search_movies():
     filters_raw['sort_by'] = request.args.get('sort_by', 'base')
     filters_raw['order_by'] = request.args.get('order_by', 'desc')
     
+    # Seed per sort_by=random (pagine stabili tra una richiesta e l'altra)
+    filters_raw['seed'] = request.args.get('seed', type=int)
+    
     # Parametri paginazione
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
     
+    # Paginazione a cursore: basta passare ?cursor= (vuoto per la prima pagina)
+    cursor = request.args.get('cursor')
+    
+    # Calcolo del totale: exact (default), estimated oppure none
+    count_mode = request.args.get('count_mode', 'exact')
+    
     # === DELEGAZIONE AL CONTROLLER ===
     
+    from app.controllers.MoviesController import MovieController
     response_data, status_code = MovieController.search_movies(
         filters_raw=filters_raw,
         page=page,
-        per_page=per_page
+        per_page=per_page,
+        cursor=cursor,
+        count_mode=count_mode
     )
     
     # === RISPOSTA HTTP ===
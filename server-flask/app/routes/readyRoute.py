@@ -0,0 +1,14 @@
+from flask import Blueprint, jsonify
+from app.services.Readiness import readiness
+
+ready_bp = Blueprint('ready', __name__, url_prefix='/api/ready')
+
+@ready_bp.route('/', methods=['GET'])
+def ready_check():
+    """
+    Readiness per il load balancer: 503 finché i worker non hanno finito
+    il warmup e durante il drain. Non tocca il database: per quello c'è
+    /api/health.
+    """
+    status = readiness.status()
+    return jsonify(status), 200 if status['ready'] else 503
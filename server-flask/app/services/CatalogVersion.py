@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+
+
+class CatalogVersion:
+    """
+    Versione del dataset caricato, letta dalla tabella catalog_version
+    scritta dal setup del database a ogni caricamento.
+
+    Entra negli ETag delle risposte: quando cambia (reload del catalogo)
+    tutti gli ETag precedenti smettono di corrispondere.
+
+    POST /api/admin/reload raggiunge un solo worker: per questo ogni
+    processo rilegge la versione al massimo ogni CATALOG_VERSION_CHECK_SECONDS
+    e, se è cambiata, esegue in locale gli hook di reload (cache,
+    indice dei suggerimenti, ...).
+    """
+
+    def __init__(self):
+        # Finché non si legge dal database si usa l'avvio del processo:
+        # gli ETag restano validi solo finché il worker è vivo
+        self.value = f"boot-{int(time.time())}"
+        self.loaded_at = None
+        self._next_check = None
+        self._check_lock = threading.Lock()
+
+    def _fetch(self):
+        """(versione, loaded_at) dal database, None se non disponibile."""
+        from app import db
+
+        try:
+            return db.session.execute(
+                db.text("SELECT version, loaded_at FROM catalog_version WHERE id = 1")
+            ).first()
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ Versione del dataset non disponibile: {e}")
+            return None
+
+    def load(self):
+        """Legge la versione dal database. Va chiamato in un application context."""
+        row = self._fetch()
+        if row is not None:
+            self.value, self.loaded_at = row[0], row[1]
+        return self.value
+
+    def init_app(self, app, on_change):
+        """
+        Controlla la versione prima delle richieste, al massimo ogni
+        CATALOG_VERSION_CHECK_SECONDS (0 = mai); se è cambiata chiama
+        on_change (run_reload_hooks). Gira prima della view, quindi prima
+        di cache ed ETag: la richiesta che scopre il cambio non riceve
+        già una risposta della versione precedente.
+        """
+        interval = app.config.get('CATALOG_VERSION_CHECK_SECONDS', 5)
+        if interval <= 0:
+            return
+        self._next_check = time.monotonic() + interval
+
+        @app.before_request
+        def check_catalog_version():
+            if time.monotonic() < self._next_check:
+                return
+            # Un solo thread per worker controlla; gli altri proseguono
+            if not self._check_lock.acquire(blocking=False):
+                return
+            try:
+                self._next_check = time.monotonic() + interval
+                row = self._fetch()
+                if row is not None and row[0] != self.value:
+                    print(f"🔄 Catalogo cambiato ({self.value} -> {row[0]}), reload nel worker {os.getpid()}")
+                    on_change()
+            finally:
+                self._check_lock.release()
+
+
+catalog_version = CatalogVersion()
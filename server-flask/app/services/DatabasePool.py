@@ -0,0 +1,119 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.services.Metrics import metrics
+
+# Engine fuori da Flask-SQLAlchemy (es. asyncpg della modalità asincrona), per nome del pool
+_extra_engines = {}
+
+
+class _PoolInstrumentation:
+    """
+    Contatori di checkout, checkin, nuove connessioni e timeout, più
+    l'istogramma dell'attesa per ottenere una connessione
+    (db_pool_checkout_wait su /api/metrics, etichettato con il nome del pool).
+
+    I contatori finiscono nell'output di /api/health: servono a capire
+    se sotto carico il pool si esaurisce (timeout, overflow al massimo)
+    o se le richieste restano in coda.
+    """
+
+    label = 'default'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._counters = {
+            'checkouts': 0,
+            'checkins': 0,
+            'connects': 0,
+            'timeouts': 0,
+        }
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._counters[name] += 1
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self._count('timeouts')
+            raise
+        finally:
+            metrics.observe('db_pool_checkout_wait', self.label, time.perf_counter() - start)
+        self._count('checkouts')
+        return connection
+
+    def _do_return_conn(self, record):
+        self._count('checkins')
+        return super()._do_return_conn(record)
+
+    def _create_connection(self):
+        self._count('connects')
+        return super()._create_connection()
+
+    def recreate(self):
+        # engine.dispose() sostituisce il pool: il nome resta
+        pool = super().recreate()
+        pool.label = self.label
+        return pool
+
+    def stats(self):
+        with self._stats_lock:
+            counters = dict(self._counters)
+        return {
+            'size': self.size(),
+            'checked_out': self.checkedout(),
+            'checked_in': self.checkedin(),
+            'overflow': self.overflow(),
+            'max_overflow': self._max_overflow,
+            'timeout': self.timeout(),
+            **counters,
+        }
+
+
+class InstrumentedQueuePool(_PoolInstrumentation, QueuePool):
+    """QueuePool instrumentato (psycopg2: primario e repliche)."""
+
+
+class InstrumentedAsyncQueuePool(_PoolInstrumentation, AsyncAdaptedQueuePool):
+    """Pool asyncpg instrumentato della modalità asincrona."""
+
+
+def label_pool(engine, name):
+    """Dà al pool dell'engine il nome usato nelle metriche."""
+    engine.pool.label = name
+
+
+def register_engine(name, engine):
+    """Aggiunge ai report un engine che Flask-SQLAlchemy non conosce."""
+    label_pool(engine, name)
+    _extra_engines[name] = engine
+
+
+def _engines():
+    from app import db
+
+    engines = {('primary' if key is None else key): engine for key, engine in db.engines.items()}
+    engines.update(_extra_engines)
+    return engines
+
+
+def label_app_pools():
+    """Nomi dei pool di Flask-SQLAlchemy: 'primary' e 'replica_N'. In un application context."""
+    for name, engine in _engines().items():
+        label_pool(engine, name)
+
+
+def all_pool_stats():
+    """Stato di ogni pool (primario, repliche, asyncpg), per nome. In un application context."""
+    result = {}
+    for name, engine in sorted(_engines().items()):
+        pool = engine.pool
+        result[name] = pool.stats() if hasattr(pool, 'stats') else {'status': pool.status()}
+    return result
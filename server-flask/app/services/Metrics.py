@@ -0,0 +1,120 @@
+import bisect
+import threading
+
+# Limiti superiori dei bucket degli istogrammi, in secondi
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _ThreadStore:
+    """Contatori di un singolo thread: scritti senza lock solo dal thread proprietario."""
+
+    def __init__(self):
+        self.requests = {}
+        self.histograms = {}
+
+
+class Metrics:
+    """
+    Metriche raccolte in-process con overhead minimo.
+
+    Ogni thread scrive nei propri contatori (nessun lock sul percorso
+    della richiesta); alla lettura di /api/metrics i contatori di tutti
+    i thread vengono copiati e sommati.
+
+    I contatori dei thread terminati (il server di sviluppo crea un thread
+    per richiesta) vengono sommati in un unico store e poi scartati.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._stores = {}
+        self._retired = _ThreadStore()
+        self._stores_lock = threading.Lock()
+
+    def _store(self):
+        store = getattr(self._local, 'store', None)
+        if store is None:
+            store = self._local.store = _ThreadStore()
+            ident = threading.get_ident()
+            with self._stores_lock:
+                self._retire_dead_threads()
+                # Ident riusato da un thread nuovo: il vecchio store è già chiuso
+                previous = self._stores.pop(ident, None)
+                if previous is not None:
+                    self._merge(self._retired, previous)
+                self._stores[ident] = store
+        return store
+
+    def _retire_dead_threads(self):
+        """Con _stores_lock: sposta nello store unico i contatori dei thread terminati."""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._stores if ident not in alive]:
+            self._merge(self._retired, self._stores.pop(ident))
+
+    @staticmethod
+    def _merge(target, store):
+        """Somma i contatori di `store` in `target` (dict.copy() è atomico rispetto al GIL)."""
+        for key, value in store.requests.copy().items():
+            target.requests[key] = target.requests.get(key, 0) + value
+        for key, (buckets, total, count) in store.histograms.copy().items():
+            merged = target.histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+            for i, bucket in enumerate(list(buckets)):
+                merged[0][i] += bucket
+            merged[1] += total
+            merged[2] += count
+
+    # === SCRITTURA (per thread) ===
+
+    def count_request(self, endpoint, method, status):
+        requests = self._store().requests
+        key = (endpoint, method, status)
+        requests[key] = requests.get(key, 0) + 1
+
+    def observe(self, name, label, seconds):
+        """Registra un valore nell'istogramma `name` per l'etichetta `label`."""
+        histograms = self._store().histograms
+        key = (name, label)
+        histogram = histograms.get(key)
+        if histogram is None:
+            # [conteggi per bucket (+Inf in fondo), somma, conteggio]
+            histogram = histograms[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+        histogram[0][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        histogram[1] += seconds
+        histogram[2] += 1
+
+    # === LETTURA (merge dei thread) ===
+
+    def snapshot(self):
+        total = _ThreadStore()
+        with self._stores_lock:
+            self._retire_dead_threads()
+            self._merge(total, self._retired)
+            stores = list(self._stores.values())
+
+        for store in stores:
+            self._merge(total, store)
+
+        return total.requests, total.histograms
+
+    @staticmethod
+    def quantile(buckets, q):
+        """Stima del quantile q dai bucket, con interpolazione lineare nel bucket."""
+        total = sum(buckets)
+        if total == 0:
+            return None
+
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(buckets):
+            if count and seen + count >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i > 0 else 0.0
+                if i >= len(LATENCY_BUCKETS):
+                    return lower
+                upper = LATENCY_BUCKETS[i]
+                return lower + (upper - lower) * ((rank - seen) / count)
+            seen += count
+        return LATENCY_BUCKETS[-1]
+
+
+metrics = Metrics()
+
@@ -0,0 +1,87 @@
+import os
+
+
+class Readiness:
+    """
+    Stato di prontezza del servizio, distinto dalla salute (/api/health).
+
+    Con il launcher di produzione (gunicorn.conf.py) il master crea, prima
+    del fork, una tabella condivisa con i pid dei worker che hanno finito
+    il warmup: /api/ready risponde 200 quando almeno min_ready_workers
+    worker vivi sono pronti (default 1: un worker riciclato da gunicorn non
+    toglie l'istanza dal load balancer) e il worker che risponde non sta
+    chiudendo (drain dopo SIGTERM). Un worker che muore senza passare dal drain (SIGKILL,
+    timeout, crash) viene tolto dal master quando ne raccoglie l'uscita.
+
+    Con il server di sviluppo (run.py) non c'è warmup: è subito pronto.
+    """
+
+    def __init__(self):
+        self.state = 'ready'
+        self.expected_workers = None
+        self.min_ready_workers = None
+        self._ready_pids = None
+
+    def share(self, expected_workers, min_ready_workers=1):
+        """Nel master, prima del fork: i worker partono in stato 'starting'."""
+        import multiprocessing
+        
+        self.expected_workers = expected_workers
+        self.min_ready_workers = max(1, min(min_ready_workers, expected_workers))
+        # Posti anche per i sostituti che partono mentre un worker chiude
+        self._ready_pids = multiprocessing.Array('i', expected_workers * 2)
+        self.state = 'starting'
+
+    def mark_ready(self):
+        """Chiamato da ogni worker alla fine del warmup."""
+        if self._ready_pids is not None:
+            pid = os.getpid()
+            with self._ready_pids.get_lock():
+                if pid not in self._ready_pids[:]:
+                    for i, slot in enumerate(self._ready_pids):
+                        if slot == 0:
+                            self._ready_pids[i] = pid
+                            break
+        self.state = 'ready'
+
+    def start_drain(self):
+        """SIGTERM ricevuto: il worker serve ancora, ma non è più pronto."""
+        self.state = 'draining'
+        self._leave(os.getpid())
+
+    def _leave(self, pid):
+        if self._ready_pids is None:
+            return
+        with self._ready_pids.get_lock():
+            for i, slot in enumerate(self._ready_pids):
+                if slot == pid:
+                    self._ready_pids[i] = 0
+
+    def worker_exit(self, pid):
+        """Nel master, all'uscita di un worker (anche se ucciso o in timeout)."""
+        self._leave(pid)
+
+    @property
+    def ready_workers(self):
+        if self._ready_pids is None:
+            return None
+        with self._ready_pids.get_lock():
+            return sum(1 for slot in self._ready_pids if slot)
+
+    def is_ready(self):
+        if self.state != 'ready':
+            return False
+        return self._ready_pids is None or self.ready_workers >= self.min_ready_workers
+
+    def status(self):
+        return {
+            'ready': self.is_ready(),
+            'state': self.state,
+            'ready_workers': self.ready_workers,
+            'expected_workers': self.expected_workers,
+            'min_ready_workers': self.min_ready_workers,
+            'pid': os.getpid(),
+        }
+
+
+readiness = Readiness()
@@ -0,0 +1,56 @@
+"""
+Registro degli hook da eseguire dopo un reload del catalogo.
+
+Le componenti che tengono in memoria una copia dei dati (indice dei
+suggerimenti, cache, ...) si registrano qui; lo script di setup del
+database, a fine caricamento, chiama POST /api/admin/reload e tutti
+gli hook vengono eseguiti in ordine di registrazione.
+
+Con più worker la chiamata ne raggiunge uno solo: gli altri eseguono
+gli hook quando vedono cambiare la versione del catalogo (CatalogVersion).
+"""
+
+_hooks = []
+
+# Esecutore degli hook pesanti (offload=True); None = nel thread corrente
+_offload = None
+
+
+def register_reload_hook(name, hook, offload=False):
+    """
+    Registra una funzione senza argomenti da chiamare dopo un reload.
+    Con offload=True l'hook apre da sé il proprio application context e
+    può girare fuori dal thread della richiesta (vedi set_reload_offload).
+    """
+    _hooks.append((name, hook, offload))
+
+
+def set_reload_offload(runner):
+    """
+    Imposta la funzione che esegue gli hook con offload=True: la modalità
+    asincrona li manda in un thread, per non bloccare il loop.
+    """
+    global _offload
+    _offload = runner
+
+
+def run_reload_hooks():
+    """
+    Esegue tutti gli hook registrati. Un hook che fallisce non blocca
+    gli altri.
+
+    Returns:
+        dict: esito per ogni hook ('ok' oppure il messaggio di errore)
+    """
+    results = {}
+    for name, hook, offload in _hooks:
+        try:
+            if offload and _offload is not None:
+                _offload(hook)
+            else:
+                hook()
+            results[name] = 'ok'
+        except Exception as e:
+            print(f"❌ Errore nell'hook di reload '{name}': {str(e)}")
+            results[name] = str(e)
+    return results
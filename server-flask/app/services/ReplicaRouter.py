@@ -0,0 +1,198 @@
+import functools
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+# Ritardo di una replica: 0 se non è in recovery (copia indipendente, utile
+# nei test con due Postgres locali) o se ha già applicato tutto il WAL ricevuto
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class ReplicaRouter:
+    """
+    Instrada le letture del catalogo sulle repliche in lettura.
+
+    Le repliche sono i bind 'replica_N' di Flask-SQLAlchemy (uno per URI di
+    POSTGRES_REPLICA_URIS). Dentro un blocco `reads()` la RoutingSession
+    manda le SELECT alla replica scelta in round-robin tra quelle sane;
+    scritture e flush vanno sempre al primario, così come tutto ciò che
+    sta fuori dal blocco.
+
+    Un thread controlla periodicamente ogni replica: se non risponde o il
+    ritardo supera REPLICA_MAX_LAG_SECONDS viene esclusa, e rientra al
+    primo controllo riuscito. Un errore di connessione durante una query
+    la esclude subito. Senza repliche sane si legge dal primario.
+    """
+
+    def __init__(self):
+        self.engines = {}
+        self.routes = {}
+        self.max_lag = 5.0
+        self.interval = 2.0
+
+        self._status = {}
+        self._healthy = []
+        self._cycle = iter(())
+        self._lock = threading.Lock()
+        self._current = ContextVar('replica', default=None)
+        self._checker_pid = None
+
+    def init_app(self, app, db):
+        self.max_lag = app.config.get('REPLICA_MAX_LAG_SECONDS', 5.0)
+        self.interval = app.config.get('REPLICA_HEALTH_INTERVAL', 2.0)
+
+        with app.app_context():
+            self.engines = {
+                name: engine for name, engine in db.engines.items()
+                if isinstance(name, str) and name.startswith('replica_')
+            }
+
+        for name, engine in self.engines.items():
+            self._status[name] = {'healthy': True, 'lag_seconds': None, 'error': None, 'checked_at': None}
+        self.route_to(self.engines)
+        self._set_healthy(list(self.engines))
+
+        if self.engines:
+            print(f"✅ Letture instradate su {len(self.engines)} repliche: {sorted(self.engines)}")
+
+    @property
+    def enabled(self):
+        return bool(self.engines)
+
+    # === SCELTA DELLA REPLICA ===
+
+    @contextmanager
+    def reads(self):
+        """Le SELECT del blocco vanno a una sola replica, scelta all'ingresso."""
+        if not self.engines or self._current.get() is not None:
+            # Nessuna replica, oppure blocco annidato: resta sulla scelta esterna
+            yield self._current.get()
+            return
+
+        self._ensure_checker()
+        name = self._choose()
+        token = self._current.set(name)
+        try:
+            yield name
+        finally:
+            self._current.reset(token)
+
+    def route_to(self, routes):
+        """
+        Engine a cui mandare le letture, per nome di replica. Di default sono
+        quelli di Flask-SQLAlchemy; la modalità asincrona passa i propri
+        (i controlli di salute restano sugli engine sincroni).
+        """
+        self.routes = dict(routes)
+        for name, engine in self.routes.items():
+            self._listen_errors(name, engine)
+
+    def current_engine(self):
+        name = self._current.get()
+        return self.routes.get(name) if name else None
+
+    def _choose(self):
+        with self._lock:
+            return next(self._cycle, None)
+
+    def _set_healthy(self, names):
+        with self._lock:
+            if names != self._healthy:
+                self._healthy = names
+                self._cycle = itertools.cycle(names) if names else iter(())
+
+    # === CONTROLLI DI SALUTE ===
+
+    def _listen_errors(self, name, engine):
+        @event.listens_for(engine, 'handle_error')
+        def eject_on_disconnect(context):
+            # connection None = connessione non riuscita
+            if context.is_disconnect or context.connection is None:
+                self._mark(name, healthy=False, error=str(context.original_exception))
+
+    def _mark(self, name, healthy, lag=None, error=None):
+        status = self._status[name]
+        if status['healthy'] != healthy:
+            print(f"{'✅ Replica reintegrata' if healthy else '⚠️ Replica esclusa'}: {name}"
+                  f"{'' if healthy else f' ({error})'}")
+
+        status.update(healthy=healthy, lag_seconds=lag, error=error, checked_at=time.time())
+        self._set_healthy([n for n in self.engines if self._status[n]['healthy']])
+
+    def check(self):
+        """Controlla tutte le repliche una volta."""
+        for name, engine in self.engines.items():
+            try:
+                with engine.connect() as conn:
+                    lag = float(conn.exec_driver_sql(REPLICA_LAG_SQL).scalar())
+            except Exception as e:
+                self._mark(name, healthy=False, error=str(e).splitlines()[0])
+                continue
+
+            if lag > self.max_lag:
+                self._mark(name, healthy=False, lag=lag, error=f"ritardo {lag:.1f}s oltre {self.max_lag}s")
+            else:
+                self._mark(name, healthy=True, lag=lag)
+
+    def _ensure_checker(self):
+        # Avviato alla prima lettura e di nuovo dopo un fork: i thread non passano ai figli
+        if self._checker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._checker_pid == os.getpid():
+                return
+            self._checker_pid = os.getpid()
+        threading.Thread(target=self._run_checker, name='replica-health', daemon=True).start()
+
+    def _run_checker(self):
+        while True:
+            self.check()
+            time.sleep(self.interval)
+
+    def stats(self):
+        return {
+            'replicas': {name: dict(status) for name, status in self._status.items()},
+            'healthy': list(self._healthy),
+        }
+
+
+replica_router = ReplicaRouter()
+
+
+def replica_reads(func):
+    """Esegue la funzione dentro un blocco replica_router.reads()."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with replica_router.reads():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRoutingMixin:
+    """
+    Dentro replica_router.reads() manda le letture alla replica scelta.
+    Flush e istruzioni DML restano sul primario anche dentro il blocco.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not getattr(clause, 'is_dml', False):
+            engine = replica_router.current_engine()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class RoutingSession(ReplicaRoutingMixin, Session):
+    """Session di Flask-SQLAlchemy con l'instradamento sulle repliche."""
@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUTTLCache:
+    """
+    Cache LRU con scadenza (TTL) e dimensione massima, thread-safe.
+
+    Le voci più vecchie vengono scartate quando si supera maxsize,
+    quelle scadute al primo accesso successivo alla scadenza.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Restituisce il valore in cache oppure None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+class ResponseCache:
+    """
+    Cache delle risposte degli endpoint dei film, una LRUTTLCache per
+    endpoint ('details', 'suggestions', 'search') con limiti propri.
+
+    Il catalogo è in sola lettura in produzione: le voci vengono
+    invalidate esplicitamente dopo un reload del database (hook di reload)
+    oppure alla scadenza del TTL.
+    """
+
+    ENDPOINTS = ('details', 'suggestions', 'search')
+
+    def __init__(self):
+        self.enabled = False
+        self._caches = {}
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', False)
+        self._caches = {
+            endpoint: LRUTTLCache(
+                maxsize=app.config.get(f'RESPONSE_CACHE_{endpoint.upper()}_SIZE', 1000),
+                ttl=app.config.get(f'RESPONSE_CACHE_{endpoint.upper()}_TTL', 600),
+            )
+            for endpoint in self.ENDPOINTS
+        }
+
+    def get(self, endpoint, key):
+        if not self.enabled:
+            return None
+        return self._caches[endpoint].get(key)
+
+    def set(self, endpoint, key, value):
+        if self.enabled:
+            self._caches[endpoint].set(key, value)
+
+    def clear(self, endpoint=None):
+        """Invalida un endpoint, oppure tutta la cache se endpoint è None."""
+        targets = [endpoint] if endpoint else list(self._caches)
+        for name in targets:
+            self._caches[name].clear()
+
+    def reset_stats(self):
+        """Azzera i contatori senza toccare le voci (es. dopo il warmup)."""
+        for cache in self._caches.values():
+            cache.reset_stats()
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'endpoints': {name: cache.stats() for name, cache in self._caches.items()},
+        }
+
+
+response_cache = ResponseCache()
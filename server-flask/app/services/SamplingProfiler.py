@@ -0,0 +1,208 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SamplingProfiler:
+    """
+    Profiler a campionamento attivabile a runtime, senza riavviare il worker.
+
+    Finché è attivo, un thread separato legge ogni PROFILER_INTERVAL_MS lo
+    stack dei thread che stanno servendo una richiesta (sys._current_frames)
+    e conta gli stack per route (es. 'movies.search_movies'). Alla fine
+    scrive un file "collapsed stack" per route, pronto per flamegraph.pl
+    o speedscope.
+
+    Si ferma dopo N richieste profilate o dopo N secondi, a seconda di
+    come è stato avviato. Quando è spento costa un controllo di un booleano
+    per richiesta.
+    """
+
+    def __init__(self):
+        self.output_dir = 'profiles'
+        self.interval = 0.005
+        self.active = False
+        self.enabled = True
+
+        self._lock = threading.Lock()
+        self._threads = {}
+        self._stacks = {}
+        self._samples = 0
+        self._remaining_requests = None
+        self._deadline = None
+        self._stop_event = threading.Event()
+        self._sampler = None
+        self._started_at = None
+        self._pid = None
+        self._pending = None
+        self.last_output = []
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PROFILER_ENABLED', True)
+        if not self.enabled:
+            return
+        self.output_dir = app.config.get('PROFILER_OUTPUT_DIR', 'profiles')
+        self.interval = app.config.get('PROFILER_INTERVAL_MS', 5) / 1000
+
+        @app.before_request
+        def profiler_enter():
+            if self._pending is not None:
+                self._start_pending()
+            if self.active:
+                from flask import request
+                self._threads[threading.get_ident()] = request.endpoint or 'unknown'
+
+        @app.teardown_request
+        def profiler_exit(exc):
+            if self.active and self._threads.pop(threading.get_ident(), None) is not None:
+                self._request_done()
+
+        # Avvio da variabile d'ambiente: PROFILE_NEXT_REQUESTS o PROFILE_SECONDS.
+        # Parte alla prima richiesta di ogni processo: con il preload di
+        # gunicorn init_app gira nel master, e il thread non passa ai worker
+        requests = app.config.get('PROFILE_NEXT_REQUESTS')
+        seconds = app.config.get('PROFILE_SECONDS')
+        if requests or seconds:
+            self._pending = (requests, seconds)
+
+    def _start_pending(self):
+        with self._lock:
+            pending = self._pending
+            if pending is None:
+                return
+            self._pending = None
+        requests, seconds = pending
+        try:
+            self.start(requests=requests, seconds=seconds)
+        except RuntimeError:
+            pass
+
+    # === CONTROLLO ===
+
+    def start(self, requests=None, seconds=None):
+        """
+        Avvia il profiling per le prossime `requests` richieste oppure per
+        `seconds` secondi (se indicati entrambi, vale il primo che scade).
+        """
+        if not self.enabled:
+            raise RuntimeError('Profiler disabilitato (PROFILER_ENABLED)')
+        if not requests and not seconds:
+            raise ValueError('Indicare un numero di richieste o di secondi')
+
+        with self._lock:
+            self._check_fork()
+            if self.active:
+                raise RuntimeError('Profiler già attivo')
+
+            self._stacks = {}
+            self._samples = 0
+            self._remaining_requests = int(requests) if requests else None
+            self._deadline = time.monotonic() + float(seconds) if seconds else None
+            self._started_at = time.time()
+            self._stop_event.clear()
+            self.active = True
+            self._pid = os.getpid()
+
+            self._sampler = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._sampler.start()
+
+        print(f"🔬 Profiler attivo (richieste={requests}, secondi={seconds})")
+
+    def _check_fork(self):
+        """
+        In un processo figlio lo stato attivo ereditato non ha più il suo
+        thread di campionamento: si riparte da spento.
+        """
+        if self.active and self._pid != os.getpid():
+            self.active = False
+            self._sampler = None
+            self._threads.clear()
+
+    def stop(self):
+        """Ferma il profiling e attende la scrittura dei file."""
+        with self._lock:
+            self._check_fork()
+        self._stop_event.set()
+        sampler = self._sampler
+        if sampler is not None and sampler is not threading.current_thread():
+            sampler.join()
+        return self.last_output
+
+    def _request_done(self):
+        with self._lock:
+            if self._remaining_requests is None:
+                return
+            self._remaining_requests -= 1
+            if self._remaining_requests <= 0:
+                self._stop_event.set()
+
+    def status(self):
+        with self._lock:
+            self._check_fork()
+        return {
+            'enabled': self.enabled,
+            'active': self.active,
+            'samples': self._samples,
+            'remaining_requests': self._remaining_requests,
+            'seconds_left': (
+                round(max(0.0, self._deadline - time.monotonic()), 1)
+                if self.active and self._deadline else None
+            ),
+            'routes': sorted(self._stacks),
+            'last_output': self.last_output,
+        }
+
+    # === CAMPIONAMENTO ===
+
+    @staticmethod
+    def _frame_label(frame):
+        code = frame.f_code
+        module = frame.f_globals.get('__name__', '?')
+        return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+    def _sample(self):
+        frames = sys._current_frames()
+        for thread_id, endpoint in self._threads.copy().items():
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            stack.reverse()
+
+            self._stacks.setdefault(endpoint, Counter())[';'.join(stack)] += 1
+            self._samples += 1
+
+    def _run(self):
+        try:
+            while not self._stop_event.wait(self.interval):
+                if self._deadline is not None and time.monotonic() >= self._deadline:
+                    break
+                self._sample()
+        finally:
+            self.active = False
+            self._threads.clear()
+            self.last_output = self._write_output()
+            print(f"🔬 Profiler fermato: {self._samples} campioni, file: {self.last_output}")
+
+    def _write_output(self):
+        """Un file collapsed stack per route: 'frame;frame;frame conteggio'."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = time.strftime('%Y%m%d-%H%M%S', time.localtime(self._started_at))
+
+        paths = []
+        for endpoint, stacks in self._stacks.items():
+            path = os.path.join(self.output_dir, f"{prefix}-{endpoint}.collapsed")
+            with open(path, 'w', encoding='utf-8') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            paths.append(path)
+        return paths
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,90 @@
+import threading
+
+
+class _Call:
+    """Esecuzione in corso condivisa tra le chiamate identiche."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalescenza delle richieste identiche concorrenti (single-flight).
+
+    La prima chiamata con una certa chiave (il "leader") esegue davvero la
+    funzione; le chiamate con la stessa chiave che arrivano mentre è ancora
+    in corso aspettano e ricevono lo stesso risultato (o la stessa
+    eccezione), senza una seconda query al database.
+
+    Vale all'interno di un singolo worker: i thread dello stesso processo
+    condividono le esecuzioni, processi diversi no.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._executions = {}
+        self._coalesced = {}
+
+    def init_app(self, app):
+        self.enabled = app.config.get('SINGLE_FLIGHT_ENABLED', True)
+
+    def do(self, group, key, fn):
+        """
+        Esegue fn() una sola volta per le chiamate concorrenti con la stessa
+        chiave nello stesso gruppo (es. 'search').
+
+        Il risultato viene condiviso tra i chiamanti: non va modificato.
+        """
+        if not self.enabled:
+            return fn()
+
+        flight_key = (group, key)
+
+        with self._lock:
+            call = self._calls.get(flight_key)
+            leader = call is None
+            if leader:
+                call = self._calls[flight_key] = _Call()
+                self._executions[group] = self._executions.get(group, 0) + 1
+            else:
+                self._coalesced[group] = self._coalesced.get(group, 0) + 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[flight_key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            groups = set(self._executions) | set(self._coalesced)
+            return {
+                'enabled': self.enabled,
+                'in_flight': len(self._calls),
+                'groups': {
+                    group: {
+                        'executions': self._executions.get(group, 0),
+                        'coalesced': self._coalesced.get(group, 0),
+                    }
+                    for group in sorted(groups)
+                },
+            }
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,159 @@
+import threading
+import time
+from array import array
+
+
+class SuggestionIndex:
+    """
+    Motore di suggerimenti in memoria per /api/movies/suggestions.
+
+    All'avvio carica (id, name, date, rating, primo poster) di tutti i film
+    in array compatti, già ordinati come la query SQL originale
+    (rating desc nulls last, name asc). Su questi costruisce un indice
+    a trigrammi: ogni trigramma punta alla lista delle posizioni dei film
+    che lo contengono.
+
+    Poiché le posizioni sono già in ordine di ranking, il top-k si ottiene
+    scorrendo la posting list più corta e fermandosi ai primi k match:
+    niente sort a ogni battitura.
+    """
+
+    NO_DATE = -1
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.loaded_at = None
+        self.build_time_ms = None
+
+    # === COSTRUZIONE ===
+
+    def load(self):
+        """
+        Legge il catalogo dal database e ricostruisce l'indice.
+        Va chiamato dentro un application context.
+
+        Il nuovo snapshot viene costruito a parte e poi sostituito in un
+        solo assegnamento, così le richieste in corso non vedono mai
+        un indice a metà.
+        """
+        from app import db
+
+        with self._lock:
+            start = time.perf_counter()
+
+            # L'ordinamento lo fa Postgres, così il ranking (e la collation
+            # dei nomi) è identico a quello del percorso SQL
+            rows = db.session.execute(db.text("""
+                SELECT m.id, m.name, m.date, m.rating,
+                       (SELECT p.link FROM posters p
+                         WHERE p.id_movie = m.id
+                         ORDER BY p.id LIMIT 1) AS poster_url
+                FROM movies m
+                WHERE m.name IS NOT NULL AND m.name <> ''
+                ORDER BY m.rating DESC NULLS LAST, m.name ASC
+            """))
+
+            ids = array('q')
+            dates = array('q')
+            names = []
+            lower_names = []
+            posters = []
+            trigrams = {}
+
+            for position, (movie_id, name, date, rating, poster_url) in enumerate(rows):
+                ids.append(movie_id)
+                dates.append(int(date) if date else self.NO_DATE)
+                names.append(name)
+                posters.append(poster_url)
+
+                lower_name = name.lower()
+                lower_names.append(lower_name)
+
+                for gram in self._trigrams(lower_name):
+                    postings = trigrams.get(gram)
+                    if postings is None:
+                        postings = trigrams[gram] = array('I')
+                    postings.append(position)
+
+            self._snapshot = (ids, dates, names, lower_names, posters, trigrams)
+            self.loaded_at = time.time()
+            self.build_time_ms = round((time.perf_counter() - start) * 1000, 1)
+
+            print(f"✅ Indice suggerimenti caricato: {len(ids):,} film, "
+                  f"{len(trigrams):,} trigrammi in {self.build_time_ms}ms")
+
+    def refresh(self):
+        """Hook da chiamare dopo un reload del database."""
+        self.load()
+
+    def clear(self):
+        self._snapshot = None
+        self.loaded_at = None
+
+    @property
+    def ready(self):
+        return self._snapshot is not None
+
+    @staticmethod
+    def _trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    # === RICERCA ===
+
+    def search(self, query, limit=5):
+        """
+        Restituisce i primi `limit` film il cui nome contiene `query`
+        (case-insensitive, come ILIKE '%query%').
+
+        Returns:
+            list: dizionari nello stesso formato di _format_suggestions
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError('Indice suggerimenti non caricato')
+
+        ids, dates, names, lower_names, posters, trigrams = snapshot
+        needle = query.lower()
+
+        if len(needle) >= 3:
+            # La posting list più corta è quella con meno candidati da verificare
+            candidates = None
+            for gram in self._trigrams(needle):
+                postings = trigrams.get(gram)
+                if postings is None:
+                    return []
+                if candidates is None or len(postings) < len(candidates):
+                    candidates = postings
+        else:
+            # Query di 2 caratteri: scansione in ordine di ranking,
+            # i match popolari arrivano quasi subito
+            candidates = range(len(lower_names))
+
+        results = []
+        for position in candidates:
+            if needle in lower_names[position]:
+                date = dates[position]
+                results.append({
+                    'id': ids[position],
+                    'name': names[position],
+                    'date': date if date != self.NO_DATE else None,
+                    'poster_url': posters[position],
+                })
+                if len(results) >= limit:
+                    break
+
+        return results
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            'ready': snapshot is not None,
+            'movies': len(snapshot[0]) if snapshot else 0,
+            'trigrams': len(snapshot[5]) if snapshot else 0,
+            'loaded_at': self.loaded_at,
+            'build_time_ms': self.build_time_ms,
+        }
+
+
+suggestion_index = SuggestionIndex()
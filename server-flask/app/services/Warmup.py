@@ -0,0 +1,82 @@
+import time
+from urllib.parse import urlencode
+
+from app import db
+from app.services.ResponseCache import response_cache
+
+# Chiave dell'environ WSGI che marca le richieste di warmup: non entrano
+# nelle metriche e sono segnalate nel log delle richieste
+WARMUP_ENVIRON_KEY = 'movies.warmup'
+
+# Richieste più frequenti: riempiono la cache delle risposte e la cache delle
+# query compilate di SQLAlchemy, e caricano i moduli importati al primo uso
+WARMUP_SUGGESTIONS = ['th', 'the', 'love', 'night', 'star']
+WARMUP_SEARCHES = [
+    {},
+    {'sort_by': 'rating', 'order_by': 'desc'},
+    {'sort_by': 'date', 'order_by': 'desc'},
+    {'sort_by': 'name', 'order_by': 'asc'},
+    {'sort_by': 'duration', 'order_by': 'desc'},
+    {'sort_by': 'random', 'seed': 1},
+    {'genre': ['dramma']},
+    {'title': 'the'},
+]
+
+
+def _open_pool(engine, size):
+    """Apre `size` connessioni e le restituisce al pool, pronte per le richieste."""
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def _top_movie_ids(n):
+    return [row[0] for row in db.session.execute(db.text(
+        "SELECT id FROM movies WHERE name IS NOT NULL AND name <> '' "
+        "ORDER BY rating DESC NULLS LAST, id LIMIT :n"
+    ), {'n': n})]
+
+
+def warmup(app):
+    """
+    Prepara un worker appena creato, prima che accetti traffico:
+    1. scarta le connessioni ereditate dal master (non vanno condivise
+       tra processi) e apre il pool;
+    2. esegue le richieste più frequenti, compilando le query e
+       riempiendo le cache;
+    3. legge i dettagli dei film più popolari.
+
+    Le risposte restano nella cache, ma i suoi contatori (hit/miss) ripartono
+    da zero. Gli errori non bloccano l'avvio: un worker freddo è meglio di
+    nessun worker.
+    """
+    start = time.perf_counter()
+    requests = 0
+
+    try:
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+            _open_pool(db.engine, app.config.get('DB_POOL_SIZE', 5))
+            movie_ids = _top_movie_ids(app.config.get('WARMUP_TOP_MOVIES', 20))
+
+        client = app.test_client()
+        urls = [f'/api/movies/suggestions?{urlencode({"q": q})}' for q in WARMUP_SUGGESTIONS]
+        urls += [f'/api/movies/search?{urlencode(params, doseq=True)}' for params in WARMUP_SEARCHES]
+        urls += [f'/api/movies/{movie_id}' for movie_id in movie_ids]
+
+        for url in urls:
+            client.get(url, environ_base={WARMUP_ENVIRON_KEY: True})
+            requests += 1
+    except Exception as e:
+        print(f"⚠️ Warmup incompleto dopo {requests} richieste: {e}")
+    finally:
+        response_cache.reset_stats()
+
+    elapsed = time.perf_counter() - start
+    print(f"🔥 Warmup completato: {requests} richieste in {elapsed:.2f}s")
+    return elapsed
@@ -0,0 +1,76 @@
+import hashlib
+from functools import wraps
+from flask import current_app, make_response, request
+from app.services.CatalogVersion import catalog_version
+
+
+def _request_key():
+    """Path più parametri in ordine canonico: stessi parametri, stessa chiave."""
+    args = sorted(request.args.items(multi=True))
+    return request.path + '?' + '&'.join(f"{key}={value}" for key, value in args)
+
+
+def parse_seed(value):
+    """
+    Seed dell'ordinamento casuale: intero in [0, 2^31), altrimenti None.
+    Usato anche da MovieController, così ETag e controller concordano su
+    quali richieste random sono ripetibili.
+    """
+    try:
+        seed = int(value)
+    except (ValueError, TypeError):
+        return None
+    return seed if 0 <= seed < 2**31 else None
+
+
+def _is_cacheable():
+    # sort_by=random senza un seed valido restituisce pagine diverse a ogni richiesta
+    return not (request.args.get('sort_by') == 'random' and parse_seed(request.args.get('seed')) is None)
+
+
+def conditional_get(cache_control_setting):
+    """
+    Decoratore per le route GET dei film: ETag forte e richieste condizionali.
+
+    L'ETag è l'hash della versione del dataset e della chiave della
+    richiesta, quindi si calcola senza toccare il database: se il client
+    manda If-None-Match con lo stesso ETag si risponde 304 prima di
+    eseguire qualsiasi query.
+
+    Args:
+        cache_control_setting (str): chiave di configurazione con il valore
+            dell'header Cache-Control per questa route
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('HTTP_ETAGS_ENABLED', True):
+                return view(*args, **kwargs)
+
+            if not _is_cacheable():
+                response = make_response(view(*args, **kwargs))
+                response.headers['Cache-Control'] = 'no-store'
+                return response
+
+            cache_control = current_app.config.get(cache_control_setting, 'no-cache')
+            etag = hashlib.sha1(
+                f"{catalog_version.value}|{_request_key()}".encode('utf-8')
+            ).hexdigest()
+
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = cache_control
+                return response
+
+            response = make_response(view(*args, **kwargs))
+
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = cache_control
+            else:
+                response.headers['Cache-Control'] = 'no-store'
+
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,184 @@
+import json
+import logging
+import time
+from collections import Counter
+from functools import wraps
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.services.Warmup import WARMUP_ENVIRON_KEY
+
+request_logger = logging.getLogger('movies.requests')
+
+_engine_listeners_installed = False
+
+
+def _current():
+    """Statistiche della richiesta corrente, None fuori da una richiesta."""
+    if not has_request_context():
+        return None
+    return g.get('_instrumentation')
+
+
+# === EVENTI SQLALCHEMY ===
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info['_query_start'].pop()
+    stats = _current()
+    if stats is None:
+        return
+
+    stats['queries'] += 1
+    stats['db_ms'] += (time.perf_counter() - start) * 1000
+    # Con psycopg2 (cursore lato client) rowcount di una SELECT = righe lette
+    if cursor.rowcount and cursor.rowcount > 0:
+        stats['rows'] += cursor.rowcount
+    stats['statements'][statement] += 1
+
+
+def _handle_error(context):
+    # Statement fallito (es. statement_timeout): after_cursor_execute non arriva
+    conn = context.connection
+    if conn is not None and conn.info.get('_query_start'):
+        conn.info['_query_start'].pop()
+
+
+def _install_engine_listeners():
+    global _engine_listeners_installed
+    if _engine_listeners_installed:
+        return
+    # Listener sulla classe Engine: valgono anche per gli engine creati
+    # in modo lazy da Flask-SQLAlchemy
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Engine, 'handle_error', _handle_error)
+    _engine_listeners_installed = True
+
+
+# === FASI APPLICATIVE ===
+
+def instrumented(stage):
+    """
+    Decoratore che somma il tempo della funzione alla fase `stage`
+    della richiesta corrente (es. 'format' per i metodi _format_*).
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            stats = _current()
+            if stats is None:
+                return fn(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stats['stages'][stage] += (time.perf_counter() - start) * 1000
+        return wrapper
+    return decorator
+
+
+class InstrumentedJSONProvider(DefaultJSONProvider):
+    """Provider JSON di Flask che misura il tempo di codifica di jsonify."""
+
+    def response(self, *args, **kwargs):
+        stats = _current()
+        if stats is None:
+            return super().response(*args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            stats['stages']['json'] += (time.perf_counter() - start) * 1000
+
+
+# === HOOK DELLE RICHIESTE ===
+
+def init_instrumentation(app):
+    """
+    Collega la strumentazione all'app: per ogni richiesta conta query,
+    tempo sul database, righe lette, tempo di formattazione e di codifica
+    JSON. Li restituisce nell'header Server-Timing e in una riga di log
+    JSON; oltre SQL_STATEMENT_WARN_THRESHOLD query segnala un possibile N+1.
+    """
+    if not app.config.get('INSTRUMENTATION_ENABLED', True):
+        return
+
+    _install_engine_listeners()
+    app.json = InstrumentedJSONProvider(app)
+
+    if not request_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        request_logger.addHandler(handler)
+        request_logger.setLevel(logging.INFO)
+        request_logger.propagate = False
+
+    threshold = app.config.get('SQL_STATEMENT_WARN_THRESHOLD', 10)
+    server_timing = app.config.get('SERVER_TIMING_ENABLED', True)
+
+    @app.before_request
+    def start_instrumentation():
+        g._instrumentation = {
+            'start': time.perf_counter(),
+            'queries': 0,
+            'db_ms': 0.0,
+            'rows': 0,
+            'statements': Counter(),
+            'stages': Counter(),
+        }
+
+    @app.after_request
+    def finish_instrumentation(response):
+        stats = _current()
+        if stats is None:
+            return response
+
+        total_ms = (time.perf_counter() - stats['start']) * 1000
+        format_ms = stats['stages']['format']
+        json_ms = stats['stages']['json']
+
+        if server_timing:
+            response.headers['Server-Timing'] = ', '.join([
+                f'db;dur={stats["db_ms"]:.2f};desc="{stats["queries"]} queries"',
+                f'format;dur={format_ms:.2f}',
+                f'json;dur={json_ms:.2f}',
+                f'total;dur={total_ms:.2f}',
+            ])
+
+        record = {
+            'method': request.method,
+            'endpoint': request.endpoint,
+            'path': request.full_path.rstrip('?'),
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'queries': stats['queries'],
+            'db_ms': round(stats['db_ms'], 2),
+            'rows': stats['rows'],
+            'format_ms': round(format_ms, 2),
+            'json_ms': round(json_ms, 2),
+        }
+        if request.environ.get(WARMUP_ENVIRON_KEY):
+            record['warmup'] = True
+        request_logger.info(json.dumps(record))
+
+        if stats['queries'] > threshold:
+            statement, repeats = stats['statements'].most_common(1)[0]
+            request_logger.warning(json.dumps({
+                'warning': 'possible_n_plus_one',
+                'endpoint': request.endpoint,
+                'queries': stats['queries'],
+                'threshold': threshold,
+                'most_repeated': ' '.join(statement.split())[:200],
+                'repeats': repeats,
+            }))
+
+        return response
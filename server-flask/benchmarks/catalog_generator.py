@@ -0,0 +1,206 @@
+"""
+Generatore di un catalogo sintetico per i benchmark.
+
+Scrive i CSV esattamente nel formato letto da
+PostgreSQLSetup.load_csv_data (stessi nomi di file, stesso ordine delle
+colonne, riga di intestazione), con una distribuzione dei correlati
+simile al dataset reale: molti film "minori" senza rating né cast,
+pochi film con cast e crew numerosi, un poster quasi per tutti,
+Oscar rari.
+
+Uso (dalla cartella server-flask):
+    python -m benchmarks.catalog_generator --movies 100000 --output ../data_bench
+    python -m benchmarks.catalog_generator --scale 1m --output ../data_bench
+"""
+import argparse
+import csv
+import os
+import random
+import time
+
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+GENRES = [
+    'Drama', 'Comedy', 'Thriller', 'Action', 'Romance', 'Horror', 'Crime',
+    'Adventure', 'Science Fiction', 'Family', 'Fantasy', 'Mystery', 'Animation',
+    'Documentary', 'History', 'Music', 'War', 'Western', 'TV Movie',
+]
+GENRE_WEIGHTS = [30, 22, 12, 11, 10, 8, 8, 6, 5, 5, 5, 4, 4, 9, 3, 3, 2, 2, 2]
+
+COUNTRIES = ['USA', 'UK', 'France', 'Italy', 'Germany', 'Japan', 'India', 'Canada',
+             'Spain', 'South Korea', 'Australia', 'Brazil', 'Mexico', 'Sweden', 'China']
+COUNTRY_WEIGHTS = [40, 10, 8, 6, 6, 6, 5, 4, 3, 3, 2, 2, 2, 2, 2]
+
+LANGUAGES = ['English', 'French', 'Italian', 'German', 'Japanese', 'Spanish',
+             'Hindi', 'Korean', 'Mandarin', 'Portuguese', 'Swedish', 'Russian']
+LANGUAGE_TYPES = ['Language', 'Primary language', 'Spoken language']
+
+CREW_ROLES = ['Director', 'Producer', 'Writer', 'Editor', 'Cinematography',
+              'Composer', 'Casting', 'Production Design', 'Costume Design',
+              'Executive producer', 'Sound', 'Visual Effects']
+
+RELEASE_TYPES = ['Theatrical', 'Digital', 'Physical', 'Premiere', 'TV', 'Theatrical limited']
+RELEASE_RATINGS = ['', '', 'G', 'PG', 'PG-13', 'R', '12', '14', '16', '18', 'T', 'VM14']
+
+OSCAR_CATEGORIES = ['BEST PICTURE', 'DIRECTING', 'ACTOR IN A LEADING ROLE',
+                    'ACTRESS IN A LEADING ROLE', 'CINEMATOGRAPHY', 'FILM EDITING',
+                    'MUSIC (Original Score)', 'WRITING (Original Screenplay)']
+
+TITLE_WORDS = [
+    'Night', 'River', 'Silent', 'Last', 'House', 'Dark', 'Love', 'City', 'Dream',
+    'Shadow', 'Blood', 'Summer', 'Winter', 'King', 'Queen', 'Road', 'Girl', 'Man',
+    'Star', 'Fire', 'Ghost', 'Heart', 'Secret', 'Lost', 'Wild', 'Golden', 'Broken',
+    'Midnight', 'Ocean', 'Mountain', 'Garden', 'Stranger', 'Empire', 'Storm', 'Paris',
+    'Rome', 'Tokyo', 'Hunter', 'Island', 'Machine', 'Mirror', 'Silver', 'Bird', 'War',
+    'Angel', 'Devil', 'Forest', 'Train', 'Letter', 'Promise', 'Journey', 'Return',
+]
+FIRST_NAMES = ['John', 'Mary', 'James', 'Anna', 'Robert', 'Laura', 'Michael', 'Sofia',
+               'David', 'Emma', 'Marco', 'Giulia', 'Hiroshi', 'Yuki', 'Pierre', 'Claire',
+               'Carlos', 'Lucia', 'Raj', 'Priya', 'Ingrid', 'Lars', 'Min-jun', 'Ji-woo']
+LAST_NAMES = ['Smith', 'Johnson', 'Rossi', 'Bianchi', 'Tanaka', 'Suzuki', 'Martin',
+              'Dubois', 'Garcia', 'Lopez', 'Patel', 'Sharma', 'Andersson', 'Kim', 'Lee',
+              'Müller', 'Schmidt', 'Brown', 'Wilson', 'Moreau', 'Ferrari', 'Kowalski']
+STUDIOS = ['Paramount Pictures', 'Warner Bros. Pictures', 'Universal Pictures', 'Columbia Pictures',
+           'Toho', 'Gaumont', 'Rai Cinema', 'A24', 'Studio Ghibli', 'Lionsgate', 'Pathé',
+           'BBC Film', 'Netflix', 'Canal+', 'Medusa Film', 'Shochiku']
+THEMES = ['Crime, drugs and gangsters', 'Relationship comedy', 'Moving relationship stories',
+          'Humanity and the world around us', 'Horror, the undead and monster classics',
+          'Emotional and captivating fantasy storytelling', 'Epic history and literature',
+          'Thrillers and murder mysteries', 'Faith and religion', 'Coming-of-age stories',
+          'Sci-fi monster and dinosaur adventures', 'Underdogs and coming of age']
+
+CSV_LAYOUT = [
+    ('movies.csv', ['id', 'name', 'date', 'tagline', 'description', 'minute', 'rating']),
+    ('actors.csv', ['id_movie', 'actor', 'role']),
+    ('countries.csv', ['id_movie', 'country']),
+    ('crew.csv', ['id_movie', 'role', 'name']),
+    ('genres.csv', ['id_movie', 'genre']),
+    ('languages.csv', ['id_movie', 'type', 'language']),
+    ('posters.csv', ['id_movie', 'link']),
+    ('releases.csv', ['id_movie', 'country', 'date', 'type', 'rating']),
+    ('studios.csv', ['id_movie', 'studio']),
+    ('themes.csv', ['id_movie', 'theme']),
+    ('the_oscar_awards.csv', ['year_film', 'year_ceremony', 'ceremony', 'category',
+                              'name', 'film', 'winner', 'id_movie']),
+]
+
+
+def person(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def fan_out(rng, popularity, mean):
+    """Numero di correlati: cresce con la popolarità, zero per molti film minori."""
+    if popularity < 0.3 and rng.random() < 0.5:
+        return 0
+    return max(0, int(rng.expovariate(1 / (mean * (0.3 + popularity * 1.4)))))
+
+
+def generate(n_movies, output_dir, seed=42):
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+
+    files = {}
+    writers = {}
+    for filename, header in CSV_LAYOUT:
+        files[filename] = open(os.path.join(output_dir, filename), 'w', encoding='utf-8', newline='')
+        writers[filename] = csv.writer(files[filename])
+        writers[filename].writerow(header)
+
+    counts = dict.fromkeys(writers, 0)
+
+    def write(filename, row):
+        writers[filename].writerow(row)
+        counts[filename] += 1
+
+    start = time.perf_counter()
+    try:
+        for movie_id in range(1, n_movies + 1):
+            # Popolarità con coda lunga: pochi film molto popolari
+            popularity = rng.random() ** 3
+
+            words = rng.sample(TITLE_WORDS, rng.choice([1, 2, 2, 3, 3, 4]))
+            name = ' '.join(words)
+            if rng.random() < 0.4:
+                name = 'The ' + name
+            if rng.random() < 0.05:
+                name += f" {rng.randint(2, 4)}"
+
+            date = rng.randint(1900, 2030) if rng.random() < 0.97 else ''
+            minute = rng.randint(3, 240) if rng.random() < 0.9 else ''
+            rating = round(rng.uniform(0.5, 5.0), 2) if rng.random() < 0.2 + popularity else ''
+            tagline = f"{rng.choice(TITLE_WORDS)} is only the beginning." if rng.random() < popularity else ''
+            description = ' '.join(rng.choices(TITLE_WORDS, k=rng.randint(10, 60))).lower().capitalize() + '.'
+
+            write('movies.csv', [movie_id, name, date, tagline, description, minute, rating])
+
+            for _ in range(fan_out(rng, popularity, 12)):
+                write('actors.csv', [movie_id, person(rng), person(rng) if rng.random() < 0.85 else ''])
+
+            for _ in range(fan_out(rng, popularity, 9)):
+                write('crew.csv', [movie_id, rng.choice(CREW_ROLES), person(rng)])
+
+            for genre in set(rng.choices(GENRES, GENRE_WEIGHTS, k=rng.choice([1, 1, 2, 2, 3, 4]))):
+                write('genres.csv', [movie_id, genre])
+
+            for country in set(rng.choices(COUNTRIES, COUNTRY_WEIGHTS, k=rng.choice([1, 1, 1, 2, 3]))):
+                write('countries.csv', [movie_id, country])
+
+            primary = rng.choice(LANGUAGES)
+            write('languages.csv', [movie_id, 'Language', primary])
+            for _ in range(fan_out(rng, popularity, 1)):
+                write('languages.csv', [movie_id, rng.choice(LANGUAGE_TYPES[1:]), rng.choice(LANGUAGES)])
+
+            if rng.random() < 0.93:
+                write('posters.csv', [movie_id, f"https://a.ltrbxd.com/resized/film-poster/{movie_id}.jpg"])
+
+            if date:
+                for _ in range(fan_out(rng, popularity, 4)):
+                    release_date = f"{min(2030, date + rng.randint(0, 3))}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+                    write('releases.csv', [movie_id, rng.choices(COUNTRIES, COUNTRY_WEIGHTS)[0], release_date,
+                                           rng.choice(RELEASE_TYPES), rng.choice(RELEASE_RATINGS)])
+
+            for _ in range(fan_out(rng, popularity, 1.5)):
+                write('studios.csv', [movie_id, rng.choice(STUDIOS)])
+
+            for theme in set(rng.choices(THEMES, k=fan_out(rng, popularity, 3))):
+                write('themes.csv', [movie_id, theme])
+
+            if date and popularity > 0.6 and rng.random() < 0.1:
+                for _ in range(rng.randint(1, 6)):
+                    write('the_oscar_awards.csv', [date, date + 1, max(1, date - 1927), rng.choice(OSCAR_CATEGORIES),
+                                                   person(rng), name, rng.random() < 0.25, movie_id])
+
+            if movie_id % 100_000 == 0:
+                print(f"   {movie_id:,} film generati...")
+    finally:
+        for f in files.values():
+            f.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Catalogo sintetico di {n_movies:,} film in {output_dir} ({elapsed:.1f}s)")
+    for filename, count in counts.items():
+        print(f"   {filename:24} {count:>12,} righe")
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--scale', choices=sorted(SCALES), help='dimensione predefinita')
+    size.add_argument('--movies', type=int, help='numero di film')
+    parser.add_argument('--output', required=True, help='cartella in cui scrivere i CSV')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    n_movies = args.movies or SCALES[args.scale or '10k']
+    generate(n_movies, args.output, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Confronta due baseline prodotte da benchmarks.harness.
+
+Per ogni scenario comune mostra la variazione di p50/p95 e delle query
+per richiesta, e segnala i piani di esecuzione cambiati (indici usati
+o struttura dei nodi). Esce con codice 1 se qualche scenario peggiora
+oltre la soglia, così si può usare in uno script di verifica.
+
+Uso (dalla cartella server-flask):
+    python -m benchmarks.compare baseline.json after.json [--threshold 1.25]
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def ratio(after, before):
+    if not before:
+        return None
+    return after / before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='rapporto p95 oltre il quale uno scenario è una regressione')
+    args = parser.parse_args()
+
+    before = load(args.before)
+    after = load(args.after)
+    print(f"📊 {before['meta'].get('git_revision')} ({before['meta']['movies']:,} film) -> "
+          f"{after['meta'].get('git_revision')} ({after['meta']['movies']:,} film)")
+
+    regressions = []
+    plan_changes = []
+
+    for name in sorted(set(before['results']) & set(after['results'])):
+        b = before['results'][name]
+        a = after['results'][name]
+
+        p50 = ratio(a['p50_ms'], b['p50_ms'])
+        p95 = ratio(a['p95_ms'], b['p95_ms'])
+        queries = f"{b.get('queries_per_request')} -> {a.get('queries_per_request')}"
+
+        marker = ''
+        if p95 is not None and p95 > args.threshold:
+            marker = '❌'
+            regressions.append(name)
+        elif p95 is not None and p95 < 1 / args.threshold:
+            marker = '✅'
+
+        print(f"{marker:2} {name:55} p50 {b['p50_ms']:>9.2f} -> {a['p50_ms']:>9.2f}ms "
+              f"p95 x{p95:.2f}  query {queries}" if p95 is not None else f"   {name}")
+
+        if 'plan' in b and 'plan' in a and b['plan']['nodes'] != a['plan']['nodes']:
+            plan_changes.append((name, b['plan'], a['plan']))
+
+    missing = sorted(set(before['results']) ^ set(after['results']))
+    if missing:
+        print(f"\n⚠️ Scenari presenti in una sola baseline: {len(missing)}")
+
+    for name, b, a in plan_changes:
+        print(f"\n🔀 Piano cambiato: {name}")
+        print(f"   indici: {b['indexes']} -> {a['indexes']}")
+        print(f"   costo:  {b['total_cost']} -> {a['total_cost']}")
+        for line in a['nodes']:
+            print(f"   {line}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} scenari oltre la soglia x{args.threshold}")
+        sys.exit(1)
+    print("\n✅ Nessuna regressione oltre la soglia")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark dei due percorsi per i dettagli di un film:
+
+- orm:  Movie.get_movie_details (join + 4 selectin) + _format_movie_data
+- json: Movie.get_movie_document, documento costruito da Postgres
+
+Per un campione di film misura latenza (p50/p95/max) e allocazioni Python
+(tracemalloc), e verifica che le due risposte siano identiche una volta
+serializzate in JSON.
+
+Uso (dalla cartella server-flask):
+    python -m benchmarks.details_paths [--movies 200] [--output details.json]
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+from app import create_app, db
+from app.controllers.MoviesController import MovieController
+from app.models.MoviesModels import Movie
+
+
+def orm_path(movie_id):
+    movie = Movie.get_movie_details(movie_id)
+    return MovieController._format_movie_data(movie) if movie is not None else None
+
+
+def json_path(movie_id):
+    return Movie.get_movie_document(movie_id)
+
+
+PATHS = {
+    'orm': orm_path,
+    'json': json_path,
+}
+
+
+def sample_movie_ids(n):
+    return [row[0] for row in db.session.execute(db.text(
+        "SELECT id FROM movies WHERE name IS NOT NULL AND name <> '' ORDER BY random() LIMIT :n"
+    ), {'n': n})]
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def measure(path, movie_ids):
+    latencies = []
+    allocated = []
+
+    for movie_id in movie_ids:
+        # Sessione pulita: niente oggetti già presenti nella identity map
+        db.session.remove()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        path(movie_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        allocated.append(peak / 1024)
+
+    return {
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'max_ms': round(max(latencies), 3),
+        'peak_kb_avg': round(statistics.mean(allocated), 1),
+        'peak_kb_max': round(max(allocated), 1),
+    }
+
+
+def check_equal(movie_ids):
+    """Id dei film per cui le due risposte differiscono."""
+    mismatches = []
+    for movie_id in movie_ids:
+        db.session.remove()
+        orm_doc = json.loads(json.dumps(orm_path(movie_id), sort_keys=True))
+        json_doc = json.loads(json.dumps(json_path(movie_id), sort_keys=True))
+        if orm_doc != json_doc:
+            mismatches.append(movie_id)
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--movies', type=int, default=200, help='film nel campione')
+    parser.add_argument('--output', help='file JSON in cui salvare i risultati')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        movie_ids = sample_movie_ids(args.movies)
+        print(f"🎬 Campione di {len(movie_ids)} film")
+
+        # Riscaldamento: pool di connessioni e cache dei piani
+        for path in PATHS.values():
+            for movie_id in movie_ids[:10]:
+                path(movie_id)
+
+        results = {name: measure(path, movie_ids) for name, path in PATHS.items()}
+        results['mismatches'] = check_equal(movie_ids)
+
+    for name in PATHS:
+        r = results[name]
+        print(f"   {name:5} p50={r['p50_ms']}ms p95={r['p95_ms']}ms max={r['max_ms']}ms "
+              f"peak={r['peak_kb_avg']}KB (max {r['peak_kb_max']}KB)")
+
+    if results['mismatches']:
+        print(f"❌ Risposte diverse per {len(results['mismatches'])} film: {results['mismatches'][:10]}")
+    else:
+        print("✅ Le due risposte coincidono per tutto il campione")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Risultati salvati in {args.output}")
+
+
+if __name__ == '__main__':
+    main()
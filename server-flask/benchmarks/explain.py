@@ -0,0 +1,58 @@
+"""
+Utility per leggere i piani di esecuzione delle query SQLAlchemy
+usate dal server Flask. Vanno chiamate dentro un application context.
+"""
+import json
+from app import db
+
+
+def explain(query, analyze=True):
+    """
+    Esegue EXPLAIN (FORMAT JSON) sulla query (Query ORM o Select).
+
+    Args:
+        query: query da analizzare
+        analyze (bool): se True esegue davvero la query (EXPLAIN ANALYZE)
+            e riporta tempi e buffer reali
+
+    Returns:
+        dict: il nodo radice del piano, con 'Planning Time' ed
+            'Execution Time' quando analyze=True
+    """
+    statement = getattr(query, 'statement', query)
+    compiled = statement.compile(dialect=db.session.get_bind().dialect)
+
+    options = 'ANALYZE, BUFFERS, FORMAT JSON' if analyze else 'FORMAT JSON'
+    plan = db.session.connection().exec_driver_sql(
+        f"EXPLAIN ({options}) {compiled}", compiled.params
+    ).scalar()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return plan[0]
+
+
+def plan_nodes(node, depth=0):
+    """Appiattisce l'albero del piano in righe leggibili."""
+    line = f"{'  ' * depth}-> {node['Node Type']}"
+    if 'Relation Name' in node:
+        line += f" on {node['Relation Name']}"
+    if 'Index Name' in node:
+        line += f" using {node['Index Name']}"
+    line += f" (rows={node.get('Actual Rows', node.get('Plan Rows'))})"
+
+    lines = [line]
+    for child in node.get('Plans', []):
+        lines.extend(plan_nodes(child, depth + 1))
+    return lines
+
+
+def used_indexes(node):
+    """Insieme degli indici toccati dal piano."""
+    indexes = set()
+    if 'Index Name' in node:
+        indexes.add(node['Index Name'])
+    for child in node.get('Plans', []):
+        indexes |= used_indexes(child)
+    return indexes
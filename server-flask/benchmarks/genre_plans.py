@@ -0,0 +1,85 @@
+"""
+Benchmark del filtro per generi multipli di Movie.search.
+
+Per 1, 2 e 3 generi, in modalità 'all' (tutti) e 'any' (almeno uno),
+stampa il piano di esecuzione della pagina e del COUNT, gli indici usati
+e i tempi reali (EXPLAIN ANALYZE). Serve un database già popolato con
+database/databases_setup.py.
+
+Uso (dalla cartella server-flask):
+    python -m benchmarks.genre_plans [--per-page 20] [--output plans.json]
+"""
+import argparse
+import json
+
+from app import create_app
+from app.models.MoviesModels import Movie
+from benchmarks.explain import explain, plan_nodes, used_indexes
+
+GENRE_SETS = [
+    ['Drama'],
+    ['Drama', 'Comedy'],
+    ['Drama', 'Comedy', 'Romance'],
+]
+
+
+def base_filters(genres, mode):
+    return {
+        'genre': genres,
+        'genre_mode': mode,
+        'upcoming': 'false',
+        'tvmovie': 'false',
+        'sort_by': 'base',
+        'order_by': 'desc',
+    }
+
+
+def run(per_page):
+    results = []
+
+    for genres in GENRE_SETS:
+        for mode in ('all', 'any'):
+            query = Movie.build_search_query(base_filters(genres, mode))
+
+            page_plan = explain(query.limit(per_page))
+            count_plan = explain(query.order_by(None))
+
+            result = {
+                'genres': genres,
+                'mode': mode,
+                'page_ms': page_plan['Execution Time'],
+                'count_ms': count_plan['Execution Time'],
+                'rows': count_plan['Plan']['Actual Rows'],
+                'indexes': sorted(used_indexes(page_plan['Plan']) | used_indexes(count_plan['Plan'])),
+                'page_plan': page_plan['Plan'],
+            }
+            results.append(result)
+
+            print(f"\n🎬 generi={'+'.join(genres)} mode={mode}")
+            print(f"   pagina: {result['page_ms']:.2f}ms  count: {result['count_ms']:.2f}ms  "
+                  f"film: {result['rows']:,}")
+            print(f"   indici: {', '.join(result['indexes']) or 'nessuno'}")
+            for line in plan_nodes(page_plan['Plan']):
+                print(f"   {line}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--output', help='file JSON in cui salvare i risultati')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        results = run(args.per_page)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Risultati salvati in {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""
+Harness dei benchmark del server Flask.
+
+1. (opzionale, --load) carica i CSV generati da benchmarks.catalog_generator
+   in un Postgres locale con PostgreSQLSetup, ricreando le tabelle da zero;
+2. esegue get_movie_details, get_suggestions e search (ogni ordinamento
+   per ogni filtro) attraverso il test client di Flask, con cache,
+   ETag e single-flight disattivati; per ogni ricerca anche una pagina
+   profonda, sia via OFFSET sia via cursore (keyset, senza COUNT);
+3. scrive una baseline JSON con percentili di latenza, query per richiesta
+   (dall'header Server-Timing) e piani di esecuzione delle ricerche.
+
+Due baseline si confrontano con benchmarks.compare.
+
+Uso (dalla cartella server-flask, variabili POSTGRES_* del database di test):
+    python -m benchmarks.harness --load ../data_bench --output baseline.json
+    python -m benchmarks.harness --repeat 20 --output after.json
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from app import create_app, db
+from app.controllers.MoviesController import MovieController
+from app.models.MoviesModels import Movie
+from benchmarks.explain import explain, plan_nodes, used_indexes
+from config.app_config import DatabaseConfig
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+TABLES = ['movie_documents', 'oscars', 'themes', 'studios', 'releases', 'posters',
+          'languages', 'genres', 'crews', 'countries', 'actors', 'movies']
+
+SORTS = [
+    ('base', 'desc'),
+    ('rating', 'desc'), ('rating', 'asc'),
+    ('date', 'desc'), ('date', 'asc'),
+    ('name', 'asc'), ('name', 'desc'),
+    ('duration', 'desc'), ('duration', 'asc'),
+    ('random', 'desc'),
+]
+
+FILTERS = {
+    'none': {},
+    'title': {'title': 'night'},
+    'rating': {'min_rating': 3.5, 'max_rating': 5},
+    'years': {'year_from': 1990, 'year_to': 2010},
+    'duration': {'min_duration': 90, 'max_duration': 120},
+    'genre_1': {'genre': ['dramma']},
+    'genre_2_all': {'genre': ['dramma', 'commedia'], 'genre_mode': 'all'},
+    'genre_2_any': {'genre': ['dramma', 'commedia'], 'genre_mode': 'any'},
+    'genre_3_all': {'genre': ['dramma', 'commedia', 'romantico'], 'genre_mode': 'all'},
+    'upcoming': {'upcoming': 'true'},
+    'tvmovie': {'tvmovie': 'true'},
+    'combined': {'min_rating': 3, 'year_from': 1980, 'genre': ['thriller'], 'max_duration': 150},
+    'fulltext': {'q': 'night river'},
+    'fulltext_filtered': {'q': 'silent -ghost', 'min_rating': 3, 'year_from': 1980},
+}
+
+# Pagina degli scenari di paginazione profonda (OFFSET e cursore)
+DEEP_PAGE = 50
+
+SUGGESTION_QUERIES = ['ni', 'the', 'night', 'silent riv', 'golden empire', 'zzqx']
+
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+class BenchmarkConfig(DatabaseConfig):
+    """Niente cache né coalescenza: ogni richiesta deve arrivare al database."""
+    RESPONSE_CACHE_ENABLED = False
+    HTTP_ETAGS_ENABLED = False
+    SINGLE_FLIGHT_ENABLED = False
+    SUGGESTION_INDEX_ENABLED = False
+    INSTRUMENTATION_ENABLED = True
+    SERVER_TIMING_ENABLED = True
+    SQLALCHEMY_ECHO = False
+    DEBUG = False
+
+
+# === CARICAMENTO DATI ===
+
+def load_catalog(data_dir):
+    """Ricrea le tabelle e carica i CSV con lo stesso codice del setup reale."""
+    sys.path.insert(0, str(REPO_ROOT / 'database'))
+    from setupper.postgres_setup import PostgreSQLSetup
+
+    setup = PostgreSQLSetup()
+    setup.csv_path = Path(data_dir).resolve()
+    if not setup.connect():
+        raise RuntimeError('Connessione a Postgres fallita')
+
+    with setup.conn.cursor() as curr:
+        for table in TABLES:
+            curr.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
+    setup.conn.commit()
+
+    start = time.perf_counter()
+    setup.create_tables()
+    setup.load_csv_data()
+    setup.build_movie_documents()
+    setup.create_indexes()
+    setup.bump_catalog_version()
+    with setup.conn.cursor() as curr:
+        curr.execute("ANALYZE")
+    setup.conn.commit()
+    setup.conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Catalogo caricato in {elapsed:.1f}s")
+    return elapsed
+
+
+# === MISURE ===
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def drive(client, url, repeat):
+    """Esegue `repeat` volte la richiesta e riassume latenze e query."""
+    latencies = []
+    queries = []
+    db_ms = []
+    status = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        latencies.append((time.perf_counter() - start) * 1000)
+        status = response.status_code
+
+        match = SERVER_TIMING_DB.search(response.headers.get('Server-Timing', ''))
+        if match:
+            db_ms.append(float(match.group(1)))
+            queries.append(int(match.group(2)))
+
+    return {
+        'url': url,
+        'status': status,
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'max_ms': round(max(latencies), 3),
+        'db_ms_p50': round(statistics.median(db_ms), 3) if db_ms else None,
+        'queries_per_request': round(statistics.mean(queries), 2) if queries else None,
+    }
+
+
+def keyset_supported(params):
+    """La paginazione a cursore non c'è per random e relevance (base con q = relevance)."""
+    if params['sort_by'] == 'random':
+        return False
+    return not (params.get('q') and params['sort_by'] in ('base', 'relevance'))
+
+
+def walk_cursor(client, params, page):
+    """
+    Segue i next_cursor fino alla pagina `page` (senza COUNT) e restituisce
+    il cursore che la apre, None se i risultati finiscono prima.
+    """
+    cursor = ''
+    for _ in range(page - 1):
+        query = dict(params, cursor=cursor, count_mode='none')
+        response = client.get('/api/movies/search?' + urlencode(query, doseq=True))
+        if response.status_code != 200:
+            return None
+        cursor = response.get_json()['pagination'].get('next_cursor')
+        if cursor is None:
+            return None
+    return cursor
+
+
+def search_plan(params):
+    """Piano (senza ANALYZE) della query di ricerca per questi parametri."""
+    filters_raw = {
+        'title': params.get('title', ''),
+        'q': params.get('q', ''),
+        'min_rating': params.get('min_rating'),
+        'max_rating': params.get('max_rating'),
+        'year_from': params.get('year_from'),
+        'year_to': params.get('year_to'),
+        'min_duration': params.get('min_duration'),
+        'max_duration': params.get('max_duration'),
+        'genre': params.get('genre', []),
+        'genre_mode': params.get('genre_mode', 'all'),
+        'upcoming': params.get('upcoming', 'false'),
+        'tvmovie': params.get('tvmovie', 'false'),
+        'sort_by': params.get('sort_by', 'base'),
+        'order_by': params.get('order_by', 'desc'),
+        'seed': params.get('seed'),
+    }
+    clean_filters = MovieController._validate_and_clean_filters(filters_raw)
+    plan = explain(Movie.build_search_query(clean_filters).limit(20), analyze=False)
+    return {
+        'nodes': plan_nodes(plan['Plan']),
+        'indexes': sorted(used_indexes(plan['Plan'])),
+        'total_cost': plan['Plan']['Total Cost'],
+    }
+
+
+def sample_ids(n):
+    return [row[0] for row in db.session.execute(db.text(
+        "SELECT id FROM movies WHERE name IS NOT NULL AND name <> '' "
+        "ORDER BY rating DESC NULLS LAST, id LIMIT :n"
+    ), {'n': n})]
+
+
+def run(repeat, details_sample):
+    app = create_app(BenchmarkConfig)
+    client = app.test_client()
+    results = {}
+
+    with app.app_context():
+        n_movies = db.session.execute(db.text("SELECT count(*) FROM movies")).scalar()
+        movie_ids = sample_ids(details_sample)
+
+        print(f"🎬 {n_movies:,} film nel database, {repeat} ripetizioni per scenario")
+
+        # Dettagli: film popolari (molti correlati) e un film inesistente
+        for movie_id in movie_ids:
+            results[f'details/{movie_id}'] = drive(client, f'/api/movies/{movie_id}', repeat)
+        results['details/missing'] = drive(client, '/api/movies/999999999', repeat)
+
+        for query in SUGGESTION_QUERIES:
+            results[f'suggestions/{query}'] = drive(
+                client, '/api/movies/suggestions?' + urlencode({'q': query}), repeat
+            )
+
+        for filter_name, filter_params in FILTERS.items():
+            for sort_by, order_by in SORTS:
+                params = dict(filter_params, sort_by=sort_by, order_by=order_by)
+                if sort_by == 'random':
+                    params['seed'] = 7
+                name = f'search/{filter_name}/{sort_by}-{order_by}'
+
+                results[name] = drive(client, '/api/movies/search?' + urlencode(params, doseq=True), repeat)
+                results[name]['plan'] = search_plan(params)
+
+                # Pagina profonda: OFFSET contro keyset
+                deep = dict(params, page=DEEP_PAGE)
+                results[name + f'/page{DEEP_PAGE}'] = drive(
+                    client, '/api/movies/search?' + urlencode(deep, doseq=True), repeat
+                )
+                if keyset_supported(params):
+                    cursor = walk_cursor(client, params, DEEP_PAGE)
+                    if cursor is not None:
+                        deep = dict(params, cursor=cursor, count_mode='none')
+                        results[name + f'/page{DEEP_PAGE}-cursor'] = drive(
+                            client, '/api/movies/search?' + urlencode(deep, doseq=True), repeat
+                        )
+
+            print(f"   filtro '{filter_name}' completato")
+
+    return n_movies, results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=REPO_ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--load', metavar='DATA_DIR', help='ricarica il database da questi CSV')
+    parser.add_argument('--repeat', type=int, default=10, help='ripetizioni per scenario')
+    parser.add_argument('--details-sample', type=int, default=20, help='film per lo scenario dettagli')
+    parser.add_argument('--output', required=True, help='file JSON della baseline')
+    args = parser.parse_args()
+
+    load_seconds = load_catalog(args.load) if args.load else None
+    n_movies, results = run(args.repeat, args.details_sample)
+
+    baseline = {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_revision': git_revision(),
+            'movies': n_movies,
+            'repeat': args.repeat,
+            'load_seconds': load_seconds,
+        },
+        'results': results,
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+    print(f"✅ Baseline salvata in {args.output} ({len(results)} scenari)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Report del tempo di avvio del server Flask con `python -X importtime`.
+
+Avvia un processo nuovo (cache dei moduli vuota, come un worker appena
+creato), importa l'app ed esegue create_app, poi riassume:
+- i pacchetti di primo livello che costano di più (tempo cumulativo);
+- i moduli vietati nel percorso del server (pandas, numpy, ... del
+  preprocessing): se ne compare uno esce con codice 1;
+- tempo di import e di create_app, confrontati con il budget.
+
+Uso (dalla cartella server-flask):
+    python -m benchmarks.importtime [--top 15] [--budget-ms 500] [--no-app]
+"""
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+SERVER_ROOT = Path(__file__).resolve().parents[1]
+
+# Dipendenze del preprocessing e del setup: non servono per rispondere alle richieste
+FORBIDDEN = ('pandas', 'numpy', 'pymongo', 'unidecode', 'IPython', 'jupyter', 'matplotlib')
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+CHILD = """
+import time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+if {create}:
+    create_app()
+done = time.perf_counter()
+print(f"TIMING {{(imported - start) * 1000:.1f}} {{(done - imported) * 1000:.1f}}")
+"""
+
+
+def measure(create):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD.format(create=create)],
+        cwd=SERVER_ROOT, capture_output=True, text=True,
+    )
+
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+
+    timing = re.search(r'TIMING ([\d.]+) ([\d.]+)', result.stdout)
+    if result.returncode != 0 or timing is None:
+        print(result.stdout)
+        print('\n'.join(line for line in result.stderr.splitlines() if not line.startswith('import time:')))
+        raise SystemExit(f"❌ Avvio fallito (codice {result.returncode})")
+
+    return modules, float(timing.group(1)), float(timing.group(2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=15, help='pacchetti da mostrare')
+    parser.add_argument('--budget-ms', type=float, default=500, help='budget per import + create_app')
+    parser.add_argument('--no-app', action='store_true', help='misura solo gli import, senza create_app')
+    args = parser.parse_args()
+
+    modules, import_ms, create_ms = measure(create=not args.no_app)
+
+    # Tempo cumulativo per pacchetto, contando solo gli import non annidati
+    packages = {}
+    for name, _, cumulative_us, depth in modules:
+        if depth == 0:
+            top = name.split('.')[0]
+            packages[top] = packages.get(top, 0) + cumulative_us
+
+    print(f"📦 {len(modules)} moduli importati")
+    print(f"{'pacchetto':30} {'cumulativo':>12}")
+    for name, cumulative_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:30} {cumulative_us / 1000:>10.1f}ms")
+
+    total_ms = import_ms + create_ms
+    print(f"\n⏱️ import app {import_ms:.1f}ms, create_app {create_ms:.1f}ms, totale {total_ms:.1f}ms "
+          f"(budget {args.budget_ms:.0f}ms)")
+
+    forbidden = sorted({name for name, _, _, _ in modules if name.split('.')[0] in FORBIDDEN})
+    if forbidden:
+        print(f"❌ Moduli del preprocessing nel percorso del server: {', '.join(forbidden)}")
+        sys.exit(1)
+    if total_ms > args.budget_ms:
+        print("⚠️ Avvio oltre il budget")
+        sys.exit(1)
+    print("✅ Avvio entro il budget, nessun modulo vietato")
+
+
+if __name__ == '__main__':
+    main()
@@ -24,15 +24,90 @@ class DatabaseConfig:
         f"{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
     )
     
+    # === REPLICHE IN LETTURA ===
+    # URI separati da virgola (es. un secondo Postgres locale sulla porta 5433).
+    # Ricerca, suggerimenti e dettagli leggono dalle repliche in round-robin;
+    # una replica che non risponde o è in ritardo di oltre
+    # REPLICA_MAX_LAG_SECONDS viene esclusa finché non torna in pari
+    POSTGRES_REPLICA_URIS = [
+        uri.strip() for uri in os.getenv('POSTGRES_REPLICA_URIS', '').split(',') if uri.strip()
+    ]
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_HEALTH_INTERVAL = float(os.getenv('REPLICA_HEALTH_INTERVAL', 2))
+    
     # === CONFIGURAZIONI FLASK E SQLALCHEMY ===
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = os.getenv('FLASK_ENV') == 'development'
     
+    # === CONFIGURAZIONI POOL DI CONNESSIONI ===
+    # Connessioni per worker = DB_POOL_SIZE + DB_MAX_OVERFLOW: moltiplicato per
+    # il numero di worker deve restare sotto max_connections di Postgres.
+    # Oltre quel limite le richieste aspettano al massimo DB_POOL_TIMEOUT secondi
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', 5))
+    
+    # Schema del catalogo: il reload blue/green (databases_setup.py --blue-green)
+    # pubblica i dati in "catalog"; finché non esiste si legge da public
+    DB_SEARCH_PATH = os.getenv('DB_SEARCH_PATH', 'catalog,public')
+    
+    # Limiti per connessione (millisecondi, 0 = nessun limite)
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 10000))
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.getenv('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', 30000))
+    
+    # Pool della modalità asincrona (run_async.py): molte richieste aperte
+    # condividono poche connessioni, quindi l'attesa massima è più lunga
+    ASYNC_DB_POOL_SIZE = int(os.getenv('ASYNC_DB_POOL_SIZE', 20))
+    ASYNC_DB_MAX_OVERFLOW = int(os.getenv('ASYNC_DB_MAX_OVERFLOW', 10))
+    ASYNC_DB_POOL_TIMEOUT = float(os.getenv('ASYNC_DB_POOL_TIMEOUT', 30))
+    
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+        'connect_args': {
+            'connect_timeout': DB_CONNECT_TIMEOUT,
+            'options': (
+                f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS} "
+                f"-c idle_in_transaction_session_timeout={DB_IDLE_IN_TRANSACTION_TIMEOUT_MS} "
+                f"-c search_path={DB_SEARCH_PATH}"
+            )
+        },
+    }
+    
     # === CONFIGURAZIONI DELL'APPLICAZIONE ===
     
     SECRET_KEY = os.getenv('FLASK_SECRET_KEY')
     DEBUG = os.getenv('FLASK_ENV') == 'development'
     
+    # === CONFIGURAZIONI STRUMENTAZIONE ===
+    # Header Server-Timing e log JSON per richiesta; oltre la soglia di
+    # query per richiesta viene segnalato un possibile pattern N+1
+    INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'true').lower() == 'true'
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'true').lower() == 'true'
+    SQL_STATEMENT_WARN_THRESHOLD = int(os.getenv('SQL_STATEMENT_WARN_THRESHOLD', 10))
+    
+    # Endpoint /api/metrics (contatori, istogrammi di latenza, pool, cache)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    
+    # Profiler a campionamento: si avvia da /api/admin/profiler oppure
+    # all'avvio per le prime N richieste / i primi N secondi
+    PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'true').lower() == 'true'
+    PROFILE_NEXT_REQUESTS = int(os.getenv('PROFILE_NEXT_REQUESTS', 0))
+    PROFILE_SECONDS = float(os.getenv('PROFILE_SECONDS', 0))
+    PROFILER_OUTPUT_DIR = os.getenv('PROFILER_OUTPUT_DIR', 'profiles')
+    PROFILER_INTERVAL_MS = float(os.getenv('PROFILER_INTERVAL_MS', 5))
+    
+    # === CONFIGURAZIONI AVVIO IN PRODUZIONE ===
+    # Film più popolari di cui il launcher di produzione legge i dettagli
+    # durante il warmup di ogni worker (gunicorn.conf.py)
+    WARMUP_TOP_MOVIES = int(os.getenv('WARMUP_TOP_MOVIES', 20))
+    
     # === CONFIGURAZIONI RETE ===
     PORT = int(os.getenv('PORT'))
     HOST = os.getenv('FLASK_HOST')
@@ -40,3 +115,51 @@ class DatabaseConfig:
     # === CONFIGURAZIONI PER L'INTEGRAZIONE CON GLI ALTRI SERVER ===
     EXPRESS_SERVER_URL = os.getenv('EXPRESS_SERVER_URL')
     
+    # === CONFIGURAZIONI DI AMMINISTRAZIONE ===
+    # Token per le route /api/admin (se vuoto le route sono disabilitate)
+    ADMIN_TOKEN = os.getenv('FLASK_ADMIN_TOKEN', '')
+    
+    # === CONFIGURAZIONI SUGGERIMENTI ===
+    # Se attivo, /api/movies/suggestions risponde dall'indice in memoria
+    # invece che dalla query ILIKE su Postgres
+    SUGGESTION_INDEX_ENABLED = os.getenv('SUGGESTION_INDEX_ENABLED', 'false').lower() == 'true'
+    
+    # === CONFIGURAZIONI RICERCA ===
+    # sort_by=random: 'shuffle' legge la colonna movies.shuffle_key indicizzata,
+    # 'sql' usa ORDER BY random() (database senza la colonna)
+    RANDOM_SORT_MODE = os.getenv('RANDOM_SORT_MODE', 'shuffle')
+    
+    # === CONFIGURAZIONI DETTAGLI FILM ===
+    # 'orm' = relazioni SQLAlchemy + _format_movie_data,
+    # 'json' = documento costruito da Postgres in una sola query,
+    # 'documents' = documento precalcolato nella tabella movie_documents
+    MOVIE_DETAILS_SOURCE = os.getenv('MOVIE_DETAILS_SOURCE', 'orm')
+    
+    # Card dei risultati di ricerca: 'orm' oppure 'documents' (movie_documents.search_card)
+    SEARCH_RESULTS_SOURCE = os.getenv('SEARCH_RESULTS_SOURCE', 'orm')
+    
+    # === CONFIGURAZIONI CACHE DELLE RISPOSTE ===
+    # Numero massimo di voci e durata (secondi) per endpoint.
+    # Il catalogo è in sola lettura: la cache viene svuotata a ogni reload
+    RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    RESPONSE_CACHE_DETAILS_SIZE = int(os.getenv('RESPONSE_CACHE_DETAILS_SIZE', 5000))
+    RESPONSE_CACHE_DETAILS_TTL = int(os.getenv('RESPONSE_CACHE_DETAILS_TTL', 3600))
+    RESPONSE_CACHE_SUGGESTIONS_SIZE = int(os.getenv('RESPONSE_CACHE_SUGGESTIONS_SIZE', 10000))
+    RESPONSE_CACHE_SUGGESTIONS_TTL = int(os.getenv('RESPONSE_CACHE_SUGGESTIONS_TTL', 600))
+    RESPONSE_CACHE_SEARCH_SIZE = int(os.getenv('RESPONSE_CACHE_SEARCH_SIZE', 2000))
+    RESPONSE_CACHE_SEARCH_TTL = int(os.getenv('RESPONSE_CACHE_SEARCH_TTL', 300))
+    
+    # Ogni worker rilegge catalog_version al massimo ogni N secondi e, se è
+    # cambiata, svuota cache e indici in memoria (0 = solo POST /api/admin/reload)
+    CATALOG_VERSION_CHECK_SECONDS = float(os.getenv('CATALOG_VERSION_CHECK_SECONDS', 5))
+    
+    # Coalescenza delle richieste identiche concorrenti nello stesso worker
+    SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+    
+    # === CONFIGURAZIONI CACHE HTTP ===
+    # ETag derivati dalla versione del dataset + risposte 304 alle richieste condizionali
+    HTTP_ETAGS_ENABLED = os.getenv('HTTP_ETAGS_ENABLED', 'true').lower() == 'true'
+    CACHE_CONTROL_DETAILS = os.getenv('CACHE_CONTROL_DETAILS', 'public, max-age=3600')
+    CACHE_CONTROL_SUGGESTIONS = os.getenv('CACHE_CONTROL_SUGGESTIONS', 'public, max-age=300')
+    CACHE_CONTROL_SEARCH = os.getenv('CACHE_CONTROL_SEARCH', 'public, max-age=60')
+    
@@ -0,0 +1,79 @@
+"""
+Avvio in produzione del server Flask (dalla cartella server-flask):
+
+    gunicorn run:app
+
+gunicorn legge automaticamente questo file. Il master importa l'app una
+volta sola (preload: moduli e indice dei suggerimenti condivisi dopo il
+fork), poi crea i worker. Ogni worker fa il warmup prima di accettare
+connessioni; /api/ready risponde 200 quando almeno READY_MIN_WORKERS
+worker (default 1) sono pronti.
+
+Con SIGTERM ogni worker risponde 503 su /api/ready ma continua a servire
+per DRAIN_SECONDS, così il load balancer smette di mandargli traffico
+prima che smetta di accettare connessioni; poi completa le richieste in
+corso entro graceful_timeout.
+"""
+import multiprocessing
+import os
+import threading
+
+bind = f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('PORT', 5000)}"
+
+# Il lavoro è soprattutto attesa del database: 2 worker per CPU + 1
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', 4))
+preload_app = True
+
+# Worker pronti necessari perché l'istanza riceva traffico
+READY_MIN_WORKERS = int(os.getenv('READY_MIN_WORKERS', 1))
+
+DRAIN_SECONDS = float(os.getenv('DRAIN_SECONDS', 10))
+graceful_timeout = DRAIN_SECONDS + 30
+timeout = int(os.getenv('WORKER_TIMEOUT', 60))
+keepalive = 5
+
+accesslog = None
+errorlog = '-'
+
+
+def on_starting(server):
+    # L'app importa controller e models alla prima richiesta sui film: qui
+    # li importa il master, così i worker li condividono dopo il fork
+    import app.controllers.MoviesController  # noqa: F401
+
+    from app.services.Readiness import readiness
+    readiness.share(server.cfg.workers, READY_MIN_WORKERS)
+    server.log.info(f"Avvio di {server.cfg.workers} worker x {server.cfg.threads} thread")
+
+
+def post_fork(server, worker):
+    from app.services.Readiness import readiness
+
+    # Sostituisce il gestore di SIGTERM (installato dopo post_fork):
+    # prima il drain, poi la chiusura normale del worker
+    stop = worker.handle_exit
+
+    def drain_then_exit(sig, frame):
+        if readiness.state == 'draining':
+            return
+        readiness.start_drain()
+        server.log.info(f"Worker {worker.pid} in drain per {DRAIN_SECONDS}s")
+        threading.Timer(DRAIN_SECONDS, stop, args=(sig, frame)).start()
+
+    worker.handle_exit = drain_then_exit
+
+
+def post_worker_init(worker):
+    from app.services.Readiness import readiness
+    from app.services.Warmup import warmup
+
+    warmup(worker.wsgi)
+    readiness.mark_ready()
+
+
+def worker_exit(server, worker):
+    # Eseguito nel master: vale anche per i worker uccisi o andati in timeout
+    from app.services.Readiness import readiness
+    readiness.worker_exit(worker.pid)
@@ -0,0 +1,14 @@
+from app.asgi import create_asgi_app
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+app = create_asgi_app()
+if __name__ == '__main__':
+    import uvicorn
+
+    host = os.getenv('FLASK_HOST', '127.0.0.1')
+    port = int(os.getenv('PORT', 5000))
+
+    print(f"🚀 Avvio server asincrono su {host}:{port}")
+    uvicorn.run(app, host=host, port=port, lifespan='on')
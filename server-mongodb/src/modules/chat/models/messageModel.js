@@ -13,7 +13,7 @@ const messageSchema = new mongoose.Schema(
       required: true,
       trim: true,
       lowercase: true,
-      index: true,
+      // indice coperto da { roomName: 1, uniqueTimestamp: -1 }
     },
 
     userName: {
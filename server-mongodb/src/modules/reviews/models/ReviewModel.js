@@ -7,7 +7,7 @@ const reviewSchema = new mongoose.Schema(
       type: String,
       required: true,
       trim: true,
-      index: true,
+      // indice coperto da { movie_title: 1, review_type: 1 }
     },
 
     review_type: {
@@ -28,7 +28,7 @@ const reviewSchema = new mongoose.Schema(
     id_movie: {
       type: Number,
       required: false,
-      index: true,
+      // indice coperto da { id_movie: 1, review_date: -1 }
       validate: {
         validator: function (value) {
           return (